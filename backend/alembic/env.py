@@ -15,7 +15,7 @@ from app.models.base_model import Base
 
 from app.models.api import Api
 from app.models.image import Image
-from app.models.post import Post, PostAnalysis, AiInsight
+from app.models.post import Post, PostAnalysis, AiInsight, PostOutbox, PostStatusDaily
 from app.models.product import Product
 from app.models.social_platform import SocialPlatform
 
@@ -0,0 +1,35 @@
+"""Add PUBLISHING status and publish lease
+
+Revision ID: 5c1e9a7d2b4f
+Revises: 3bdd6ca0aba9
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d2b4f'
+down_revision: Union[str, Sequence[str], None] = '3bdd6ca0aba9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_POST_STATUS = sa.Enum('DRAFT', 'PUBLISHED', 'PENDING', 'SCHEDULED', 'FAILED', name='poststatus')
+NEW_POST_STATUS = sa.Enum('DRAFT', 'PUBLISHED', 'PENDING', 'SCHEDULED', 'PUBLISHING', 'FAILED', name='poststatus')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('posts', 'status', existing_type=OLD_POST_STATUS, type_=NEW_POST_STATUS, existing_nullable=True)
+    op.add_column('posts', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Posts caught mid-publish go back to the sweeper's queue
+    op.execute("UPDATE posts SET status = 'SCHEDULED' WHERE status = 'PUBLISHING'")
+    op.drop_column('posts', 'lease_expires_at')
+    op.alter_column('posts', 'status', existing_type=NEW_POST_STATUS, type_=OLD_POST_STATUS, existing_nullable=True)
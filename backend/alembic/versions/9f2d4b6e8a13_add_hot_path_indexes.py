@@ -0,0 +1,36 @@
+"""Add composite indexes for scheduler, analytics and list queries
+
+Revision ID: 9f2d4b6e8a13
+Revises: 5c1e9a7d2b4f
+Create Date: 2026-10-18 11:04:52.540731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2d4b6e8a13'
+down_revision: Union[str, Sequence[str], None] = '5c1e9a7d2b4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_status_schedule_time', 'posts', ['status', 'schedule_time'], unique=False)
+    op.create_index('ix_posts_status_lease_expires_at', 'posts', ['status', 'lease_expires_at'], unique=False)
+    op.create_index('ix_posts_user_id_schedule_time', 'posts', ['user_id', 'schedule_time'], unique=False)
+    op.create_index('ix_posts_created_at', 'posts', ['created_at'], unique=False)
+    op.create_index('ix_social_platforms_user_id_type', 'social_platforms', ['user_id', 'type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_social_platforms_user_id_type', table_name='social_platforms')
+    op.drop_index('ix_posts_created_at', table_name='posts')
+    op.drop_index('ix_posts_user_id_schedule_time', table_name='posts')
+    op.drop_index('ix_posts_status_lease_expires_at', table_name='posts')
+    op.drop_index('ix_posts_status_schedule_time', table_name='posts')
@@ -0,0 +1,46 @@
+"""Add post_status_daily rollup table and fill it from posts
+
+Revision ID: a8d4f2c6b1e9
+Revises: e7b3d9a2c5f1
+Create Date: 2026-10-18 21:05:44.617208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d4f2c6b1e9'
+down_revision: Union[str, Sequence[str], None] = 'e7b3d9a2c5f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('post_status_daily',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('platform_type', sa.Enum('TWITTER', 'LINKEDIN', 'FACEBOOK', 'INSTAGRAM', name='platformtype'), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'PUBLISHED', 'PENDING', 'SCHEDULED', 'PUBLISHING', 'FAILED', name='poststatus'), nullable=False),
+    sa.Column('post_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'platform_type', 'day', 'status')
+    )
+    op.create_index('ix_post_status_daily_day', 'post_status_daily', ['day'], unique=False)
+    # Posts without a schedule_time are counted under 1000-01-01 (UNSCHEDULED_DAY)
+    op.execute("""
+        INSERT INTO post_status_daily (user_id, platform_type, day, status, post_count)
+        SELECT p.user_id, sp.type, COALESCE(DATE(p.schedule_time), '1000-01-01'), p.status, COUNT(*)
+        FROM posts p
+        JOIN social_platforms sp ON p.platform_id = sp.id
+        WHERE p.status IS NOT NULL
+        GROUP BY p.user_id, sp.type, COALESCE(DATE(p.schedule_time), '1000-01-01'), p.status
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_status_daily_day', table_name='post_status_daily')
+    op.drop_table('post_status_daily')
@@ -0,0 +1,28 @@
+"""Add posts.publish_attempts so a reclaimed post keeps its retry count
+
+Revision ID: b5d2f8e4a6c3
+Revises: a8d4f2c6b1e9
+Create Date: 2026-10-18 21:12:40.518337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f8e4a6c3'
+down_revision: Union[str, Sequence[str], None] = 'a8d4f2c6b1e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('publish_attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'publish_attempts')
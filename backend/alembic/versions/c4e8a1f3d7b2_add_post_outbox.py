@@ -0,0 +1,41 @@
+"""Add post_outbox table for transactional task dispatch
+
+Revision ID: c4e8a1f3d7b2
+Revises: 9f2d4b6e8a13
+Create Date: 2026-10-18 14:22:07.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f3d7b2'
+down_revision: Union[str, Sequence[str], None] = '9f2d4b6e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('post_outbox',
+    sa.Column('post_id', sa.BigInteger(), nullable=False),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('modified_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_post_outbox_id'), 'post_outbox', ['id'], unique=False)
+    op.create_index('ix_post_outbox_sent_at_id', 'post_outbox', ['sent_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_outbox_sent_at_id', table_name='post_outbox')
+    op.drop_index(op.f('ix_post_outbox_id'), table_name='post_outbox')
+    op.drop_table('post_outbox')
@@ -0,0 +1,32 @@
+"""Add (created_at, id) indexes for keyset pagination of the post list
+
+Revision ID: e7b3d9a2c5f1
+Revises: c4e8a1f3d7b2
+Create Date: 2026-10-18 16:48:31.902214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d9a2c5f1'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f3d7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_user_id_created_at_id', 'posts', ['user_id', 'created_at', 'id'], unique=False)
+    op.drop_index('ix_posts_created_at', table_name='posts')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_posts_created_at', 'posts', ['created_at'], unique=False)
+    op.drop_index('ix_posts_user_id_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
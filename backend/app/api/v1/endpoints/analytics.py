@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
 
-from app.dependencies import get_db
+from app.dependencies import get_async_db, get_db
 from app.services.analytics import AnalyticsService
-from app.schemas.analytics import PostSummaryResponse, AiInsightResponse
+from app.schemas.analytics import PostSummaryResponse, PostTimeseriesResponse, AiInsightResponse
+from app.schemas.enums import TimeBucket
 from app.models.enums import PlatformType
+from app.utils.responses import ModelResponse
 
 router = APIRouter()
 
@@ -27,12 +30,31 @@ def get_posts_summary(
     )
     return summary
 
+@router.get("/analytics/posts/timeseries", response_model=PostTimeseriesResponse)
+def get_posts_timeseries(
+    start_date: datetime = Query(..., description="Count posts scheduled at or after this date (UTC)"),
+    end_date: datetime = Query(..., description="Count posts scheduled at or before this date (UTC)"),
+    bucket: TimeBucket = Query(TimeBucket.DAY, description="Bucket size; buckets start on UTC hours, days or Mondays"),
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    platform_type: Optional[PlatformType] = Query(None, description="Filter by social platform type"),
+    db: Session = Depends(get_db),
+):
+    """Post counts per time bucket, platform and status. Buckets at the ends of the range only count posts inside it."""
+    service = AnalyticsService(db)
+    try:
+        series = service.get_post_timeseries(
+            bucket, start_date, end_date, user_id=user_id, platform_type=platform_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ModelResponse(series)
+
 @router.get("/analytics/ai-insight", response_model=AiInsightResponse)
 async def get_ai_insight(
     user_id: int = Query(..., description="User ID for AI provider selection"),
     query: Optional[str] = Query(None, description="Optional context for AI insight generation"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    service = AnalyticsService(db)
+    service = AnalyticsService(async_db=db)
     insight = await service.get_ai_insight(user_id=user_id, query=query)
     return insight
\ No newline at end of file
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+
+from app.core.platform_cache import platform_cache
+from app.core.read_cache import post_detail_cache, post_summary_cache, post_timeseries_cache
+from app.database.session import engines
+
+router = APIRouter()
+
+@router.get("/metrics")
+def get_metrics():
+    """Process-local counters of this API process."""
+    return {
+        "platform_cache": platform_cache.stats(),
+        "read_cache": {
+            "post_detail": post_detail_cache.stats(),
+            "post_summary": post_summary_cache.stats(),
+            "post_timeseries": post_timeseries_cache.stats(),
+        },
+        "database_pools": engines.pool_status(),
+    }
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import anyio
 from typing import Optional, List
 from pydantic import ValidationError
 import json
 
-from app.dependencies import get_db
+from app.dependencies import get_async_db, get_db
 from app.schemas.post import (
     PostSubmitRequest, PostSubmitResponse, PostListResponse,
     PostDetailResponse, AISuggestionsRequest, AISuggestionsResponse, get_post_submit_form,
-    AIBestTimeRequest, AIBestTimeResponse
+    AIBestTimeRequest, AIBestTimeResponse, BulkSubmitResponse
 )
+from app.core.config import settings
+from app.services.bulk_ingest import CSV_FORMAT, NDJSON_FORMAT, parse_rows
 from app.utils.logger import get_logger
 from app.services.post import PostService
 from app.utils.image_storage import save_upload_file_as_jpg
+from app.utils.responses import conditional_response, etag_matches, not_modified
 
 logger = get_logger(__name__)
 
@@ -34,7 +40,8 @@ async def submit_post(
             image_path = await save_upload_file_as_jpg(image, subdir=str(form_data.user_id))
 
         service = PostService(db)
-        return service.submit(form_data.dict(), image_file_path=image_path)
+        # The submit is a sync unit of work; keep it off the event loop
+        return await run_in_threadpool(service.submit, form_data.dict(), image_file_path=image_path)
     except ValidationError as e:
         print(f"Validation error: {e}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -42,25 +49,96 @@ async def submit_post(
         logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+_BULK_CONTENT_TYPES = {
+    "text/csv": CSV_FORMAT,
+    "application/x-ndjson": NDJSON_FORMAT,
+    "application/ndjson": NDJSON_FORMAT,
+    "application/jsonl": NDJSON_FORMAT,
+}
+
+@router.post("/posts/bulk", response_model=BulkSubmitResponse)
+async def bulk_submit_posts(
+    req: Request,
+    format: Optional[str] = Query(None, pattern=f"^({CSV_FORMAT}|{NDJSON_FORMAT})$"),
+    batch_size: Optional[int] = Query(None, ge=1, le=settings.BULK_INGEST_MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Schedules a content calendar streamed as CSV or NDJSON rows of PostSubmitRequest fields.
+
+    The format comes from `format` or the Content-Type. The body is read, parsed and inserted
+    batch by batch as it arrives; invalid rows are reported by row number instead of failing the upload.
+    """
+    content_type = req.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or _BULK_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson",
+        )
+
+    stream = req.stream()
+
+    def read_chunks():
+        # Runs in the worker thread and pulls the body from the event loop one chunk at a time
+        while True:
+            try:
+                yield anyio.from_thread.run(stream.__anext__)
+            except StopAsyncIteration:
+                return
+
+    service = PostService(db)
+    return await run_in_threadpool(service.bulk_submit, parse_rows(read_chunks(), fmt), batch_size)
+
 @router.get("/posts", response_model=PostListResponse)
-def list_posts(req: Request, limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+def list_posts(
+    req: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user_id: Optional[int] = Query(None, description="Only this user's posts"),
+    include_total: bool = Query(False, description="Also count all matching posts (a full scan)"),
+    db: Session = Depends(get_db),
+):
+    """One page of posts. Send the ETag back in If-None-Match to get a 304 while the page is unchanged."""
+    if "offset" in req.query_params:
+        # Ignoring it would quietly hand back the first page again
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="offset is not supported; pass the next_cursor of the previous page as cursor",
+        )
     service = PostService(db)
-    return service.list(limit=limit, offset=offset)
+    params = dict(limit=limit, cursor=cursor, user_id=user_id, include_total=include_total)
+    try:
+        if_none_match = req.headers.get("if-none-match")
+        if if_none_match:
+            etag = service.list_etag(**params)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        page, etag = service.list(**params)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return conditional_response(page, etag)
 
 @router.get("/post/{post_id}", response_model=PostDetailResponse)
 def get_post(req: Request, post_id: int, db: Session = Depends(get_db)):
+    """A post. Send the ETag back in If-None-Match to get a 304 while it is unchanged."""
     service = PostService(db)
-    detail = service.detail(post_id)
-    if not detail:
+    if_none_match = req.headers.get("if-none-match")
+    if if_none_match:
+        etag = service.detail_etag(post_id)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    found = service.detail(post_id)
+    if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    return detail
+    detail, etag = found
+    return conditional_response(detail, etag)
 
 @router.post("/suggest-hashtag", response_model=AISuggestionsResponse)
-async def suggest_hashtag(req: Request, payload: AISuggestionsRequest, db: Session = Depends(get_db)):
-    service = PostService(db)
+async def suggest_hashtag(req: Request, payload: AISuggestionsRequest, db: AsyncSession = Depends(get_async_db)):
+    service = PostService(async_db=db)
     return await service.suggest_hashtags(payload.user_id, payload)
 
 @router.post("/suggest-best-time", response_model=AIBestTimeResponse)
-async def suggest_best_time(req: Request, payload: AIBestTimeRequest, db: Session = Depends(get_db)):
-    service = PostService(db)
+async def suggest_best_time(req: Request, payload: AIBestTimeRequest, db: AsyncSession = Depends(get_async_db)):
+    service = PostService(async_db=db)
     return await service.suggest_best_posting_time(payload)
\ No newline at end of file
@@ -10,6 +10,7 @@ from app.schemas.product import (
 from app.schemas.post import ImageResponse # Import ImageResponse
 from app.dependencies import get_db
 from app.services.product_customization import ProductDesignService # Renamed service
+from app.utils.responses import ModelResponse
 
 
 router = APIRouter()
@@ -26,7 +27,7 @@ def create_product_design(payload: ProductDesignCreateRequest, db: Session = Dep
 def list_product_designs(user_id: int, db: Session = Depends(get_db)):
     service = ProductDesignService(db)
     items = service.list_designs(user_id)
-    return ProductDesignListResponse(items=items, total=len(items))
+    return ModelResponse(ProductDesignListResponse(items=items, total=len(items)))
 
 @router.get("/product-designs/{design_id}", response_model=ProductDesignDetailResponse)
 def get_product_design(design_id: int, db: Session = Depends(get_db)):
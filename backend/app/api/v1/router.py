@@ -2,6 +2,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints import post as post_endpoints
 from app.api.v1.endpoints import product_customization as product_endpoints
 from app.api.v1.endpoints import analytics as analytics_endpoints
+from app.api.v1.endpoints import metrics as metrics_endpoints
 
 
 api_router = APIRouter()
@@ -9,3 +10,4 @@ api_router = APIRouter()
 api_router.include_router(post_endpoints.router, tags=["Post"])
 api_router.include_router(product_endpoints.router, tags=["Product"])
 api_router.include_router(analytics_endpoints.router, tags=["Analytics"])
+api_router.include_router(metrics_endpoints.router, tags=["Metrics"])
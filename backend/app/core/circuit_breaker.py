@@ -0,0 +1,137 @@
+from typing import List, Optional, Sequence, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Decides whether a call to the circuit in KEYS[1] may go ahead. ARGV[1] is the probe timeout in ms.
+# Returns {wait_ms, probe}: wait_ms is 0 when the call may go ahead, and probe is 1 when that call is
+# the single half-open probe. An open circuit turns half-open once open_until has passed.
+_BEFORE_CALL_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local circuit = redis.call('HMGET', KEYS[1], 'state', 'open_until', 'probe_until')
+local state = circuit[1]
+if not state or state == 'closed' then
+    return {0, 0}
+end
+local open_until = tonumber(circuit[2]) or 0
+if now < open_until then
+    return {open_until - now, 0}
+end
+local probe_until = tonumber(circuit[3]) or 0
+if now < probe_until then
+    return {probe_until - now, 0}
+end
+redis.call('HSET', KEYS[1], 'state', 'half_open', 'probe_until', now + tonumber(ARGV[1]))
+return {0, 1}
+"""
+
+# Records the outcome of one call. ARGV: failed (1/0), failure threshold, open duration in ms.
+# A success closes the circuit; a failure in half-open, or the threshold-th consecutive failure
+# while closed, opens it. Returns 1 when this call opened the circuit.
+_RECORD_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state')
+if ARGV[1] == '0' then
+    if state then
+        redis.call('DEL', KEYS[1])
+    end
+    return 0
+end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+if state == 'open' then
+    return 0
+end
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+if state == 'half_open' or failures >= tonumber(ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'state', 'open', 'open_until', now + tonumber(ARGV[3]), 'probe_until', 0)
+    return 1
+end
+redis.call('HSET', KEYS[1], 'state', 'closed')
+return 0
+"""
+
+
+class CircuitBreaker:
+    """Per-platform circuit breakers stored in Redis and shared by every worker process.
+
+    A circuit starts closed. `failure_threshold` consecutive failures open it, and while it is
+    open `before_call` returns how long callers should wait instead of calling the platform.
+    Once `open_seconds` have passed the circuit is half-open: exactly one caller is let through
+    as a probe (another one only if the probe has not reported back within `probe_seconds`).
+    A successful probe closes the circuit, a failed one opens it again.
+
+    If Redis is unreachable the breaker stays out of the way and lets calls through.
+    """
+
+    PREFIX = "circuit"
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        prefix: str = PREFIX,
+        failure_threshold: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        probe_seconds: Optional[float] = None,
+    ):
+        self._client = client
+        self.prefix = prefix
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.open_seconds = open_seconds or settings.CIRCUIT_BREAKER_OPEN_SECONDS
+        self.probe_seconds = probe_seconds or settings.CIRCUIT_BREAKER_PROBE_SECONDS
+        self._scripts = {}
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _script(self, source: str):
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not self.client:
+            script = self._scripts[source] = self.client.register_script(source)
+        return script
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def before_call(self, name: str) -> Tuple[float, bool]:
+        """Returns (seconds to wait, is_probe). A wait of 0 means the call may go ahead."""
+        try:
+            wait_ms, probe = self._script(_BEFORE_CALL_SCRIPT)(
+                keys=[self._key(name)], args=[int(self.probe_seconds * 1000)]
+            )
+            return int(wait_ms) / 1000, bool(probe)
+        except redis.RedisError as e:
+            logger.warning(f"Circuit breaker unavailable, letting calls to {name} through: {e}")
+            return 0.0, False
+
+    def record(self, name: str, failed: bool) -> None:
+        """Records the outcome of one call to `name`."""
+        self.record_many([(name, failed)])
+
+    def record_many(self, outcomes: Sequence[Tuple[str, bool]]) -> None:
+        """Records (name, failed) outcomes in order, in a single round trip."""
+        if not outcomes:
+            return
+        try:
+            script = self._script(_RECORD_SCRIPT)
+            pipe = self.client.pipeline(transaction=False)
+            for name, failed in outcomes:
+                script(
+                    keys=[self._key(name)],
+                    args=[1 if failed else 0, self.failure_threshold, int(self.open_seconds * 1000)],
+                    client=pipe,
+                )
+            opened: List[str] = [name for (name, _), result in zip(outcomes, pipe.execute()) if result]
+            for name in opened:
+                logger.warning(f"Circuit for {name} opened for {self.open_seconds}s")
+        except redis.RedisError as e:
+            logger.warning(f"Circuit breaker unavailable, dropped {len(outcomes)} outcomes: {e}")
+
+
+circuit_breaker = CircuitBreaker()
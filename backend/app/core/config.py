@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from pathlib import Path
 
@@ -12,17 +12,119 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DATABASE_URL: Optional[str] = None
+    # Async driver URL for AsyncSession; derived from the sync URL when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool per engine and process: persistent connections, extra connections opened
+    # under load, how long a checkout waits for one, and when connections are replaced (MySQL
+    # drops idle ones after wait_timeout)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Read replicas (JSON list of URLs) for read-only queries such as post lists and analytics;
+    # a user's reads stay on the primary for READ_YOUR_WRITES_SECONDS after they submit
+    DATABASE_REPLICA_URLS: List[str] = []
+    READ_YOUR_WRITES_SECONDS: int = 10
     JWT_SECRET_KEY: str
     FRONTEND_URL: str
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
     REDIS_URL: str
     USE_DUMMY_AI_PROVIDER: bool = False
+
+    # Batched publishing (see publish_posts_batch)
+    PUBLISH_BATCH_SIZE: int = 100
+    PUBLISH_BATCH_CONCURRENCY: int = 20
+    # How long a PUBLISHING claim is held before the sweeper may reclaim the post
+    PUBLISH_LEASE_SECONDS: int = 300
+    # "event_loop" keeps one asyncio loop per worker process; "asyncio_run" creates one per task
+    PUBLISH_WORKER_MODE: Literal["event_loop", "asyncio_run"] = "event_loop"
+    # Platform calls a single worker process may have in flight at once (event_loop mode)
+    PUBLISH_MAX_IN_FLIGHT: int = 200
+
+    # Redis sorted-set index of scheduled posts (see app/core/schedule_index.py)
+    SCHEDULE_INDEX_ENABLED: bool = True
+    SCHEDULE_INDEX_RECONCILE_SECONDS: int = 600
+    # Only posts due within the horizon become broker messages (with an ETA); the dispatcher
+    # runs every DISPATCH_INTERVAL_SECONDS, which must not exceed the horizon
+    DISPATCH_HORIZON_SECONDS: int = 120
+    DISPATCH_INTERVAL_SECONDS: int = 60
+
+    # Shared token buckets for platform publishing. Each platform's hourly limit comes from its
+    # adapter; accounts get the same limit unless ACCOUNT_RATE_LIMIT_PER_HOUR is set
+    ACCOUNT_RATE_LIMIT_PER_HOUR: Optional[int] = None
+    RATE_LIMIT_BURST: int = 5
+
+    # Retry policy per platform error class (looked up by class name, then its base classes).
+    # max_attempts includes the first attempt; delays are base_delay * 2^n with full jitter, capped at
+    # max_delay; no retry is scheduled later than `deadline` seconds after the post's schedule_time
+    PUBLISH_RETRY_POLICIES: Dict[str, Dict[str, float]] = {
+        "NetworkError": {"max_attempts": 5, "base_delay": 5, "max_delay": 300, "deadline": 3600},
+        "RateLimitError": {"max_attempts": 5, "base_delay": 60, "max_delay": 900, "deadline": 3 * 3600},
+        "ValidationError": {"max_attempts": 1},
+        "PlatformError": {"max_attempts": 3, "base_delay": 10, "max_delay": 300, "deadline": 3600},
+    }
+
+    # Shared per-platform circuit breaker: consecutive failures that open a circuit, how long it
+    # stays open before a half-open probe, and how long a probe may take before another is allowed
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_OPEN_SECONDS: int = 60
+    CIRCUIT_BREAKER_PROBE_SECONDS: int = 30
+
+    # "celery" publishes through the broker and workers; "in_process" runs the asyncio scheduler in
+    # app/services/scheduler.py inside the API process (single-node installs, no broker needed)
+    SCHEDULER_MODE: Literal["celery", "in_process"] = "celery"
+    IN_PROCESS_SCHEDULER_CONCURRENCY: int = 20
+    # How often the in-process scheduler reloads its heap from the database
+    IN_PROCESS_SCHEDULER_RELOAD_SECONDS: int = 300
+
+    # Outbox relay: how often beat runs it (submits also trigger it), rows per broker round trip,
+    # and how long sent rows are kept
+    OUTBOX_RELAY_INTERVAL_SECONDS: int = 5
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RETENTION_HOURS: int = 24
+
+    # Bulk ingest (POST /posts/bulk): rows per transaction, the largest batch a request may ask
+    # for, and how many row errors a response lists
+    BULK_INGEST_BATCH_SIZE: int = 500
+    BULK_INGEST_MAX_BATCH_SIZE: int = 5000
+    BULK_INGEST_MAX_REPORTED_ERRORS: int = 1000
+
+    # Process-local cache of social platform ids and statuses per (user_id, platform type), invalidated
+    # through Redis; if Redis is down, a changed platform is seen elsewhere once the TTL runs out
+    PLATFORM_CACHE_TTL_SECONDS: int = 300
+    PLATFORM_CACHE_MAX_ENTRIES: int = 10000
+
+    # Redis read-through cache of post details and analytics summaries and time series
+    # (app/core/read_cache.py), invalidated when posts are submitted or change status; past
+    # READ_CACHE_MAX_ENTRIES per cache the least recently used entries are evicted
+    READ_CACHE_ENABLED: bool = True
+    POST_DETAIL_CACHE_TTL_SECONDS: int = 300
+    POST_SUMMARY_CACHE_TTL_SECONDS: int = 60
+    READ_CACHE_MAX_ENTRIES: int = 50000
+
+    # Longest /analytics/posts/timeseries response, in buckets of the requested size
+    ANALYTICS_TIMESERIES_MAX_BUCKETS: int = 1000
+
+    # Responses at least this large are compressed (brotli when the client accepts it and the
+    # brotli package is installed, else gzip)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4
     
     def get_database_url(self) -> str:
         if self.DATABASE_URL:
             return self.DATABASE_URL
         return f"mysql+mysqlconnector://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    def get_async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        backend, _, rest = self.get_database_url().partition("://")
+        dialect = backend.split("+")[0]
+        driver = {"mysql": "aiomysql", "sqlite": "aiosqlite"}.get(dialect)
+        return f"{dialect}+{driver}://{rest}" if driver else f"{backend}://{rest}"
     
     def get_jwt_secret_key(self) -> str:
         return self.JWT_SECRET_KEY
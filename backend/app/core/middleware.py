@@ -1,8 +1,126 @@
+from typing import List, Optional
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it responses are gzipped
+    brotli = None
 
 class JWTMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         response: Response = await call_next(request)
         return response
+
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks "br" or "gzip" from an Accept-Encoding header, or None for an uncompressed response."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token.strip()] = quality
+    wildcard = weights.get("*", 0.0)
+    br = weights.get("br", wildcard) if brotli is not None else 0.0
+    gz = weights.get("gzip", wildcard)
+    if br > 0 and br >= gz:
+        return "br"
+    return "gzip" if gz > 0 else None
+
+
+class _Compressor:
+    """Incremental brotli or gzip compressor."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.RESPONSE_BROTLI_QUALITY)
+            self._compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            # wbits 31 writes the gzip header and trailer
+            self._compressor = zlib.compressobj(settings.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._compressor.compress, self._compressor.flush
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compress(data) + (self._finish() if final else b"")
+
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses of at least `minimum_size` bytes with brotli or gzip,
+    as negotiated with Accept-Encoding.
+
+    Body chunks are buffered until they reach `minimum_size` (smaller responses go out as they
+    are); from then on they are compressed as they arrive, so streamed responses stay streamed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size or settings.RESPONSE_COMPRESSION_MIN_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = _negotiate_encoding(Headers(scope=scope).get("accept-encoding", "")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        buffered: List[bytes] = []
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = "content-encoding" in headers or not headers.get("content-type", "").startswith(
+                    _COMPRESSIBLE_TYPES
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                await send({**message, "body": compressor.compress(message.get("body", b""), final=not more_body)})
+                return
+
+            buffered.append(message.get("body", b""))
+            body = b"".join(buffered)
+            if len(body) < self.minimum_size:
+                if not more_body:
+                    await send(start_message)
+                    await send({**message, "body": body})
+                return
+
+            compressor = _Compressor(encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            compressed = compressor.compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+import time
+
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PlatformKey = Tuple[int, Hashable]
+
+
+class CachedPlatform(NamedTuple):
+    id: int
+    status: str
+
+
+class PlatformCache:
+    """Process-local TTL + LRU cache of social platform ids and statuses, keyed by (user_id, PlatformType).
+
+    Only rows that exist are cached; a miss is always looked up again. Entries live for `ttl_seconds`,
+    and past `max_entries` the least recently used entry is dropped.
+
+    Invalidation goes through Redis, so it reaches every API process and Celery worker: each user's
+    platforms, and the cache as a whole, have a generation there, and an entry is only used while the
+    generations it was loaded under are current. A lookup reads them in one MGET. A loader stores
+    what it read under the generations from before its query, so an invalidation that lands while
+    it queries is not lost. If Redis is unavailable, entries are used until their TTL runs out.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        client: Optional[redis.Redis] = None,
+    ):
+        self.ttl_seconds = ttl_seconds or settings.PLATFORM_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.PLATFORM_CACHE_MAX_ENTRIES
+        self._client = client
+        self._entries: "OrderedDict[PlatformKey, Tuple[float, Optional[str], CachedPlatform]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    @staticmethod
+    def _generation_key(user_id: Optional[int] = None) -> str:
+        return "cache:platform:gen" if user_id is None else f"cache:platform:gen:{user_id}"
+
+    def generations(self, user_ids: Iterable[int]) -> Optional[Dict[int, str]]:
+        """The current generation of each user's platforms, or None if Redis is unavailable."""
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return {}
+        try:
+            values = self.client.mget([self._generation_key(), *map(self._generation_key, user_ids)])
+        except redis.RedisError as e:
+            logger.warning(f"Platform cache generations unavailable, trusting entries until their TTL: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+        everything = values[0] or "0"
+        return {user_id: f"{everything}:{value or '0'}" for user_id, value in zip(user_ids, values[1:])}
+
+    def get_many(
+        self, keys: Iterable[PlatformKey]
+    ) -> Tuple[Dict[PlatformKey, CachedPlatform], List[PlatformKey], Optional[Dict[int, str]]]:
+        """Returns (cached entries, keys that were missing, expired or invalidated, the generations
+        to pass to `put_many` with what is loaded for the missing keys)."""
+        keys = set(keys)
+        generations = self.generations(user_id for user_id, _ in keys)
+        found: Dict[PlatformKey, CachedPlatform] = {}
+        missing: List[PlatformKey] = []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now and (generations is None or entry[1] == generations[key[0]]):
+                    self._entries.move_to_end(key)
+                    found[key] = entry[2]
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    missing.append(key)
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing, generations
+
+    def put_many(self, entries: Mapping[PlatformKey, CachedPlatform], generations: Optional[Dict[int, str]]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, platform in entries.items():
+                generation = generations.get(key[0]) if generations is not None else None
+                self._entries[key] = (expires_at, generation, platform)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[PlatformKey] = (), everything: bool = False) -> None:
+        """Drops `keys`, or every entry, here and in every other process."""
+        keys = set(keys)
+        with self._lock:
+            if everything:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+        if everything:
+            generation_keys = [self._generation_key()]
+        else:
+            generation_keys = sorted({self._generation_key(user_id) for user_id, _ in keys})
+        if not generation_keys:
+            return
+        try:
+            # Counters without a TTL: one per user whose platforms changed, and never reused
+            with self.client.pipeline() as pipe:
+                for key in generation_keys:
+                    pipe.incr(key)
+                pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not invalidate platforms in other processes, they expire on their TTL: {e}")
+            with self._lock:
+                self.errors += 1
+
+    def clear(self) -> None:
+        self.invalidate(everything=True)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+platform_cache = PlatformCache()
+
+
+_PENDING = "platform_cache_stale"
+
+
+def invalidate_platforms_on_commit(db: Session, keys: Iterable[PlatformKey] = (), everything: bool = False) -> None:
+    """Like `platform_cache.invalidate`, but once `db` commits, so no process caches the uncommitted rows' old state."""
+    stale_keys, stale_everything = db.info.get(_PENDING, (set(), False))
+    db.info[_PENDING] = (stale_keys | set(keys), stale_everything or everything)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        platform_cache.invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
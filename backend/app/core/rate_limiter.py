@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import redis
+
+from app.core.redis import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Refills and takes one token from every bucket in KEYS, or none of them.
+# ARGV holds (tokens_per_ms, capacity) for each key in order. Uses the Redis server clock so all
+# workers agree on time. Returns 0 when the tokens were taken, otherwise the ms until they all would be.
+_TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(bucket[1]) or capacity
+    local last = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - last) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) / rate))
+    end
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local available = tokens[i]
+    if wait == 0 then
+        available = available - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(available), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate) + 1000)
+end
+return wait
+"""
+
+
+@dataclass(frozen=True)
+class TokenBucket:
+    """A bucket refilled at `limit_per_hour` tokens per hour, holding at most `burst` tokens."""
+    key: str
+    limit_per_hour: int
+    burst: int = 1
+
+    @property
+    def tokens_per_ms(self) -> float:
+        return self.limit_per_hour / 3_600_000
+
+
+class TokenBucketLimiter:
+    """Token buckets stored in Redis and shared by every worker process.
+
+    A request takes one token from each of its buckets (e.g. the platform and the account)
+    atomically. When any bucket is empty nothing is taken and the caller gets the number of
+    seconds until all of them have a token, so it can defer instead of calling the platform.
+
+    If Redis is unreachable the limiter fails open and lets the request through.
+    """
+
+    PREFIX = "ratelimit"
+
+    def __init__(self, client: Optional[redis.Redis] = None, prefix: str = PREFIX):
+        self._client = client
+        self.prefix = prefix
+        self._script = None
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _args(self, buckets: Sequence[TokenBucket]):
+        keys = [f"{self.prefix}:{bucket.key}" for bucket in buckets]
+        args = []
+        for bucket in buckets:
+            args.extend([bucket.tokens_per_ms, max(1, bucket.burst)])
+        return keys, args
+
+    def _registered_script(self):
+        if self._script is None or self._script.registered_client is not self.client:
+            self._script = self.client.register_script(_TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def acquire(self, buckets: Sequence[TokenBucket]) -> float:
+        """Takes a token from every bucket; returns 0, or the seconds to wait before retrying."""
+        return self.acquire_many([buckets])[0]
+
+    def acquire_many(self, requests: List[Sequence[TokenBucket]]) -> List[float]:
+        """Runs `acquire` for several requests in order, in a single round trip."""
+        if not requests:
+            return []
+        try:
+            script = self._registered_script()
+            pipe = self.client.pipeline(transaction=False)
+            for buckets in requests:
+                keys, args = self._args(buckets)
+                script(keys=keys, args=args, client=pipe)
+            return [int(wait_ms) / 1000 for wait_ms in pipe.execute()]
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, letting {len(requests)} requests through: {e}")
+            return [0.0] * len(requests)
+
+
+rate_limiter = TokenBucketLimiter()
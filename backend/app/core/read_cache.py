@@ -0,0 +1,199 @@
+from threading import Lock
+from typing import Callable, Dict, Iterable, Optional, Type, TypeVar
+import time
+
+import redis
+from redis.commands.core import Script
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+# Looks the value up under its scope's current generation and refreshes its LRU rank.
+# KEYS: generation key, value key prefix, LRU index. ARGV: now. Returns {generation, value or nil}.
+_GET_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+local key = KEYS[2] .. '@' .. generation
+local value = redis.call('GET', key)
+if value then
+    redis.call('ZADD', KEYS[3], ARGV[1], key)
+end
+return {generation, value}
+"""
+
+# Stores a value and evicts the least recently used entries past the bound.
+# KEYS: value key, LRU index. ARGV: value, ttl, now, max entries.
+_PUT_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if excess > 0 then
+    local evicted = redis.call('ZPOPMIN', KEYS[2], excess)
+    for i = 1, #evicted, 2 do
+        redis.call('DEL', evicted[i])
+    end
+end
+return excess
+"""
+
+# Moves each scope in KEYS to a fresh generation. ARGV: sequence key, generation TTL.
+_INVALIDATE_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    redis.call('SET', key, redis.call('INCR', ARGV[1]), 'EX', ARGV[2])
+end
+return #KEYS
+"""
+
+
+class ReadThroughCache:
+    """Redis read-through cache of pydantic models, shared by every API process.
+
+    Each entry belongs to a scope (by default its own key), and invalidating a scope moves it
+    to a new generation: entries stored under the old one are never read again and expire on
+    their TTL. A reader that loaded from the database while the scope was invalidated stores
+    its result under the generation it started with, so a stale value cannot outlive the
+    invalidation. At most `max_entries` live entries are kept, least recently used evicted first.
+
+    Redis errors are logged and the value is loaded from the database instead. Hit and miss
+    counters are process-local.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        max_entries: Optional[int] = None,
+        client: Optional[redis.Redis] = None,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries or settings.READ_CACHE_MAX_ENTRIES
+        self._client = client
+        self._scripts: Dict[str, Script] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _script(self, source: str) -> Script:
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not self.client:
+            script = self._scripts[source] = self.client.register_script(source)
+        return script
+
+    def _count(self, hits: int = 0, misses: int = 0, errors: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.errors += errors
+
+    def get_or_load(
+        self, key: str, model: Type[M], load: Callable[[], Optional[M]], scope: Optional[str] = None
+    ) -> Optional[M]:
+        """The cached model for `key`, or `load()`'s result, which is cached unless it is None."""
+        if not settings.READ_CACHE_ENABLED:
+            return load()
+        prefix = f"cache:{self.namespace}"
+        value_key = f"{prefix}:{key}"
+        try:
+            generation, cached = self._script(_GET_SCRIPT)(
+                keys=[f"{prefix}:gen:{scope or key}", value_key, f"{prefix}:lru"], args=[time.time()]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Read cache {self.namespace} unavailable, loading {key} from the database: {e}")
+            self._count(misses=1, errors=1)
+            return load()
+        if cached is not None:
+            self._count(hits=1)
+            return model.model_validate_json(cached)
+
+        self._count(misses=1)
+        value = load()
+        if value is not None:
+            try:
+                self._script(_PUT_SCRIPT)(
+                    keys=[f"{value_key}@{generation}", f"{prefix}:lru"],
+                    args=[value.model_dump_json(), self.ttl_seconds, time.time(), self.max_entries],
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Could not cache {self.namespace} {key}: {e}")
+                self._count(errors=1)
+        return value
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        """Makes every entry in `scopes` stale."""
+        prefix = f"cache:{self.namespace}"
+        keys = [f"{prefix}:gen:{scope}" for scope in set(scopes)]
+        if not keys or not settings.READ_CACHE_ENABLED:
+            return
+        try:
+            # A generation must outlive the entries stored under the previous one
+            self._script(_INVALIDATE_SCRIPT)(keys=keys, args=[f"{prefix}:seq", self.ttl_seconds * 2])
+        except redis.RedisError as e:
+            logger.warning(f"Could not invalidate {len(keys)} {self.namespace} cache scopes: {e}")
+            self._count(errors=1)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+            }
+
+
+post_detail_cache = ReadThroughCache("post_detail", settings.POST_DETAIL_CACHE_TTL_SECONDS)
+post_summary_cache = ReadThroughCache("post_summary", settings.POST_SUMMARY_CACHE_TTL_SECONDS)
+post_timeseries_cache = ReadThroughCache("post_timeseries", settings.POST_SUMMARY_CACHE_TTL_SECONDS)
+
+
+def summary_scope(user_id: Optional[int]) -> str:
+    """Summaries and time series of one user's posts share a scope; those across all users share another."""
+    return f"user:{user_id}" if user_id else "all"
+
+
+def invalidate_posts(post_ids: Iterable[int] = (), user_ids: Iterable[int] = ()) -> None:
+    """Drops the cached detail of `post_ids` and the summaries and time series covering posts of `user_ids`."""
+    post_detail_cache.invalidate(str(post_id) for post_id in post_ids)
+    user_ids = set(user_ids)
+    if user_ids:
+        scopes = [summary_scope(None), *(summary_scope(user_id) for user_id in user_ids)]
+        post_summary_cache.invalidate(scopes)
+        post_timeseries_cache.invalidate(scopes)
+
+
+_PENDING = "read_cache_stale_posts"
+
+
+def invalidate_posts_on_commit(db: Session, post_ids: Iterable[int], user_ids: Iterable[int]) -> None:
+    """Like `invalidate_posts`, but once `db` commits, so no reader can cache the uncommitted rows' old state."""
+    stale_posts, stale_users = db.info.setdefault(_PENDING, (set(), set()))
+    stale_posts.update(post_ids)
+    stale_users.update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        invalidate_posts(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,18 @@
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Returns the process-wide Redis client for REDIS_URL (created lazily).
+
+    redis-py's connection pool detects forks and reconnects in the child.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+import redis
+
+from app.core.redis import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Atomically takes the members due by ARGV[1] (at most ARGV[2]) out of the set, with their scores
+_POP_DUE_SCRIPT = """
+local entries = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+local ids = {}
+for i = 1, #entries, 2 do
+    ids[#ids + 1] = entries[i]
+end
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+end
+return entries
+"""
+
+
+def _score(due: datetime) -> float:
+    # Naive datetimes come back from MySQL DATETIME columns and are stored as UTC
+    return (due if due.tzinfo else due.replace(tzinfo=timezone.utc)).timestamp()
+
+
+class ScheduleIndex:
+    """Redis sorted set of post IDs scored by the epoch time they next need attention.
+
+    SCHEDULED posts are scored by `schedule_time`, or the time they were deferred to if later;
+    PUBLISHING posts by `lease_expires_at`, so an abandoned claim surfaces again once its lease
+    runs out. The dispatcher pops due IDs with
+    ZRANGEBYSCORE instead of scanning `posts`. The database stays the source of truth: every
+    popped ID still goes through the conditional claim, and `rebuild` repairs drift.
+
+    Write methods log and swallow Redis errors (the reconcile job catches up later);
+    `pop_due` and `rebuild` raise so callers can fall back to the database.
+    """
+
+    KEY = "posts:schedule_index"
+
+    def __init__(self, client: Optional[redis.Redis] = None, key: str = KEY):
+        self._client = client
+        self.key = key
+        self._pop_due = None
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def add(self, entries: Iterable[Tuple[int, datetime]]) -> None:
+        """Adds or re-scores (post_id, due_time) entries."""
+        mapping = {str(post_id): _score(due) for post_id, due in entries if due is not None}
+        if not mapping:
+            return
+        try:
+            self.client.zadd(self.key, mapping)
+        except redis.RedisError as e:
+            logger.warning(f"Could not add {len(mapping)} posts to the schedule index: {e}")
+
+    def remove(self, post_ids: Iterable[int]) -> None:
+        members = [str(post_id) for post_id in post_ids]
+        if not members:
+            return
+        try:
+            self.client.zrem(self.key, *members)
+        except redis.RedisError as e:
+            logger.warning(f"Could not remove {len(members)} posts from the schedule index: {e}")
+
+    def pop_due(self, until: datetime, limit: int) -> List[Tuple[int, datetime]]:
+        """Removes and returns up to `limit` (post_id, due_time) entries due at or before `until`, earliest first."""
+        if self._pop_due is None or self._pop_due.registered_client is not self.client:
+            self._pop_due = self.client.register_script(_POP_DUE_SCRIPT)
+        entries = self._pop_due(keys=[self.key], args=[_score(until), limit])
+        return [
+            (int(entries[i]), datetime.fromtimestamp(float(entries[i + 1]), tz=timezone.utc))
+            for i in range(0, len(entries), 2)
+        ]
+
+    def size(self) -> int:
+        return self.client.zcard(self.key)
+
+    def rebuild(self, entries: Iterable[Tuple[int, datetime]], max_post_id: int, chunk_size: int = 1000) -> Tuple[int, int]:
+        """Re-scores every pending post from the database and drops members that are no longer pending.
+
+        `max_post_id` is the highest post ID when the snapshot was taken. Entries are merged into
+        the live set rather than swapped in, and members above `max_post_id` are kept, so a post
+        submitted while the snapshot was being read is never lost. Returns (indexed, removed).
+        """
+        pending = set()
+        chunk = {}
+        for post_id, due in entries:
+            if due is None:
+                continue
+            pending.add(str(post_id))
+            chunk[str(post_id)] = _score(due)
+            if len(chunk) >= chunk_size:
+                self.client.zadd(self.key, chunk)
+                chunk = {}
+        if chunk:
+            self.client.zadd(self.key, chunk)
+
+        stale = [
+            member for member, _ in self.client.zscan_iter(self.key)
+            if member not in pending and int(member) <= max_post_id
+        ]
+        removed = 0
+        for start in range(0, len(stale), chunk_size):
+            removed += self.client.zrem(self.key, *stale[start:start + chunk_size])
+        return len(pending), removed
+
+schedule_index = ScheduleIndex()
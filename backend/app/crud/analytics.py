@@ -1,14 +1,100 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict, Optional
-from datetime import datetime
+from collections import Counter
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import delete, func, insert, literal_column, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Row
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from datetime import date, datetime, time, timedelta, timezone
 
-from app.models.post import Post
+from app.models.post import Post, PostStatusDaily, UNSCHEDULED_DAY
 from app.models.social_platform import SocialPlatform # Import SocialPlatform for join
 from app.models.enums import PostStatus, PlatformType
-from app.crud.base import BaseCRUD
+from app.schemas.enums import TimeBucket
+from app.crud.base import BaseCRUD, read_only
+
+# (user_id, platform_type, day, status): one post_status_daily row
+RollupKey = Tuple[int, PlatformType, date, PostStatus]
+# (bucket start, platform_type, status): one point of a time series
+BucketKey = Tuple[datetime, PlatformType, PostStatus]
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive datetimes are UTC, as stored in schedule_time
+    return value.astimezone(timezone.utc) if value.tzinfo else value
+
+
+def _day_start(day: date, like: datetime) -> datetime:
+    """Midnight UTC of `day`, naive or aware like `like`."""
+    start = datetime.combine(day, time.min)
+    return start.replace(tzinfo=timezone.utc) if like.tzinfo else start
+
+
+def rollup_day(schedule_time: Optional[datetime]) -> date:
+    return _utc(schedule_time).date() if schedule_time else UNSCHEDULED_DAY
+
+
+def _split_days(
+    start_date: Optional[datetime], end_date: Optional[datetime]
+) -> Tuple[Optional[Tuple[Optional[date], Optional[date]]], List[Tuple[datetime, datetime, bool]]]:
+    """Splits [start_date, end_date] into whole UTC days and the partial days at either end.
+
+    Returns (first_day, last_day), either open-ended as None, or None when the range holds no
+    whole day; and the partial ranges as (start, end, end_inclusive).
+    """
+    first_day = last_day = None
+    if start_date:
+        start = _utc(start_date)
+        first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    if end_date:
+        # The last day is whole only if end_date is at or past its last instant
+        last_day = _utc(end_date).date() - timedelta(days=1)
+    if first_day and last_day and first_day > last_day:
+        # Less than a whole day apart
+        return None, [(start_date, end_date, True)]
+
+    edges = []
+    if start_date and _day_start(first_day, start_date) > start_date:
+        edges.append((start_date, _day_start(first_day, start_date), False))
+    if end_date:
+        edges.append((_day_start(last_day + timedelta(days=1), end_date), end_date, True))
+    return (first_day, last_day), edges
+
+
+# Format strings are inlined rather than bound, so the GROUP BY repeats the select expression
+# exactly (ONLY_FULL_GROUP_BY)
+def _week_start(dialect: str, day: Any) -> Any:
+    """The Monday starting the week of `day`, a DATE expression."""
+    if dialect == "sqlite":
+        # 'weekday 0' moves forward to Sunday, unless it already is one
+        return func.date(day, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+    if dialect == "postgresql":
+        return func.date_trunc(literal_column("'week'"), day)
+    return func.subdate(day, func.weekday(day))
+
+
+def _bucket_start(dialect: str, bucket: TimeBucket, column: Any) -> Any:
+    """The start of the bucket holding `column`, a DATETIME expression."""
+    if bucket == TimeBucket.HOUR:
+        if dialect == "sqlite":
+            return func.strftime(literal_column("'%Y-%m-%d %H:00:00'"), column)
+        if dialect == "postgresql":
+            return func.date_trunc(literal_column("'hour'"), column)
+        return func.date_format(column, literal_column("'%Y-%m-%d %H:00:00'"))
+    day = func.date_trunc(literal_column("'day'"), column) if dialect == "postgresql" else func.date(column)
+    return day if bucket == TimeBucket.DAY else _week_start(dialect, day)
+
+
+def _as_utc_datetime(value: Any) -> datetime:
+    """A bucket start as the database returned it (a string, date or datetime), as an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    return _utc(value).replace(tzinfo=timezone.utc)
+
 
 class AnalyticsCRUD(BaseCRUD):
+    @read_only
     def get_post_counts_by_status(
         self,
         user_id: Optional[int] = None,
@@ -16,24 +102,198 @@ class AnalyticsCRUD(BaseCRUD):
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[PostStatus, int]:
-        query = self.db.query(Post.status, func.count(Post.id))
+        """Posts by status whose schedule_time is within [start_date, end_date].
+
+        Whole UTC days are summed from post_status_daily; only the partial days at either end
+        of the range are counted from `posts`.
+        """
+        # Initialize all possible statuses to 0 to ensure all are present in the response
+        counts = {status: 0 for status in PostStatus}
+
+        days, edges = _split_days(start_date, end_date)
+        rows = []
+        if days:
+            rows += self._rollup_counts(
+                [PostStatusDaily.status], user_id, platform_type, *days, dated=bool(start_date or end_date)
+            )
+        for start, end, end_inclusive in edges:
+            rows += self._post_counts([Post.status], user_id, platform_type, start, end, end_inclusive)
+        for status, count in rows:
+            if status is not None:
+                counts[status] += int(count or 0)
+        return counts
+
+    @read_only
+    def get_post_counts_by_bucket(
+        self,
+        bucket: TimeBucket,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[int] = None,
+        platform_type: Optional[PlatformType] = None,
+    ) -> Dict[BucketKey, int]:
+        """Posts whose schedule_time is within [start_date, end_date], by UTC time bucket, platform and status.
+
+        Buckets are computed by the database. Day and week buckets sum the whole days of the
+        range from post_status_daily and count only its partial end days from `posts`; hour
+        buckets are counted from `posts`. Buckets without posts are left out.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if bucket == TimeBucket.HOUR:
+            days, edges = None, [(start_date, end_date, True)]
+        else:
+            days, edges = _split_days(start_date, end_date)
+
+        rows = []
+        if days:
+            day = PostStatusDaily.day
+            keys = [day if bucket == TimeBucket.DAY else _week_start(dialect, day), PostStatusDaily.platform_type, PostStatusDaily.status]
+            rows += self._rollup_counts(keys, user_id, platform_type, *days, dated=True)
+        for start, end, end_inclusive in edges:
+            keys = [_bucket_start(dialect, bucket, Post.schedule_time), SocialPlatform.type, Post.status]
+            rows += self._post_counts(keys, user_id, platform_type, start, end, end_inclusive, join_platform=True)
+
+        counts: Counter = Counter()
+        for start, platform, status, count in rows:
+            if status is not None:
+                counts[(_as_utc_datetime(start), platform, status)] += int(count or 0)
+        return dict(counts)
+
+    def _rollup_counts(
+        self,
+        keys: Sequence[Any],
+        user_id: Optional[int],
+        platform_type: Optional[PlatformType],
+        first_day: Optional[date],
+        last_day: Optional[date],
+        dated: bool,
+    ) -> List[Row]:
+        """post_count summed by `keys`, as (*keys, count) rows."""
+        query = self.db.query(*keys, func.sum(PostStatusDaily.post_count))
+        if user_id:
+            query = query.filter(PostStatusDaily.user_id == user_id)
+        if platform_type:
+            query = query.filter(PostStatusDaily.platform_type == platform_type)
+        if first_day:
+            query = query.filter(PostStatusDaily.day >= first_day)
+        if last_day:
+            query = query.filter(PostStatusDaily.day <= last_day)
+        if dated:
+            # A date filter leaves out posts without a schedule_time, as it does on `posts`
+            query = query.filter(PostStatusDaily.day != UNSCHEDULED_DAY)
+        return query.group_by(*keys).all()
+
+    def _post_counts(
+        self,
+        keys: Sequence[Any],
+        user_id: Optional[int],
+        platform_type: Optional[PlatformType],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        end_inclusive: bool = True,
+        join_platform: bool = False,
+    ) -> List[Row]:
+        """Posts counted by `keys`, as (*keys, count) rows. `join_platform` when a key is on SocialPlatform."""
+        query = self.db.query(*keys, func.count(Post.id))
 
         if user_id:
             query = query.filter(Post.user_id == user_id)
-        
+
+        if platform_type or join_platform:
+            query = query.join(SocialPlatform, Post.platform_id == SocialPlatform.id)
         if platform_type:
-            query = query.join(SocialPlatform).filter(SocialPlatform.type == platform_type)
+            query = query.filter(SocialPlatform.type == platform_type)
 
         if start_date:
             query = query.filter(Post.schedule_time >= start_date)
         if end_date:
-            query = query.filter(Post.schedule_time <= end_date)
+            query = query.filter(Post.schedule_time <= end_date if end_inclusive else Post.schedule_time < end_date)
 
-        results = query.group_by(Post.status).all()
-        
-        # Initialize all possible statuses to 0 to ensure all are present in the response
-        counts = {status: 0 for status in PostStatus}
-        for status, count in results:
-            counts[status] = count
-            
-        return counts
+        return query.group_by(*keys).all()
+
+
+class PostStatusDailyCRUD(BaseCRUD):
+    """Keeps post_status_daily in step with `posts`.
+
+    Status writes are bracketed by two snapshots of the posts they touch (`snapshot` before,
+    under a row lock, and after); `record` writes the difference, so posts the statement did
+    not change cancel out.
+    """
+
+    def snapshot(self, post_ids: Iterable[int], lock: bool = False) -> Dict[int, RollupKey]:
+        """The rollup key of each post, by post ID. `lock` holds the rows until the transaction ends."""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return {}
+        query: Query = (
+            self.db.query(Post.id, Post.user_id, SocialPlatform.type, Post.schedule_time, Post.status)
+            .join(SocialPlatform, Post.platform_id == SocialPlatform.id)
+            .filter(Post.id.in_(post_ids), Post.status.isnot(None))
+        )
+        if lock and self.db.get_bind().dialect.name != "sqlite":
+            query = query.with_for_update(of=Post)
+        return {
+            post_id: (user_id, platform_type, rollup_day(schedule_time), status)
+            for post_id, user_id, platform_type, schedule_time, status in query.all()
+        }
+
+    def record(self, before: Mapping[int, RollupKey], after: Mapping[int, RollupKey]) -> None:
+        """Moves each post's count from its key in `before` to its key in `after`."""
+        deltas: Counter = Counter()
+        for key in before.values():
+            deltas[key] -= 1
+        for key in after.values():
+            deltas[key] += 1
+        self.add(deltas)
+
+    def add(self, deltas: Mapping[RollupKey, int]) -> None:
+        """Adds each delta to its row, creating missing rows, with one multi-row upsert."""
+        rows = [
+            {"user_id": user_id, "platform_type": platform_type, "day": day, "status": status, "post_count": delta}
+            for (user_id, platform_type, day, status), delta in deltas.items()
+            if delta
+        ]
+        if not rows:
+            return
+        table = PostStatusDaily.__table__
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql.insert(table)
+            stmt = stmt.on_duplicate_key_update(post_count=table.c.post_count + stmt.inserted.post_count)
+        else:
+            stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[c.name for c in table.primary_key.columns],
+                set_={"post_count": table.c.post_count + stmt.excluded.post_count},
+            )
+        self.db.execute(stmt, rows)
+
+    def rebuild_users(self, first_user_id: int, last_user_id: int) -> int:
+        """Recounts the rows of users first_user_id..last_user_id from `posts`; the caller commits.
+
+        Returns the number of rollup rows written.
+        """
+        # Inline, so the GROUP BY repeats the select expression exactly (ONLY_FULL_GROUP_BY)
+        day = func.coalesce(func.date(Post.schedule_time), literal_column(f"'{UNSCHEDULED_DAY.isoformat()}'"))
+        counts = (
+            select(Post.user_id, SocialPlatform.type, day, Post.status, func.count())
+            .join(SocialPlatform, Post.platform_id == SocialPlatform.id)
+            .where(Post.user_id.between(first_user_id, last_user_id), Post.status.isnot(None))
+            .group_by(Post.user_id, SocialPlatform.type, day, Post.status)
+        )
+        table = PostStatusDaily.__table__
+        self.db.execute(delete(table).where(table.c.user_id.between(first_user_id, last_user_id)))
+        result = self.db.execute(
+            insert(table).from_select(["user_id", "platform_type", "day", "status", "post_count"], counts)
+        )
+        return result.rowcount
+
+    def user_ids(self, after: Optional[int], limit: int) -> List[int]:
+        """Up to `limit` distinct IDs of users with posts, above `after`, in order.
+
+        Keyset over the user_id indexes, so sparse or very large IDs cost nothing extra.
+        """
+        query = self.db.query(Post.user_id).distinct()
+        if after is not None:
+            query = query.filter(Post.user_id > after)
+        return [user_id for user_id, in query.order_by(Post.user_id).limit(limit)]
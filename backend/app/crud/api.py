@@ -1,9 +1,9 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import asc
+from sqlalchemy import asc, select
 from app.models.api import Api
 from app.models.enums import ApiType
-from app.crud.base import BaseCRUD
+from app.crud.base import AsyncBaseCRUD, BaseCRUD
 
 class ApiCRUD(BaseCRUD):
     def get_by_user_and_type(self, user_id: int, api_type: ApiType) -> Optional[Api]:
@@ -23,4 +23,23 @@ class ApiCRUD(BaseCRUD):
             .filter(Api.user_id == user_id)
             .order_by(asc(Api.load))
             .first()
-        )
\ No newline at end of file
+        )
+
+
+class AsyncApiCRUD(AsyncBaseCRUD):
+    async def get_by_user_and_type(self, user_id: int, api_type: ApiType) -> Optional[Api]:
+        result = await self.db.execute(
+            select(Api).filter(Api.user_id == user_id, Api.type == api_type).limit(1)
+        )
+        return result.scalars().first()
+
+    async def list_by_user(self, user_id: int) -> List[Api]:
+        result = await self.db.execute(select(Api).filter(Api.user_id == user_id))
+        return list(result.scalars().all())
+
+    async def get_best_api_by_load(self, user_id: int) -> Optional[Api]:
+        """Finds the API with the lowest load for a given user."""
+        result = await self.db.execute(
+            select(Api).filter(Api.user_id == user_id).order_by(asc(Api.load)).limit(1)
+        )
+        return result.scalars().first()
@@ -1,3 +1,6 @@
+from functools import wraps
+from typing import Any, Callable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.exceptions import DatabaseException
@@ -5,6 +8,20 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+def read_only(method):
+    """Runs a CRUD read on a read replica when the session routes them (RoutingSession).
+
+    A `user_id` keyword argument keeps the reads of a user who just wrote on the primary.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        replica_reads = getattr(self.db, "replica_reads", None)
+        if replica_reads is None:
+            return method(self, *args, **kwargs)
+        with replica_reads(user_id=kwargs.get("user_id")):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class BaseCRUD:
     def __init__(self, db: Session):
         self.db = db
@@ -19,3 +36,40 @@ class BaseCRUD:
             logger.error(f"Database operation failed: {e}", exc_info=True)
             self.db.rollback()
             raise DatabaseException(operation="BaseCRUD.commit_and_refresh")
+
+    def create_many(self, instances: List[Any], before_commit: Optional[Callable[[List[int]], None]] = None) -> List[int]:
+        """Inserts `instances` (and anything they cascade to) in one flush and commit.
+
+        `before_commit` receives the new primary keys and may write more rows in the same transaction.
+        Returns the primary keys, read before the commit expires them, so callers need no refresh.
+        """
+        try:
+            self.db.add_all(instances)
+            self.db.flush()
+            ids = [instance.id for instance in instances]
+            if before_commit:
+                before_commit(ids)
+            self.db.commit()
+            return ids
+        except Exception as e:
+            logger.error(f"Database operation failed: {e}", exc_info=True)
+            self.db.rollback()
+            raise DatabaseException(operation="BaseCRUD.create_many", details=str(getattr(e, "orig", e)))
+
+
+class AsyncBaseCRUD:
+    """Counterpart of BaseCRUD for an AsyncSession, used by async endpoints."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def commit_and_refresh(self, instance):
+        try:
+            self.db.add(instance)
+            await self.db.commit()
+            await self.db.refresh(instance)
+            return instance
+        except Exception as e:
+            logger.error(f"Database operation failed: {e}", exc_info=True)
+            await self.db.rollback()
+            raise DatabaseException(operation="AsyncBaseCRUD.commit_and_refresh")
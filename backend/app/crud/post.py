@@ -1,30 +1,132 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, object_session
+from sqlalchemy import and_, event, insert, or_
+from typing import List, Optional, Tuple
 from datetime import datetime
-from app.models.post import Post
+from app.models.image import Image
+from app.models.post import Post, PostOutbox
+from app.models.social_platform import SocialPlatform
 from app.models.enums import PostStatus
-from app.crud.base import BaseCRUD
+from app.crud.analytics import PostStatusDailyCRUD
+from app.crud.base import BaseCRUD, read_only
+from app.core.read_cache import invalidate_posts_on_commit
 
 class PostCRUD(BaseCRUD):
     def get(self, post_id: int) -> Optional[Post]:
         return self.db.query(Post).filter(Post.id == post_id).first()
 
-    def list(self, limit: int, offset: int) -> List[Post]:
+    def _view_query(self, *columns) -> Query:
+        """Post columns plus the platform type, image and the `text`/`hashtags` parts of
+        content_text, in one query with joins instead of per-row lazy loads."""
         return (
-            self.db.query(Post)
-            .order_by(Post.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+            self.db.query(
+                Post.id,
+                Post.product_id,
+                Post.schedule_time,
+                Post.status,
+                Post.created_at,
+                Post.content_text["text"].as_string().label("text"),
+                Post.content_text["hashtags"].label("hashtags"),
+                SocialPlatform.type.label("platform_type"),
+                Image.id.label("image_id"),
+                Image.path.label("image_path"),
+                *columns,
+            )
+            .join(SocialPlatform, Post.platform_id == SocialPlatform.id)
+            .outerjoin(Image, Post.image_id == Image.id)
+        )
+
+    def get_detail(self, post_id: int) -> Optional[Row]:
+        """The columns the post detail response needs, read from the primary."""
+        return (
+            self._view_query(
+                Post.user_id,
+                Post.published_at,
+                Post.content_tone,
+                Post.modified_at,
+                Post.content_text["target_audience"].as_string().label("target_audience"),
+                Post.content_text["call_to_action"].as_string().label("call_to_action"),
+            )
+            .filter(Post.id == post_id)
+            .first()
         )
 
-    def count(self) -> int:
-        return self.db.query(Post).count()
+    @read_only
+    def find_detail(self, post_id: int) -> Optional[Row]:
+        """Like `get_detail`, but may read from a replica."""
+        return self.get_detail(post_id)
+
+    def get_version(self, post_id: int) -> Optional[Row]:
+        """(modified_at, status) of a post, read from the primary: enough to tell whether its detail changed."""
+        return self.db.query(Post.modified_at, Post.status).filter(Post.id == post_id).first()
+
+    @read_only
+    def find_version(self, post_id: int) -> Optional[Row]:
+        """Like `get_version`, but may read from a replica."""
+        return self.get_version(post_id)
+
+    def _page(self, query: Query, limit: int, after: Optional[Tuple[datetime, int]], user_id: Optional[int]) -> Query:
+        if user_id is not None:
+            query = query.filter(Post.user_id == user_id)
+        if after is not None:
+            created_at, post_id = after
+            # Spelled out instead of a row-value comparison, which MySQL does not always turn into a
+            # range; the redundant bound on created_at alone gives the planner a range over the
+            # (created_at, id) index to seek into rather than a walk of the whole index
+            query = query.filter(
+                Post.created_at <= created_at,
+                or_(Post.created_at < created_at, and_(Post.created_at == created_at, Post.id < post_id)),
+            )
+        return query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+
+    @read_only
+    def list(
+        self, limit: int, after: Optional[Tuple[datetime, int]] = None, user_id: Optional[int] = None
+    ) -> List[Row]:
+        """Newest posts first, ordered by (created_at, id), as the columns the list response needs
+        plus modified_at for its ETag.
+
+        `after` is the (created_at, id) of the last post of the previous page; the index seek
+        makes every page cost the same.
+        """
+        return self._page(self._view_query(Post.modified_at), limit, after, user_id).all()
+
+    @read_only
+    def list_versions(
+        self, limit: int, after: Optional[Tuple[datetime, int]] = None, user_id: Optional[int] = None
+    ) -> List[Row]:
+        """(id, modified_at, status) of the posts `list` would return, without the joins."""
+        query = self.db.query(Post.id, Post.modified_at, Post.status)
+        return self._page(query, limit, after, user_id).all()
+
+    @read_only
+    def count(self, user_id: Optional[int] = None) -> int:
+        query = self.db.query(Post)
+        if user_id is not None:
+            query = query.filter(Post.user_id == user_id)
+        return query.count()
 
     def create(self, post: Post) -> Post:
         return self.commit_and_refresh(post)
 
+    def create_many(self, posts: List[Post], outbox: bool = False) -> List[int]:
+        """Inserts posts in one flush and commit and returns their IDs.
+
+        The posts are counted into post_status_daily in the same transaction. With `outbox`,
+        the scheduled ones also get their post_outbox rows, with one multi-row INSERT, so the
+        outbox relay dispatches them.
+        """
+        due_times = [post.schedule_time for post in posts]
+
+        def before_commit(post_ids: List[int]) -> None:
+            rollup = PostStatusDailyCRUD(self.db)
+            rollup.record({}, rollup.snapshot(post_ids))
+            rows = [{"post_id": post_id, "due_at": due} for post_id, due in zip(post_ids, due_times) if due]
+            if outbox and rows:
+                self.db.execute(insert(PostOutbox), rows)
+
+        return super().create_many(posts, before_commit=before_commit)
+
     def update(self, post: Post) -> Post:
         return self.commit_and_refresh(post)
 
@@ -35,4 +137,11 @@ class PostCRUD(BaseCRUD):
                 Post.status == PostStatus.SCHEDULED,
                 Post.schedule_time <= now
             )
-        ).options().all()  # Use options() to avoid relationship loading issues 
\ No newline at end of file
+        ).options().all()  # Use options() to avoid relationship loading issues 
+
+
+# ORM writes to posts drop their read cache entries on commit; the publish task's raw SQL does the same itself
+@event.listens_for(Post, "after_update")
+@event.listens_for(Post, "after_delete")
+def _invalidate_changed_post(mapper, connection, target: Post):
+    invalidate_posts_on_commit(object_session(target), [target.id], [target.user_id])
@@ -1,8 +1,10 @@
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from typing import Dict, Iterable, Optional, Tuple
 from app.models.social_platform import SocialPlatform
 from app.models.enums import PlatformType
 from app.crud.base import BaseCRUD
+from app.core.platform_cache import CachedPlatform, invalidate_platforms_on_commit, platform_cache
 
 class SocialPlatformCRUD(BaseCRUD):
     def get_by_user_and_type(self, user_id: int, platform_type: PlatformType) -> Optional[SocialPlatform]:
@@ -12,5 +14,54 @@ class SocialPlatformCRUD(BaseCRUD):
             .first()
         )
 
+    def get_cached(
+        self, pairs: Iterable[Tuple[int, PlatformType]]
+    ) -> Dict[Tuple[int, PlatformType], CachedPlatform]:
+        """Returns the id and status of the platforms for (user_id, type) pairs, from the
+        platform cache where possible. Misses are loaded in one column-only query."""
+        keys = {(int(user_id), PlatformType(platform_type)) for user_id, platform_type in pairs}
+        found, missing, generations = platform_cache.get_many(keys)
+        missing = set(missing)
+        if not missing:
+            return found
+        rows = (
+            self.db.query(SocialPlatform.id, SocialPlatform.user_id, SocialPlatform.type, SocialPlatform.status)
+            .filter(
+                SocialPlatform.user_id.in_({user_id for user_id, _ in missing}),
+                SocialPlatform.type.in_({platform_type for _, platform_type in missing}),
+            )
+            .order_by(SocialPlatform.id)
+            .all()
+        )
+        loaded: Dict[Tuple[int, PlatformType], CachedPlatform] = {}
+        for platform_id, user_id, platform_type, status in rows:
+            key = (user_id, platform_type)
+            if key in missing and key not in loaded:
+                loaded[key] = CachedPlatform(platform_id, status)
+        platform_cache.put_many(loaded, generations)
+        found.update(loaded)
+        return found
+
     def create(self, platform: SocialPlatform) -> SocialPlatform:
-        return self.commit_and_refresh(platform) 
\ No newline at end of file
+        return self.commit_and_refresh(platform)
+
+
+# Keep the platform cache in step with ORM writes once they commit; rows changed by raw SQL wait for the TTL
+@event.listens_for(SocialPlatform, "after_insert")
+def _invalidate_created_platform(mapper, connection, target: SocialPlatform):
+    invalidate_platforms_on_commit(object_session(target), [(target.user_id, target.type)])
+
+
+@event.listens_for(SocialPlatform, "after_update")
+def _invalidate_updated_platform(mapper, connection, target: SocialPlatform):
+    attrs = inspect(target).attrs
+    if attrs.user_id.history.deleted or attrs.type.history.deleted:
+        # The entry is filed under the old key; re-keyed platforms are rare enough to drop everything
+        invalidate_platforms_on_commit(object_session(target), everything=True)
+    elif attrs.status.history.has_changes():
+        invalidate_platforms_on_commit(object_session(target), [(target.user_id, target.type)])
+
+
+@event.listens_for(SocialPlatform, "after_delete")
+def _invalidate_deleted_platform(mapper, connection, target: SocialPlatform):
+    invalidate_platforms_on_commit(object_session(target), [(target.user_id, target.type)])
@@ -0,0 +1,169 @@
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Type
+import itertools
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PoolMetrics:
+    """Counters for one connection pool: checkouts, time spent waiting for a connection,
+    overflow connections opened past pool_size, and checkouts that timed out."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.overflow_events = 0
+            self.timeouts = 0
+
+    def record_checkout(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_events += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times each checkout and counts overflow connections and timeouts into `metrics`.
+
+    Overrides QueuePool internals (`connect`, `_inc_overflow`); a pool rebuilt by
+    `Engine.dispose` keeps its class, and with it the metrics.
+    """
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            logger.warning(f"Database pool exhausted: {self.status()}")
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        # _overflow counts up from -pool_size, so only connections past pool_size are above 0
+        if opened and self._overflow > 0:
+            self.metrics.record_overflow()
+        return opened
+
+
+def _instrumented(pool_class: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    return type(f"Instrumented{pool_class.__name__}", (_InstrumentedPoolMixin, pool_class), {"metrics": metrics})
+
+
+def pool_options(url: str) -> Dict[str, Any]:
+    """Pool settings for `url`. In-memory SQLite keeps SQLAlchemy's single-connection pool."""
+    parsed = make_url(url)
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    return options
+
+
+class EngineManager:
+    """Owns the process's engines: the primary (sync and async) and any read replicas.
+
+    Pools are sized from Settings and instrumented with PoolMetrics. After a fork (Celery
+    prefork children) `after_fork` gives the child fresh pools, without closing the
+    connections the parent still uses. Workers run with `--pool=threads` never fork, so the
+    hook does not run there: every task thread shares the process's pools, which need
+    DB_POOL_SIZE + DB_MAX_OVERFLOW connections for the threads that use the database at once.
+    """
+
+    def __init__(self, url: str, async_url: str, replica_urls: Sequence[str] = ()):
+        self.metrics = {"async": PoolMetrics()}
+        self.engine: Engine = self._create_engine(url, "sync")
+        # Read replicas (sync only), handed out round-robin by `replica`
+        self.replicas: List[Engine] = [
+            self._create_engine(replica_url, f"replica{i}") for i, replica_url in enumerate(replica_urls)
+        ]
+        self._next_replica = itertools.cycle(self.replicas)
+
+        async_options = pool_options(async_url)
+        if "pool_size" in async_options:
+            async_options["poolclass"] = _instrumented(AsyncAdaptedQueuePool, self.metrics["async"])
+        self.async_engine: AsyncEngine = create_async_engine(async_url, **async_options)
+
+    def _create_engine(self, url: str, name: str) -> Engine:
+        self.metrics[name] = PoolMetrics()
+        options = pool_options(url)
+        if "pool_size" in options:
+            options["poolclass"] = _instrumented(QueuePool, self.metrics[name])
+        return create_engine(url, **options)
+
+    def replica(self) -> Optional[Engine]:
+        """The next read replica, or None when none are configured."""
+        return next(self._next_replica) if self.replicas else None
+
+    def _sync_engines(self) -> Dict[str, Engine]:
+        engines = {"sync": self.engine, "async": self.async_engine.sync_engine}
+        engines.update((f"replica{i}", replica) for i, replica in enumerate(self.replicas))
+        return engines
+
+    def after_fork(self) -> None:
+        # close=False drops the inherited connections without closing the sockets the parent owns
+        for engine in self._sync_engines().values():
+            engine.dispose(close=False)
+        for metrics in self.metrics.values():
+            metrics.reset()
+
+    def pool_status(self) -> Dict[str, Dict[str, Any]]:
+        """Current pool occupancy plus the counters, per engine."""
+        status = {}
+        for name, engine in self._sync_engines().items():
+            pool = engine.pool
+            status[name] = {"pool": pool.__class__.__name__, **self.metrics[name].snapshot()}
+            if isinstance(pool, QueuePool):
+                status[name].update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    idle=pool.checkedin(),
+                    overflow=max(pool.overflow(), 0),
+                    max_overflow=pool._max_overflow,
+                )
+        return status
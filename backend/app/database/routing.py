@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Iterable, Iterator, Optional
+import time
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.config import settings
+
+
+class RecentWriters:
+    """Users who wrote within the last `window_seconds`, so their reads can skip lagging replicas.
+
+    Process-local and bounded to `max_users`, dropping the oldest writers first.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, max_users: int = 100000):
+        self.window_seconds = window_seconds if window_seconds is not None else settings.READ_YOUR_WRITES_SECONDS
+        self.max_users = max_users
+        self._until: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = Lock()
+
+    def mark(self, user_ids: Iterable[int]) -> None:
+        until = time.monotonic() + self.window_seconds
+        with self._lock:
+            for user_id in user_ids:
+                self._until[user_id] = until
+                self._until.move_to_end(user_id)
+            while len(self._until) > self.max_users:
+                self._until.popitem(last=False)
+
+    def active(self, user_id: int) -> bool:
+        with self._lock:
+            until = self._until.get(user_id)
+            if until is not None and until <= time.monotonic():
+                del self._until[user_id]
+                until = None
+        return until is not None
+
+
+recent_writers = RecentWriters()
+
+
+class RoutingSession(Session):
+    """Session that runs the statements inside `replica_reads()` on a read replica.
+
+    Everything else goes to the primary, and so do flushes and INSERT/UPDATE/DELETE statements
+    even inside the block. Without replicas it behaves like a plain Session.
+    """
+
+    def __init__(self, *args, replica: Optional[Callable[[], Optional[Engine]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pick_replica = replica
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._replica is not None and not self._flushing and not isinstance(clause, UpdateBase):
+            return self._replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    @contextmanager
+    def replica_reads(self, user_id: Optional[int] = None) -> Iterator[None]:
+        """Sends the reads in the block to a replica, unless `user_id` wrote within the
+        read-your-writes window. Nested blocks reuse the outer choice."""
+        if self._replica is not None or self._pick_replica is None or (
+            user_id is not None and recent_writers.active(user_id)
+        ):
+            yield
+            return
+        self._replica = self._pick_replica()
+        try:
+            yield
+        finally:
+            self._replica = None
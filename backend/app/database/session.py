@@ -1,9 +1,22 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.database.engine import EngineManager
+from app.database.routing import RoutingSession
 
 DATABASE_URL = settings.get_database_url()
 
-engine = create_engine(DATABASE_URL) 
+# Sync engine for the API and workers, an async engine for async endpoints, so their
+# queries do not block the event loop, and the read replicas
+engines = EngineManager(DATABASE_URL, settings.get_async_database_url(), settings.DATABASE_REPLICA_URLS)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = engines.engine
+
+# Read-only CRUD methods go to a replica (see app.crud.base.read_only), the rest to `engine`
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replica=engines.replica
+)
+
+async_engine = engines.async_engine
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -1,4 +1,5 @@
-from app.database.session import SessionLocal
+from app.database.session import AsyncSessionLocal, SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 def get_db():
@@ -7,3 +8,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,17 +1,29 @@
 # app/main.py
-# FastAPI app setup: exception handlers, middleware, and API routers.
+# FastAPI app setup: lifespan, exception handlers, middleware, and API routers.
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.exceptions import HTTPException
 from app.api.v1 import router as v1_router
+from app.core.config import settings
 from app.core.exceptions import ExceptionHandler, BaseAppException
+from app.services.scheduler import post_scheduler
 from app.utils.logger import get_logger
-from app.core.middleware import JWTMiddleware
+from app.core.middleware import CompressionMiddleware, JWTMiddleware
 from starlette.middleware.cors import CORSMiddleware # New import
 
 logger = get_logger()
 exception_handler = ExceptionHandler(logger)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Single-node mode: publish scheduled posts from this process instead of Celery workers
+    if settings.SCHEDULER_MODE == "in_process":
+        await post_scheduler.start()
+    yield
+    await post_scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # New CORS Middleware
 origins = [
@@ -46,5 +58,8 @@ async def generic_exception_handler(request: Request, exc: Exception):
 # No-op JWT middleware placeholder (kept in place for future auth)
 app.add_middleware(JWTMiddleware)
 
+# Outermost, so it compresses every large JSON response
+app.add_middleware(CompressionMiddleware)
+
 # Versioned API router
 app.include_router(v1_router.api_router, prefix="/api/v1")
\ No newline at end of file
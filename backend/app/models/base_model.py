@@ -1,13 +1,25 @@
 from sqlalchemy import Column, BigInteger, DateTime, func
+from sqlalchemy.dialects import sqlite
 from app.database.base import Base
 
+# Whole seconds, like MySQL's DATETIME and SQLite's CURRENT_TIMESTAMP. SQLite compares datetimes
+# as text, so a value bound with the default ".000000" suffix would sort after a stored
+# "...:44" of the same second and break (created_at, id) keyset comparisons.
+_SECONDS = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        timezone=True,
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d",
+    ),
+    "sqlite",
+)
+
 class BaseModel(Base):
     __abstract__ = True
     
     id = Column(BigInteger, primary_key=True, index=True)
 
     created_at = Column(
-        DateTime(timezone=True),
+        _SECONDS,
         server_default=func.now(),
         nullable=False
     )
@@ -40,6 +40,7 @@ class PostStatus(str, enum.Enum):
     PUBLISHED = "published"
     PENDING = "pending"
     SCHEDULED = "scheduled"
+    PUBLISHING = "publishing"
     FAILED = "failed"
 
 class PostTone(str, enum.Enum):
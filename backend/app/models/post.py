@@ -1,16 +1,23 @@
-from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, Text, JSON, Numeric, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, Date, DateTime, Text, JSON, Numeric, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy import func
 import enum
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
-from .base_model import BaseModel
-from .enums import PostType, PostTone, PostStatus, InsightType
+from .base_model import Base, BaseModel
+from .enums import PlatformType, PostType, PostTone, PostStatus, InsightType
 
 
 class Post(BaseModel):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_status_schedule_time", "status", "schedule_time"),  # scheduler sweep and claim
+        Index("ix_posts_status_lease_expires_at", "status", "lease_expires_at"),  # expired PUBLISHING leases
+        Index("ix_posts_user_id_schedule_time", "user_id", "schedule_time"),  # analytics filters
+        Index("ix_posts_created_at_id", "created_at", "id"),  # post list keyset pagination
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),  # per-user post list
+    )
 
     type = Column(SQLEnum(PostType), nullable=False)
     content_text = Column(JSON, nullable=False)  # main post text
@@ -22,6 +29,10 @@ class Post(BaseModel):
     schedule_time = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)
     status = Column(SQLEnum(PostStatus), default=PostStatus.DRAFT)
     published_at = Column(DateTime(timezone=True), nullable=True)
+    # End of the PUBLISHING claim; on a SCHEDULED post, the time it was deferred to (if any)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    # Failed publish attempts so far, so a reclaimed post continues its retry policy where it left off
+    publish_attempts = Column(Integer, nullable=False, default=0, server_default="0")
     remarks = Column(Text, nullable=True)
     api_ids = Column(JSON, nullable=True)  # Stores list of API IDs as JSON
 
@@ -31,6 +42,7 @@ class Post(BaseModel):
     image = relationship("Image", back_populates="posts")
     analyses = relationship("PostAnalysis", back_populates="post", cascade="all, delete-orphan")
     insights = relationship("AiInsight", back_populates="post", cascade="all, delete-orphan")
+    outbox_entries = relationship("PostOutbox", back_populates="post", cascade="all, delete-orphan")
 
 
 class PostAnalysis(BaseModel):
@@ -55,3 +67,44 @@ class AiInsight(BaseModel):
 
     # Relationships
     post = relationship("Post", back_populates="insights")
+
+
+class PostOutbox(BaseModel):
+    """A post waiting to be handed to the dispatcher, written in the same transaction as the post.
+
+    The outbox relay sends unsent rows to the broker in batches and stamps `sent_at`.
+    """
+    __tablename__ = "post_outbox"
+    __table_args__ = (
+        Index("ix_post_outbox_sent_at_id", "sent_at", "id"),  # relay picks unsent rows in order
+    )
+
+    post_id = Column(BigInteger, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    post = relationship("Post", back_populates="outbox_entries")
+
+
+# Day under which post_status_daily counts posts without a schedule_time (MySQL's earliest DATE)
+UNSCHEDULED_DAY = date(1000, 1, 1)
+
+
+class PostStatusDaily(Base):
+    """Number of posts per user, platform type, UTC day of schedule_time and status.
+
+    The rollup behind the analytics summary. The code that inserts posts or changes their
+    status updates it in the same transaction (see PostStatusDailyCRUD);
+    scripts/backfill_post_status_daily.py rebuilds it from `posts`.
+    """
+    __tablename__ = "post_status_daily"
+    __table_args__ = (
+        Index("ix_post_status_daily_day", "day"),  # summaries across all users
+    )
+
+    user_id = Column(BigInteger, primary_key=True)
+    platform_type = Column(SQLEnum(PlatformType), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(SQLEnum(PostStatus), primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)
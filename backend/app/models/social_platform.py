@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, Text, JSON, Numeric, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, Text, JSON, Numeric, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy import func
 import enum
@@ -11,6 +11,9 @@ from .enums import PlatformType, PlatformStatus
 
 class SocialPlatform(BaseModel):
     __tablename__ = "social_platforms"
+    __table_args__ = (
+        Index("ix_social_platforms_user_id_type", "user_id", "type"),
+    )
 
     name = Column(String(255), nullable=False)
     type = Column(SQLEnum(PlatformType), nullable=False)
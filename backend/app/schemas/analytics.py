@@ -2,6 +2,9 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
+from app.models.enums import PlatformType, PostStatus
+from app.schemas.enums import TimeBucket
+
 class PostSummaryResponse(BaseModel):
     total_posts: int
     published_count: int
@@ -10,5 +13,18 @@ class PostSummaryResponse(BaseModel):
     draft_count: int
     # Add other statuses if needed
 
+class PostTimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    platform_type: PlatformType
+    status: PostStatus
+    count: int
+
+class PostTimeseriesResponse(BaseModel):
+    bucket: TimeBucket
+    start_date: datetime
+    end_date: datetime
+    # Ordered by bucket_start; buckets without posts are left out
+    points: List[PostTimeseriesPoint]
+
 class AiInsightResponse(BaseModel):
     insight_text: str
@@ -19,6 +19,7 @@ class PostStatus(str, Enum):
     PUBLISHED = "published"
     PENDING = "pending"
     SCHEDULED = "scheduled"
+    PUBLISHING = "publishing"
     FAILED = "failed"
 
 class PostTone(str, Enum):
@@ -33,3 +34,8 @@ class InsightType(str, Enum):
     CONTENT = "content"
     HASHTAG = "hashtag"
     TIMING = "timing"
+
+class TimeBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
@@ -122,6 +122,17 @@ class PostSubmitResponse(BaseModel):
     message: str
     data: PostSubmitResData
 
+class BulkSubmitRowError(BaseModel):
+    row: int  # 1-based data row; the CSV header is not counted
+    error: str
+
+class BulkSubmitResponse(BaseModel):
+    accepted_rows: int
+    rejected_rows: int
+    posts_created: int
+    errors: List[BulkSubmitRowError]
+    errors_truncated: bool = False  # more rows failed than are listed in `errors`
+
 class AISuggestionsRequest(BaseModel):
     user_id: int
     content_text: str
@@ -166,9 +177,11 @@ class PostListItem(BaseModel):
 
 class PostListResponse(BaseModel):
     posts: List[PostListItem]
-    total: int
     limit: int
-    offset: int
+    # Pass as `cursor` to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+    # Only counted when asked for with include_total
+    total: Optional[int] = None
 
 class PostDetailResponse(BaseModel):
     id: int
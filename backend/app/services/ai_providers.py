@@ -5,7 +5,7 @@ import json
 import asyncio
 from app.models.api import Api
 from app.models.enums import ApiType
-from app.crud.api import ApiCRUD
+from app.crud.api import AsyncApiCRUD
 from app.utils.logger import get_logger
 from app.core.config import settings
 
@@ -127,10 +127,10 @@ PROVIDER_MAP = {
 
 # Factory to select the appropriate AI provider based on load.
 class AIProviderFactory:
-    def __init__(self, api_crud: ApiCRUD):
+    def __init__(self, api_crud: AsyncApiCRUD):
         self.api_crud = api_crud
 
-    def get_provider(self, user_id: int) -> AIProvider:
+    async def get_provider(self, user_id: int) -> AIProvider:
         """
         Selects the best AI provider for a user. If USE_DUMMY_AI_PROVIDER is True,
         it returns a dummy provider. Otherwise, it selects the real provider
@@ -140,7 +140,7 @@ class AIProviderFactory:
             logger.warning(f"DUMMY AI PROVIDER is active. No real API calls will be made.")
             return DummyAIProvider()
 
-        api = self.api_crud.get_best_api_by_load(user_id)
+        api = await self.api_crud.get_best_api_by_load(user_id)
         
         if not api:
             logger.warning(f"No configured AI provider found for user {user_id}. Using fallback.")
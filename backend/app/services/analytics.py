@@ -1,10 +1,14 @@
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.read_cache import post_summary_cache, post_timeseries_cache, summary_scope
 from app.crud.analytics import AnalyticsCRUD
-from app.crud.api import ApiCRUD
-from app.schemas.analytics import PostSummaryResponse, AiInsightResponse
+from app.crud.api import AsyncApiCRUD
+from app.schemas.analytics import PostSummaryResponse, PostTimeseriesPoint, PostTimeseriesResponse, AiInsightResponse
+from app.schemas.enums import TimeBucket
 from app.models.enums import PlatformType, PostStatus
 from app.services.ai_providers import AIProviderFactory
 from app.services.ai_prompt_factory import create_insight_generation_prompt
@@ -12,11 +16,23 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+BUCKET_SIZES = {TimeBucket.HOUR: timedelta(hours=1), TimeBucket.DAY: timedelta(days=1), TimeBucket.WEEK: timedelta(weeks=1)}
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive datetimes are UTC, as the query compares them with UTC schedule times
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _normalize_date(value: Optional[datetime]) -> str:
+    """Cache key part for a date filter: the same instant gives the same key whatever its offset."""
+    return _as_utc(value).isoformat() if value else "*"
+
 class AnalyticsService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None, async_db: Optional[AsyncSession] = None):
+        # AI helpers are called from async endpoints and read through `async_db`
         self.db = db
+        self.async_db = async_db
         self.analytics_crud = AnalyticsCRUD(db)
-        self.api_crud = ApiCRUD(db)
+        self.api_crud = AsyncApiCRUD(async_db)
         self.ai_factory = AIProviderFactory(self.api_crud)
 
     def get_post_summary(
@@ -25,6 +41,31 @@ class AnalyticsService:
         platform_type: Optional[PlatformType] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
+    ) -> PostSummaryResponse:
+        """Post counts by status, read through the summary cache.
+
+        Counts come from a replica when one is configured, so a cached summary can trail the
+        replica's lag until the user's posts next change or the entry expires.
+        """
+        key = "|".join([
+            str(user_id or "*"),
+            platform_type.name if platform_type else "*",
+            _normalize_date(start_date),
+            _normalize_date(end_date),
+        ])
+        return post_summary_cache.get_or_load(
+            key,
+            PostSummaryResponse,
+            lambda: self._load_post_summary(user_id, platform_type, start_date, end_date),
+            scope=summary_scope(user_id),
+        )
+
+    def _load_post_summary(
+        self,
+        user_id: Optional[int],
+        platform_type: Optional[PlatformType],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
     ) -> PostSummaryResponse:
         counts_by_status = self.analytics_crud.get_post_counts_by_status(
             user_id=user_id,
@@ -43,9 +84,64 @@ class AnalyticsService:
             draft_count=counts_by_status.get(PostStatus.DRAFT, 0),
         )
 
+    def get_post_timeseries(
+        self,
+        bucket: TimeBucket,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[int] = None,
+        platform_type: Optional[PlatformType] = None,
+    ) -> PostTimeseriesResponse:
+        """Post counts per UTC time bucket, platform and status, read through the time series cache.
+
+        Raises ValueError for a reversed range or one longer than ANALYTICS_TIMESERIES_MAX_BUCKETS buckets.
+        """
+        span = _as_utc(end_date) - _as_utc(start_date)
+        if span < timedelta(0):
+            raise ValueError("end_date is before start_date")
+        if span > BUCKET_SIZES[bucket] * settings.ANALYTICS_TIMESERIES_MAX_BUCKETS:
+            raise ValueError(
+                f"At most {settings.ANALYTICS_TIMESERIES_MAX_BUCKETS} {bucket.value} buckets; narrow the range or use larger buckets"
+            )
+        key = "|".join([
+            bucket.value,
+            str(user_id or "*"),
+            platform_type.name if platform_type else "*",
+            _normalize_date(start_date),
+            _normalize_date(end_date),
+        ])
+        return post_timeseries_cache.get_or_load(
+            key,
+            PostTimeseriesResponse,
+            lambda: self._load_post_timeseries(bucket, start_date, end_date, user_id, platform_type),
+            scope=summary_scope(user_id),
+        )
+
+    def _load_post_timeseries(
+        self,
+        bucket: TimeBucket,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[int],
+        platform_type: Optional[PlatformType],
+    ) -> PostTimeseriesResponse:
+        counts = self.analytics_crud.get_post_counts_by_bucket(
+            bucket, start_date, end_date, user_id=user_id, platform_type=platform_type
+        )
+        keys = sorted(counts, key=lambda key: (key[0], key[1].name, key[2].name))
+        return PostTimeseriesResponse(
+            bucket=bucket,
+            start_date=start_date,
+            end_date=end_date,
+            points=[
+                PostTimeseriesPoint(bucket_start=start, platform_type=platform, status=status, count=counts[start, platform, status])
+                for start, platform, status in keys
+            ],
+        )
+
     async def get_ai_insight(self, user_id: int, query: Optional[str] = None) -> AiInsightResponse:
         """Generates an AI insight by constructing a prompt and calling the provider's ask method."""
-        provider = self.ai_factory.get_provider(user_id)
+        provider = await self.ai_factory.get_provider(user_id)
         
         prompt = create_insight_generation_prompt(query)
         
@@ -0,0 +1,106 @@
+from datetime import timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+import codecs
+import csv
+import json
+
+from pydantic import ValidationError
+
+from app.schemas.post import PostSubmitRequest
+
+# A parsed row: (1-based row number, the request or the reason it was rejected)
+ParsedRow = Tuple[int, Union[PostSubmitRequest, str]]
+
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
+
+# CSV cells holding lists are comma separated, like the multipart form's hashtags field
+_CSV_LIST_FIELDS = ("platforms", "hashtags", "api_ids")
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decodes a stream of UTF-8 byte chunks into lines (keeping their line endings), one chunk at a time."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        # The last piece may be an unfinished line; keep it for the next chunk
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _to_request(data: Dict[str, Any]) -> PostSubmitRequest:
+    request = PostSubmitRequest(**data)
+    # Naive times are UTC, as in the submit form
+    if request.schedule_time and request.schedule_time.tzinfo is None:
+        request.schedule_time = request.schedule_time.replace(tzinfo=timezone.utc)
+    return request
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """Parses one JSON object per line into submit requests; blank lines are skipped."""
+    row = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            yield row, _to_request(data)
+        except ValidationError as e:
+            yield row, _validation_message(e)
+        except ValueError as e:
+            yield row, f"invalid JSON: {e}"
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """Parses CSV rows (with a header naming PostSubmitRequest fields) into submit requests.
+
+    Empty cells are treated as missing; `platforms`, `hashtags` and `api_ids` are comma separated.
+    """
+    reader = csv.DictReader(lines)
+    row = 0
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            row += 1
+            yield row, f"invalid CSV: {e}"
+            continue
+        row += 1
+        if None in record:
+            yield row, f"expected {len(reader.fieldnames)} columns, got {len(reader.fieldnames) + len(record[None])}"
+            continue
+        data: Dict[str, Any] = {key: value for key, value in record.items() if value not in (None, "")}
+        for field in _CSV_LIST_FIELDS:
+            if field in data:
+                data[field] = [item.strip() for item in data[field].split(",") if item.strip()]
+        try:
+            yield row, _to_request(data)
+        except ValidationError as e:
+            yield row, _validation_message(e)
+
+
+def parse_rows(chunks: Iterable[bytes], fmt: str) -> Iterator[ParsedRow]:
+    lines = iter_lines(chunks)
+    return parse_csv(lines) if fmt == CSV_FORMAT else parse_ndjson(lines)
+
+
+def batched(rows: Iterable[ParsedRow], size: int) -> Iterator[List[ParsedRow]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
@@ -1,29 +1,38 @@
-from typing import List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime, timezone
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import event
 import asyncio
 import json
 
 from app.models.post import Post
 from app.models.image import Image
 from app.models.social_platform import SocialPlatform
-from app.models.enums import PlatformType, PostStatus, PostTone, ImageType, PostType
+from app.models.enums import PlatformType, PostStatus, ImageType, PostType
 from app.schemas.post import (
     PostSubmitRequest, PostSubmitResData, PostSubmitResponse, PostListResponse, PostListItem,
     PostDetailResponse, ImageResponse, AISuggestionsRequest, AISuggestionsResponse, ContentReview,
-    AIBestTimeRequest, AIBestTimeResponse
+    AIBestTimeRequest, AIBestTimeResponse, BulkSubmitResponse, BulkSubmitRowError
 )
+from app.core.exceptions import DatabaseException
 from app.crud.post import PostCRUD
 from app.crud.image import ImageCRUD
 from app.crud.social_platform import SocialPlatformCRUD
-from app.crud.api import ApiCRUD
+from app.crud.api import AsyncApiCRUD
 from app.services.ai_providers import AIProviderFactory
 from app.services.ai_prompt_factory import (
     create_hashtag_suggestion_prompt, create_content_analysis_prompt, create_best_posting_time_prompt
 )
-from app.tasks.services.schedule_post import publish_post_task
+from app.core.config import settings
+from app.core.read_cache import invalidate_posts, post_detail_cache
+from app.database.routing import recent_writers
+from app.services.bulk_ingest import ParsedRow, batched
+from app.services.scheduler import post_scheduler
+from app.tasks.services.schedule_post import relay_post_outbox
 from app.utils.logger import get_logger
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.responses import weak_etag
 
 logger = get_logger(__name__)
 
@@ -48,122 +57,258 @@ def _extract_json(response_str: str, expect_type: str = 'dict') -> Optional[dict
 
 # Orchestrates post business logic: create/list/detail and AI utilities
 class PostService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None, async_db: Optional[AsyncSession] = None):
+        # AI helpers are called from async endpoints and read through `async_db`
         self.db = db
+        self.async_db = async_db
         self.post_crud = PostCRUD(db)
         self.image_crud = ImageCRUD(db)
         self.platform_crud = SocialPlatformCRUD(db)
-        self.api_crud = ApiCRUD(db)
+        self.api_crud = AsyncApiCRUD(async_db)
         self.ai_factory = AIProviderFactory(self.api_crud)
 
-    # ... (no changes to _get_or_create_platform and submit methods)
-    def _get_or_create_platform(self, user_id: int, platform_type: PlatformType) -> SocialPlatform:
-        logger.debug(f"Getting or creating platform {platform_type} for user {user_id}")
-        platform = self.platform_crud.get_by_user_and_type(user_id, platform_type)
-        if platform:
-            return platform
-        platform = SocialPlatform(name=platform_type.value.capitalize(), type=platform_type, user_id=user_id)
-        self.platform_crud.create(platform)
-        return platform
+    def _get_or_create_platforms(
+        self, pairs: Iterable[Tuple[int, PlatformType]]
+    ) -> Dict[Tuple[int, PlatformType], Union[int, SocialPlatform]]:
+        """Resolves (user_id, type) pairs to platform ids, through the platform cache.
 
-    def submit(self, payload: Union[PostSubmitRequest, dict], image_file_path: Optional[str] = None) -> PostSubmitResponse:
-        logger.info("Starting post submission process")
-        if isinstance(payload, dict):
-            payload = PostSubmitRequest(**payload)
+        Missing platforms are returned as new SocialPlatform objects, not flushed; they are
+        inserted together with the posts.
+        """
+        pairs = {(user_id, PlatformType(platform_type)) for user_id, platform_type in pairs}
+        platforms: Dict[Tuple[int, PlatformType], Union[int, SocialPlatform]] = {
+            key: cached.id for key, cached in self.platform_crud.get_cached(pairs).items()
+        }
+        for user_id, platform_type in pairs - platforms.keys():
+            logger.debug(f"Creating platform {platform_type} for user {user_id}")
+            platforms[(user_id, platform_type)] = SocialPlatform(
+                name=platform_type.value.capitalize(), type=platform_type, user_id=user_id
+            )
+        return platforms
 
-        logger.info(f"Submitting post for user {payload.user_id}")
-        
-        image_obj: Optional[Image] = None
-        if image_file_path:
-            logger.info(f"Creating image from file path: {image_file_path}")
-            image_obj = Image(type=ImageType.FILE, path=image_file_path)
-            self.image_crud.create(image_obj)
-        elif getattr(payload, "image_url", None):
-            logger.info(f"Creating image from URL: {payload.image_url}")
-            image_obj = Image(type=ImageType.URL, path=payload.image_url)
-            self.image_crud.create(image_obj)
-
-        logger.info(f"Image object created: {image_obj}")
-
-        platforms_to_process = payload.platforms
-
-        created_posts: List[Post] = []
-        for platform_type in platforms_to_process:
-            logger.info(f"Processing platform: {platform_type.value}")
-            social_platform = self._get_or_create_platform(payload.user_id, platform_type)
-            content_json = {
-                "text": payload.content_text,
-                "hashtags": payload.hashtags or [],
-                "target_audience": payload.target_audience,
-            }
-            status_val = PostStatus.SCHEDULED if payload.schedule_time else PostStatus.PUBLISHED
-            published_at = None
-            if not payload.schedule_time:
-                published_at = datetime.now(timezone.utc)
-            
-            logger.info(f"Creating post for platform: {platform_type.value}")
+    def _build_posts(
+        self,
+        payload: PostSubmitRequest,
+        platforms: Dict[Tuple[int, PlatformType], Union[int, SocialPlatform]],
+        image_obj: Optional[Image],
+    ) -> List[Post]:
+        """Builds one unsaved Post per requested platform, linked to its image object and its
+        platform (by id, or the object itself when it is new)."""
+        content_json = {
+            "text": payload.content_text,
+            "hashtags": payload.hashtags or [],
+            "target_audience": payload.target_audience,
+        }
+        status_val = PostStatus.SCHEDULED if payload.schedule_time else PostStatus.PUBLISHED
+        published_at = None if payload.schedule_time else datetime.now(timezone.utc)
+
+        posts = []
+        for platform_type in payload.platforms:
+            platform = platforms[(payload.user_id, PlatformType(platform_type))]
             post = Post(
                 type=PostType.IMAGE if image_obj else PostType.TEXT,
                 content_text=content_json,
                 content_tone=payload.content_tone,
-                platform_id=social_platform.id,
                 product_id=payload.product_id,
-                image_id=image_obj.id if image_obj else None,
+                image=image_obj,
                 user_id=payload.user_id,
                 schedule_time=payload.schedule_time,
                 status=status_val,
                 api_ids=payload.api_ids,
                 published_at=published_at,
             )
-            self.post_crud.create(post)
-            created_posts.append(post)
-            logger.info(f"Post created with ID: {post.id}")
-
-            def schedule_task(post_id, schedule_time):
-                logger.info(f"Scheduling post {post_id} for {schedule_time}")
-                publish_post_task.apply_async(
-                    args=[post_id],
-                    eta=schedule_time
-                )
-                logger.info(f"Task for post {post_id} sent to Celery.")
-
-            if payload.schedule_time:
-                event.listen(self.db, 'after_commit', lambda session: schedule_task(post.id, payload.schedule_time), once=True)
-
-        first = created_posts[0]
+            if isinstance(platform, SocialPlatform):
+                post.platform = platform
+            else:
+                post.platform_id = platform
+            posts.append(post)
+        return posts
+
+    def _dispatch_scheduled(self, entries: List[Tuple[int, datetime]]) -> None:
+        """Hands committed (post_id, schedule_time) entries to the scheduler."""
+        if not entries:
+            return
+        if settings.SCHEDULER_MODE == "in_process":
+            post_scheduler.submit(entries)
+            return
+        # Relay the outbox now rather than at the next beat tick; if this fails, beat still will
+        try:
+            relay_post_outbox.delay()
+        except Exception as e:
+            logger.warning(f"Could not trigger the outbox relay, leaving it to beat: {e}")
+
+    def _create(
+        self, payloads: List[PostSubmitRequest], image_obj: Optional[Image] = None
+    ) -> List[Tuple[int, Optional[datetime]]]:
+        """Creates one post per platform of every payload as a single unit of work, then schedules them.
+
+        The image, any missing platforms, the posts and their outbox rows are inserted in one
+        transaction and committed once. Returns (post_id, schedule_time) for every post, taken
+        from the payloads so nothing is reloaded.
+        """
+        platforms = self._get_or_create_platforms((p.user_id, t) for p in payloads for t in p.platforms)
+        posts: List[Post] = []
+        due_times: List[Optional[datetime]] = []
+        for payload in payloads:
+            built = self._build_posts(payload, platforms, image_obj)
+            posts.extend(built)
+            due_times.extend([payload.schedule_time] * len(built))
+
+        # In celery mode scheduled posts get outbox rows in the same transaction, so the dispatch cannot be lost
+        post_ids = self.post_crud.create_many(posts, outbox=settings.SCHEDULER_MODE == "celery")
+        created = list(zip(post_ids, due_times))
+        user_ids = {payload.user_id for payload in payloads}
+        recent_writers.mark(user_ids)
+        invalidate_posts(user_ids=user_ids)
+        self._dispatch_scheduled([(post_id, due) for post_id, due in created if due])
+        return created
+
+    def submit(self, payload: Union[PostSubmitRequest, dict], image_file_path: Optional[str] = None) -> PostSubmitResponse:
+        """Creates one post per platform; the response is built from the request, so nothing is reloaded."""
+        logger.info("Starting post submission process")
+        if isinstance(payload, dict):
+            payload = PostSubmitRequest(**payload)
+
+        logger.info(f"Submitting post for user {payload.user_id}")
+
+        image_obj: Optional[Image] = None
+        if image_file_path:
+            image_obj = Image(type=ImageType.FILE, path=image_file_path)
+        elif getattr(payload, "image_url", None):
+            image_obj = Image(type=ImageType.URL, path=payload.image_url)
+
+        created = self._create([payload], image_obj)
+        logger.info(f"Created posts {[post_id for post_id, _ in created]} for platforms {[t.value for t in payload.platforms]}")
+
         return PostSubmitResponse(
             status_code=200,
             status_type="success",
             message="Post submitted successfully",
             data=PostSubmitResData(
-                platforms=[p.platform.type for p in created_posts],
+                platforms=list(payload.platforms),
                 product_id=payload.product_id,
                 schedule_time=payload.schedule_time,
-                status=first.status,
+                status=PostStatus.SCHEDULED if payload.schedule_time else PostStatus.PUBLISHED,
                 hashtags=payload.hashtags or [],
                 target_audience=payload.target_audience,
             )
         )
 
-    def list(self, limit: int, offset: int) -> PostListResponse:
-        items = self.post_crud.list(limit=limit, offset=offset)
-        total = self.post_crud.count()
-        return PostListResponse(
-            posts=[self._to_list_item(p) for p in items],
-            total=total,
+    def bulk_submit(self, rows: Iterable[ParsedRow], batch_size: Optional[int] = None) -> BulkSubmitResponse:
+        """Creates posts from parsed bulk rows, `batch_size` rows per transaction.
+
+        Rows are consumed lazily and each batch goes through the same unit of work as `submit`,
+        so memory stays flat however long the upload is. When a batch fails to insert, its rows
+        are retried one by one so only the offending rows are rejected.
+        """
+        batch_size = batch_size or settings.BULK_INGEST_BATCH_SIZE
+        accepted = rejected = posts_created = 0
+        errors: List[BulkSubmitRowError] = []
+
+        def reject(row: int, error: str) -> None:
+            nonlocal rejected
+            rejected += 1
+            if len(errors) < settings.BULK_INGEST_MAX_REPORTED_ERRORS:
+                errors.append(BulkSubmitRowError(row=row, error=error))
+
+        for batch in batched(rows, batch_size):
+            valid = []
+            for row, parsed in batch:
+                if isinstance(parsed, str):
+                    reject(row, parsed)
+                else:
+                    valid.append((row, parsed))
+            if not valid:
+                continue
+            try:
+                posts_created += len(self._create([payload for _, payload in valid]))
+                accepted += len(valid)
+            except DatabaseException:
+                for row, payload in valid:
+                    try:
+                        posts_created += len(self._create([payload]))
+                        accepted += 1
+                    except DatabaseException as e:
+                        reject(row, str(e.details or e.message))
+
+        logger.info(f"Bulk submit finished: {accepted} rows accepted, {rejected} rejected, {posts_created} posts created")
+        return BulkSubmitResponse(
+            accepted_rows=accepted,
+            rejected_rows=rejected,
+            posts_created=posts_created,
+            errors=errors,
+            errors_truncated=rejected > len(errors),
+        )
+
+    def list(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = False,
+    ) -> Tuple[PostListResponse, str]:
+        """One page of posts, newest first, and its ETag. Raises ValueError for a malformed cursor.
+
+        The total is a full count of the matching posts, so it is only run when asked for.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether there is a next page
+        items = self.post_crud.list(limit=limit + 1, after=after, user_id=user_id)
+        page = items[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(items) > limit else None
+        total = self.post_crud.count(user_id=user_id) if include_total else None
+        response = PostListResponse(
+            posts=[self._to_list_item(p) for p in page],
             limit=limit,
-            offset=offset,
+            next_cursor=next_cursor,
+            total=total,
         )
+        return response, self._list_etag(items, total)
+
+    def list_etag(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = False,
+    ) -> str:
+        """The ETag `list` would return, from a version-only query. Raises ValueError for a malformed cursor."""
+        after = decode_cursor(cursor) if cursor else None
+        versions = self.post_crud.list_versions(limit=limit + 1, after=after, user_id=user_id)
+        total = self.post_crud.count(user_id=user_id) if include_total else None
+        return self._list_etag(versions, total)
 
-    def detail(self, post_id: int) -> Optional[PostDetailResponse]:
-        post = self.post_crud.get(post_id)
-        if not post:
+    @staticmethod
+    def _list_etag(rows: List[Row], total: Optional[int]) -> str:
+        # The extra row is included: it decides next_cursor
+        return weak_etag([(row.id, row.modified_at, row.status) for row in rows] + [total])
+
+    def detail(self, post_id: int) -> Optional[Tuple[PostDetailResponse, str]]:
+        """The post and its ETag, or None if there is no such post. Read through the post detail cache."""
+        detail = post_detail_cache.get_or_load(str(post_id), PostDetailResponse, lambda: self._load_detail(post_id))
+        if not detail:
+            return None
+        return detail, weak_etag([(detail.id, detail.modified_at, detail.status)])
+
+    def _load_detail(self, post_id: int) -> Optional[PostDetailResponse]:
+        if settings.READ_CACHE_ENABLED:
+            # What is cached stays until the post changes, so it must not come from a lagging replica
+            post = self.post_crud.get_detail(post_id)
+        else:
+            # A post missing on the replica may just not have replicated yet
+            post = self.post_crud.find_detail(post_id) or self.post_crud.get_detail(post_id)
+        return self._to_detail(post) if post else None
+
+    def detail_etag(self, post_id: int) -> Optional[str]:
+        """The ETag `detail` would return, from a version-only query."""
+        version = self.post_crud.find_version(post_id) or self.post_crud.get_version(post_id)
+        if not version:
             return None
-        return self._to_detail(post)
+        return weak_etag([(post_id, version.modified_at, version.status)])
 
     async def suggest_hashtags(self, user_id: int, payload: AISuggestionsRequest) -> AISuggestionsResponse:
         """Generates AI suggestions by running hashtag and analysis prompts concurrently."""
-        provider = self.ai_factory.get_provider(user_id)
+        provider = await self.ai_factory.get_provider(user_id)
 
         hashtag_prompt = create_hashtag_suggestion_prompt(payload.content_text, [p.value for p in payload.platform_types])
         analysis_prompt = create_content_analysis_prompt(payload.content_text)
@@ -196,7 +341,7 @@ class PostService:
 
     async def suggest_best_posting_time(self, payload: AIBestTimeRequest) -> AIBestTimeResponse:
         """Suggests the best time to post based on platform and audience."""
-        provider = self.ai_factory.get_provider(payload.user_id)
+        provider = await self.ai_factory.get_provider(payload.user_id)
         prompt = create_best_posting_time_prompt([p.value for p in payload.platform_types], payload.target_audience)
 
         logger.info(f"Requesting best posting time for user {payload.user_id}")
@@ -210,37 +355,36 @@ class PostService:
 
         return AIBestTimeResponse(suggestions=suggestions)
 
-    # ... (no changes to _to_list_item and _to_detail methods)
-    def _to_list_item(self, p: Post) -> PostListItem:
-        image = ImageResponse(id=p.image.id, path=p.image.path) if p.image else None
+    def _to_list_item(self, p: Row) -> PostListItem:
+        image = ImageResponse(id=p.image_id, path=p.image_path) if p.image_id else None
         return PostListItem(
             id=p.id,
-            content_text=p.content_text.get("text") if isinstance(p.content_text, dict) else str(p.content_text),
+            content_text=p.text or "",
             image=image,
-            platforms=[p.platform.type],
+            platforms=[p.platform_type],
             product_id=p.product_id,
             schedule_time=p.schedule_time,
             status=p.status,
-            hashtags=p.content_text.get("hashtags", []) if isinstance(p.content_text, dict) else [],
+            hashtags=p.hashtags or [],
             created_at=p.created_at,
         )
 
-    def _to_detail(self, p: Post) -> PostDetailResponse:
-        image = ImageResponse(id=p.image.id, path=p.image.path) if p.image else None
+    def _to_detail(self, p: Row) -> PostDetailResponse:
+        image = ImageResponse(id=p.image_id, path=p.image_path) if p.image_id else None
         return PostDetailResponse(
             id=p.id,
             user_id=p.user_id,
-            content_text=p.content_text.get("text") if isinstance(p.content_text, dict) else str(p.content_text),
+            content_text=p.text or "",
             image=image,
-            platforms=[p.platform.type],
+            platforms=[p.platform_type],
             product=None,
             schedule_time=p.schedule_time,
             published_at=p.published_at,
             status=p.status,
-            hashtags=p.content_text.get("hashtags", []) if isinstance(p.content_text, dict) else [],
-            target_audience=p.content_text.get("target_audience") if isinstance(p.content_text, dict) else None,
-            call_to_action=p.content_text.get("call_to_action") if isinstance(p.content_text, dict) else None,
+            hashtags=p.hashtags or [],
+            target_audience=p.target_audience,
+            call_to_action=p.call_to_action,
             content_tone=p.content_tone,
             created_at=p.created_at,
             modified_at=p.modified_at,
-        )
\ No newline at end of file
+        )
@@ -1,54 +1,186 @@
-from datetime import datetime, timezone
-import threading
-import time
-from sqlalchemy.orm import Session
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import math
 
+from app.core.config import settings
 from app.database.session import SessionLocal
-from app.models.post import Post
-from app.models.enums import PostStatus
+from app.tasks.services.schedule_post import (
+    _PENDING_POSTS_QUERY, _PUBLISH_ROW_QUERY, _as_utc, _build_content_payload, _claim_post, _outcome,
+    _platform_account_errors, _post_content, _retry_delay, _retry_remarks, _write_publish_results, _write_retries,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class PostPublisherScheduler:
-    def __init__(self, interval_seconds: int = 10):
-        self.interval_seconds = interval_seconds
-        self._thread = None
-        self._stop_event = threading.Event()
+    """Publishes scheduled posts from inside the API process, without Celery, Redis or a broker.
+
+    Keeps a heap of (due_time, post_id) loaded from the database and sleeps exactly until the
+    earliest entry is due; `submit` wakes it up when new posts are scheduled. Due posts go
+    through the same conditional claim as the Celery tasks, so a post is never published twice,
+    even with several API processes. Database work runs in threads, platform calls run on the
+    app's event loop, at most `concurrency` at a time. Transient errors are retried with the
+    same retry policies as the Celery tasks.
+
+    The Redis-backed rate limiter and circuit breaker are not used in this mode.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, reload_seconds: Optional[int] = None):
+        self.concurrency = concurrency or settings.IN_PROCESS_SCHEDULER_CONCURRENCY
+        self.reload_seconds = reload_seconds or settings.IN_PROCESS_SCHEDULER_RELOAD_SECONDS
+        self._heap: List[Tuple[datetime, int]] = []
+        self._in_flight: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        await self._reload()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"In-process scheduler started with {len(self._heap)} pending posts")
+
+    async def stop(self, timeout: float = 10):
+        """Stops dispatching and gives in-flight publishes `timeout` seconds to finish.
+
+        Publishes still running after that are cancelled; their lease runs out and they are picked up again.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        if self._in_flight:
+            _, pending = await asyncio.wait(self._in_flight, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        logger.info("In-process scheduler stopped")
+
+    def submit(self, entries: Iterable[Tuple[int, datetime]]) -> None:
+        """Adds (post_id, due_time) entries to the heap. Safe to call from any thread."""
+        entries = [(_as_utc(due), post_id) for post_id, due in entries if due is not None]
+        if entries and self._loop is not None and self.running:
+            self._loop.call_soon_threadsafe(self._push, entries)
+
+    def _push(self, entries: List[Tuple[datetime, int]]) -> None:
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        self._wakeup.set()
+
+    async def _run(self):
+        next_reload = self._loop.time() + self.reload_seconds
+        while True:
+            now = datetime.now(timezone.utc)
+            while self._heap and self._heap[0][0] <= now:
+                _, post_id = heapq.heappop(self._heap)
+                # Wait for a free slot, so a burst of due posts cannot exceed the concurrency
+                await self._semaphore.acquire()
+                task = asyncio.create_task(self._publish(post_id))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
 
-    def start(self):
-        if self._thread and self._thread.is_alive():
+            if self._loop.time() >= next_reload:
+                await self._reload()
+                next_reload = self._loop.time() + self.reload_seconds
+                continue
+
+            self._wakeup.clear()
+            timeout = next_reload - self._loop.time()
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds())
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0, timeout))
+
+    async def _reload(self):
+        """Merges every pending post in the database into the heap (posts scheduled by other processes,
+        expired leases). Entries that are already in the heap are kept once."""
+        try:
+            loaded = await asyncio.to_thread(self._load_pending)
+        except Exception as e:
+            logger.error(f"In-process scheduler could not load pending posts: {e}", exc_info=True)
             return
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
+        self._heap = list(set(self._heap) | set(loaded))
+        heapq.heapify(self._heap)
 
-    def stop(self):
-        self._stop_event.set()
-        if self._thread:
-            self._thread.join(timeout=2)
+    @staticmethod
+    def _load_pending() -> List[Tuple[datetime, int]]:
+        db = SessionLocal()
+        try:
+            rows = db.execute(_PENDING_POSTS_QUERY).fetchall()
+            return [(_as_utc(due), post_id) for post_id, due in rows if due is not None]
+        finally:
+            db.close()
 
-    def _run(self):
-        while not self._stop_event.is_set():
+    async def _publish(self, post_id: int):
+        try:
+            claimed = await asyncio.to_thread(self._claim, post_id)
+            if claimed is None:
+                return
+            row, account_error = claimed
+            _, content_text, image_path, platform_type, _, schedule_time, _, failed_attempts = row
             try:
-                self._publish_due_posts()
-            except Exception:
-                pass
-            time.sleep(self.interval_seconds)
+                if account_error:
+                    raise account_error
+                result = await _post_content(platform_type, _build_content_payload(content_text, image_path))
+            except Exception as e:
+                result = e
 
-    def _publish_due_posts(self):
+            # The attempt count lives in the post row, so nothing is kept here for posts that
+            # finish, fail for good or disappear
+            delay = await asyncio.to_thread(self._finish, post_id, failed_attempts + 1, schedule_time, result)
+            if delay is not None:
+                self._push([(datetime.now(timezone.utc) + timedelta(seconds=delay), post_id)])
+        except Exception as e:
+            logger.error(f"In-process scheduler failed to publish post {post_id}: {e}", exc_info=True)
+        finally:
+            self._semaphore.release()
+
+    @staticmethod
+    def _claim(post_id: int) -> Optional[Tuple[Any, Any]]:
+        """Claims the post and returns its publish row and account error (if its platform account is
+        not connected), or None if it is not ours to publish."""
+        db = SessionLocal()
+        try:
+            if not _claim_post(db, post_id, datetime.now(timezone.utc)):
+                return None
+            db.commit()
+            row = db.execute(_PUBLISH_ROW_QUERY, {"post_id": post_id}).fetchone()
+            return row, _platform_account_errors(db, [row]).get(post_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _finish(post_id: int, attempt: int, schedule_time: Any, result: Any) -> Optional[float]:
+        """Writes the publish result, or the pending retry; returns the retry delay if there is one."""
         now = datetime.now(timezone.utc)
-        db: Session = SessionLocal()
+        status, remarks = _outcome(post_id, result)
+        delay = _retry_delay(result, attempt, schedule_time, now)
+        db = SessionLocal()
         try:
-            q = (
-                db.query(Post)
-                .filter(Post.status == PostStatus.SCHEDULED)
-                .filter(Post.schedule_time <= now)
-            )
-            posts = q.all()
-            for p in posts:
-                p.status = PostStatus.PUBLISHED
-                p.published_at = now
-                db.add(p)
-            if posts:
-                db.commit()
+            if delay is not None:
+                _write_retries(db, {post_id: (delay, _retry_remarks(attempt, remarks, delay))}, now)
+                logger.warning(f"Post {post_id} will be retried in {math.ceil(delay)}s: {remarks}")
+            else:
+                _write_publish_results(db, {post_id: (status, remarks)}, now)
+                logger.info(f"Post {post_id} finished with status {status.value}")
+            db.commit()
+            return delay
         finally:
-            db.close() 
\ No newline at end of file
+            db.close()
+
+
+post_scheduler = PostPublisherScheduler()
@@ -1,15 +1,41 @@
 from celery import Celery
 from celery.signals import worker_process_init
+from kombu import Queue
 from app.core.config import settings
+from app.models.enums import PlatformType
 
 
 celery_app = Celery("ai-post-scheduler")
 
+
+def publish_queue(platform_type: str) -> str:
+    """Name of the queue that publishes to `platform_type`, e.g. publish.twitter."""
+    return f"publish.{platform_type.lower()}"
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Sends publish tasks carrying a `platform_type` kwarg to that platform's queue.
+
+    Everything else (beat tasks, unrouted batches) stays on the default queue.
+    """
+    platform_type = (kwargs or {}).get("platform_type")
+    if platform_type:
+        return {"queue": publish_queue(platform_type)}
+    return None
+
 @worker_process_init.connect
 def init_worker(**kwargs):
-    """Initialize worker process to avoid thread-local issues."""
+    """Initialize worker process to avoid thread-local issues.
+
+    Only sent to prefork children; a `--pool=threads` worker is a single process and keeps its pools.
+    """
     from celery.app.trace import reset_worker_optimizations
+    from app.database.session import engines
+    from app.tasks.event_loop import worker_loop
     reset_worker_optimizations()
+    # Each forked child gets its own publish event loop and its own database connections
+    worker_loop.reset()
+    engines.after_fork()
 
 celery_app.conf.update(
     broker_url=settings.CELERY_BROKER_URL,
@@ -23,11 +49,24 @@ celery_app.conf.update(
         'app.tasks.services.schedule_post',
     ],
     worker_prefetch_multiplier=1,
-    # Periodic task configuration - runs every minute
+    # One queue per platform, so a backlog on one platform does not hold up the others.
+    # Workers started without -Q consume all of them.
+    task_default_queue='celery',
+    task_queues=[Queue('celery')] + [Queue(publish_queue(platform.value)) for platform in PlatformType],
+    task_routes=(route_task,),
+    # Periodic task configuration
     beat_schedule={
         'check-scheduled-posts': {
             'task': 'app.tasks.services.schedule_post.check_scheduled_posts',
-            'schedule': 60.0,  # Run every 60 seconds (1 minute)
+            'schedule': float(settings.DISPATCH_INTERVAL_SECONDS),  # Dispatches posts due within the horizon
+        },
+        'reconcile-schedule-index': {
+            'task': 'app.tasks.services.schedule_post.reconcile_schedule_index',
+            'schedule': float(settings.SCHEDULE_INDEX_RECONCILE_SECONDS),
+        },
+        'relay-post-outbox': {
+            'task': 'app.tasks.services.schedule_post.relay_post_outbox',
+            'schedule': float(settings.OUTBOX_RELAY_INTERVAL_SECONDS),  # Catches outbox rows a submit could not relay
         },
     },
 )
\ No newline at end of file
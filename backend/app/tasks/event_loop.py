@@ -0,0 +1,84 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class WorkerEventLoop:
+    """A long-lived asyncio loop per worker process, running on a daemon thread.
+
+    Celery tasks hand coroutines to the loop and block only on the returned future, so with
+    the threads pool (`--pool=threads --concurrency=N`) one process keeps up to
+    `max_in_flight` platform calls waiting on I/O at the same time instead of one.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked child inherits the parent's loop object but not its thread, so start over
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = None
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="publish-event-loop", daemon=True
+                )
+                self._thread.start()
+                logger.info(f"Started publish event loop in process {self._pid} (max in flight: {self.max_in_flight})")
+            return self._loop
+
+    def reset(self):
+        """Forget the current loop; the next `run` starts a fresh one (used after fork)."""
+        with self._lock:
+            self._loop = None
+            self._thread = None
+            self._semaphore = None
+            self._pid = None
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Runs `coro` on the process loop and blocks the calling thread until it finishes."""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def limited(self, coro: Awaitable[Any]) -> Any:
+        """Awaits `coro` under the process-wide in-flight limit.
+
+        Outside the worker loop (e.g. under `asyncio.run`) the coroutine is awaited directly.
+        """
+        if asyncio.get_running_loop() is not self._loop:
+            return await coro
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_in_flight))
+        async with self._semaphore:
+            return await coro
+
+
+worker_loop = WorkerEventLoop(max_in_flight=settings.PUBLISH_MAX_IN_FLIGHT)
+
+
+def run_publish_coroutine(coro: Awaitable[Any]) -> Any:
+    """Runs a publish coroutine according to PUBLISH_WORKER_MODE.
+
+    "event_loop" reuses the process loop; "asyncio_run" creates and tears down a loop per call.
+    The wait is bounded by the publish lease, after which the post may be reclaimed anyway.
+    """
+    if settings.PUBLISH_WORKER_MODE == "event_loop":
+        return worker_loop.run(coro, timeout=settings.PUBLISH_LEASE_SECONDS)
+    return asyncio.run(coro)
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import random
+
+from app.core.config import settings
+from app.core.mock_platforms import PlatformError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often, and for how long, a publish failing with one error class is retried.
+
+    `max_attempts` counts the first attempt, so 1 means never retry. Delays grow as
+    base_delay * 2 ** (attempt - 1) up to max_delay, with full jitter. No retry is scheduled
+    later than `deadline` seconds after the post's schedule_time.
+    """
+    max_attempts: int = 1
+    base_delay: float = 5.0
+    max_delay: float = 300.0
+    deadline: float = 3600.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before the attempt after failed attempt number `attempt`."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def policy_for(error: Exception) -> RetryPolicy:
+    """Looks up the policy for the error's class, then its base classes; unknown errors are not retried."""
+    policies: Dict[str, dict] = settings.PUBLISH_RETRY_POLICIES
+    for cls in type(error).__mro__:
+        if cls.__name__ in policies:
+            return RetryPolicy(**policies[cls.__name__])
+        if cls is PlatformError:
+            break
+    return RetryPolicy()
+
+
+def next_retry_delay(error: Exception, attempt: int, schedule_time: Optional[datetime], now: datetime) -> Optional[float]:
+    """Seconds until the next attempt after failed attempt number `attempt`, or None to give up."""
+    policy = policy_for(error)
+    if attempt >= policy.max_attempts:
+        return None
+    delay = policy.backoff(attempt)
+    if schedule_time is not None and now + timedelta(seconds=delay) > schedule_time + timedelta(seconds=policy.deadline):
+        return None
+    return delay
@@ -1,111 +1,587 @@
-from datetime import datetime, timezone
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import asyncio
+import json
+import math
+import redis
 from app.tasks.celery import celery_app
+from app.tasks.event_loop import run_publish_coroutine, worker_loop
+from app.tasks.retry import next_retry_delay
 from app.database.session import SessionLocal
-from app.crud.post import PostCRUD
-from app.core.mock_platforms import MockPlatformFactory, PlatformError
-from app.models.enums import PostStatus
+from app.crud.analytics import PostStatusDailyCRUD
+from app.crud.social_platform import SocialPlatformCRUD
+from app.core.config import settings
+from app.core.circuit_breaker import circuit_breaker
+from app.core.mock_platforms import MockPlatformFactory, MockPlatformResponse, PlatformError, ValidationError
+from app.core.rate_limiter import TokenBucket, rate_limiter
+from app.core.read_cache import invalidate_posts_on_commit
+from app.core.schedule_index import schedule_index
+from app.models.post import Post
+from app.models.enums import PlatformStatus, PlatformType, PostStatus
 from app.utils.logger import get_logger
-from sqlalchemy import and_, text
+from sqlalchemy import and_, bindparam, case, text, update
+from sqlalchemy.orm import Session
 
 logger = get_logger(__name__)
 
-@celery_app.task
-def publish_post_task(post_id: int):
-    """Fetches a scheduled post, and publishes it to the target social media platform."""
-    logger.info(f"Executing publish_post_task for post ID: {post_id}")
-    db = SessionLocal()
+# A post is claimable when it is due and not deferred past now (a deferred SCHEDULED post keeps
+# the time it was deferred to in lease_expires_at), or when a previous worker's PUBLISHING lease
+# has run out
+_CLAIMABLE_CONDITION = """
+    (p.status = 'SCHEDULED' AND p.schedule_time <= :now AND (p.lease_expires_at IS NULL OR p.lease_expires_at <= :now))
+    OR (p.status = 'PUBLISHING' AND p.lease_expires_at < :now)
+"""
 
-    try:
-        # Use raw SQL to get post details without loading relationships
-        post_query = text("""
-            SELECT p.id, p.content_text, p.status, p.image_id, sp.type as platform_type
-            FROM posts p
-            JOIN social_platforms sp ON p.platform_id = sp.id
-            WHERE p.id = :post_id
-        """)
+# When a SCHEDULED post is next due: its schedule_time, or the time it was deferred to if later
+_SCHEDULED_DUE_TIME = "CASE WHEN lease_expires_at > schedule_time THEN lease_expires_at ELSE schedule_time END"
 
-        result = db.execute(post_query, {"post_id": post_id})
-        post_row = result.fetchone()
+# Use raw SQL to get post details without loading relationships
+_PUBLISH_ROW_QUERY = text("""
+    SELECT p.id, p.content_text, i.path AS image_path, sp.type AS platform_type, p.platform_id, p.schedule_time,
+           p.user_id, p.publish_attempts
+    FROM posts p
+    JOIN social_platforms sp ON p.platform_id = sp.id
+    LEFT JOIN images i ON p.image_id = i.id
+    WHERE p.id = :post_id
+""")
 
-        if not post_row:
-            logger.warning(f"Post {post_id} not found.")
-            return
 
-        post_db_id, content_text, status, image_id, platform_type = post_row
+# Platform of each post, so the dispatcher can route it to that platform's queue
+_PLATFORM_TYPES_QUERY = text("""
+    SELECT p.id, sp.type
+    FROM posts p
+    JOIN social_platforms sp ON p.platform_id = sp.id
+    WHERE p.id IN :post_ids
+""").bindparams(bindparam("post_ids", expanding=True))
+
+
+# Every post the schedule index should hold, scored by when it next needs attention
+_PENDING_POSTS_QUERY = text(f"""
+    SELECT id, {_SCHEDULED_DUE_TIME} FROM posts WHERE status = 'SCHEDULED'
+    UNION ALL
+    SELECT id, lease_expires_at FROM posts WHERE status = 'PUBLISHING'
+""")
+
+
+def _build_content_payload(content_text: Any, image_path: Optional[str]) -> Dict[str, Any]:
+    """Builds the platform payload from the stored content_text JSON and optional image path."""
+    content_json = json.loads(content_text) if isinstance(content_text, str) else content_text
+    content_payload = {
+        "text": content_json.get("text", ""),
+    }
+    if image_path:
+        content_payload["image"] = image_path
+    return content_payload
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    """Normalizes a DATETIME read through raw SQL (naive UTC on MySQL, a string on SQLite)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=settings.PUBLISH_LEASE_SECONDS)
+
+
+@contextmanager
+def _status_change(db: Session, post_ids: List[int]) -> Iterator[None]:
+    """Wraps UPDATEs of these posts. Their status transitions go into the post_status_daily
+    rollup in the same transaction, and their read cache entries are dropped on commit."""
+    if not post_ids:
+        yield
+        return
+    rollup = PostStatusDailyCRUD(db)
+    # Locked, so the rows cannot change between the two snapshots except through the wrapped UPDATEs
+    before = rollup.snapshot(post_ids, lock=True)
+    yield
+    rollup.record(before, rollup.snapshot(post_ids))
+    invalidate_posts_on_commit(db, post_ids, {user_id for user_id, *_ in before.values()})
+
+
+def _claim_post(db: Session, post_id: int, now: datetime) -> bool:
+    """Atomically moves one post to PUBLISHING with a fresh lease.
+
+    The conditional UPDATE only matches a SCHEDULED post that is due and not deferred past `now`
+    or a PUBLISHING post whose lease has expired, so exactly one caller (ETA task, sweep batch or
+    reclaim) wins the post, and none wins it early.
+    """
+    claim_query = text(f"""
+        UPDATE posts AS p
+        SET status = 'PUBLISHING', lease_expires_at = :lease_expires_at, modified_at = :now
+        WHERE p.id = :post_id
+        AND ({_CLAIMABLE_CONDITION})
+    """)
+    with _status_change(db, [post_id]):
+        result = db.execute(claim_query, {"post_id": post_id, "now": now, "lease_expires_at": _lease_expiry(now)})
+    return result.rowcount == 1
+
+
+def _claim_due_posts(
+    db: Session,
+    now: datetime,
+    limit: int,
+    post_ids: Optional[List[int]] = None,
+    platform_type: Optional[str] = None,
+) -> List[Any]:
+    """Claims up to `limit` due (or lease-expired) posts and returns their publish rows.
+
+    With `post_ids` (popped from the schedule index) only those posts are candidates, and
+    with `platform_type` only posts to that platform.
+
+    On MySQL/PostgreSQL the candidates are locked with FOR UPDATE SKIP LOCKED, so concurrent
+    batches never see the same post, and are moved to PUBLISHING in one UPDATE. SQLite has no
+    row locks, so each candidate goes through the conditional `_claim_post` instead.
+    The caller commits to make the claim visible and release the row locks.
+    """
+    is_sqlite = db.get_bind().dialect.name == "sqlite"
+    lock_clause = "" if is_sqlite else "FOR UPDATE OF p SKIP LOCKED"
+    id_clause = "AND p.id IN :post_ids" if post_ids is not None else ""
+    platform_clause = "AND sp.type = :platform_type" if platform_type else ""
+    candidates_query = text(f"""
+        SELECT p.id, p.content_text, i.path AS image_path, sp.type AS platform_type, p.platform_id, p.schedule_time,
+               p.user_id, p.publish_attempts
+        FROM posts p
+        JOIN social_platforms sp ON p.platform_id = sp.id
+        LEFT JOIN images i ON p.image_id = i.id
+        WHERE ({_CLAIMABLE_CONDITION})
+        {id_clause}
+        {platform_clause}
+        ORDER BY p.schedule_time
+        LIMIT :limit
+        {lock_clause}
+    """)
+    params = {"now": now, "limit": limit}
+    if platform_type:
+        params["platform_type"] = PlatformType(platform_type.lower()).name
+    if post_ids is not None:
+        if not post_ids:
+            return []
+        candidates_query = candidates_query.bindparams(bindparam("post_ids", expanding=True))
+        params["post_ids"] = post_ids
+    rows = db.execute(candidates_query, params).fetchall()
+    if not rows:
+        return []
+
+    if is_sqlite:
+        return [row for row in rows if _claim_post(db, row[0], now)]
+
+    posts = Post.__table__
+    post_ids = [row[0] for row in rows]
+    with _status_change(db, post_ids):
+        db.execute(
+            update(posts)
+            .where(posts.c.id.in_(post_ids))
+            .values(
+                status=PostStatus.PUBLISHING,
+                lease_expires_at=_lease_expiry(now),
+                modified_at=now,
+            )
+        )
+    return rows
+
+
+def _rate_limit_buckets(platform_type: str, platform_id: int) -> List[TokenBucket]:
+    """The shared buckets a publish to this platform account draws from: the platform's and the account's."""
+    mock_platform = MockPlatformFactory.get_platform(platform_type.lower())
+    account_limit = settings.ACCOUNT_RATE_LIMIT_PER_HOUR or mock_platform.rate_limit
+    return [
+        TokenBucket(f"platform:{platform_type.lower()}", mock_platform.rate_limit, settings.RATE_LIMIT_BURST),
+        TokenBucket(f"account:{platform_id}", account_limit, settings.RATE_LIMIT_BURST),
+    ]
+
+
+def _is_platform_failure(result: Any) -> bool:
+    """Whether a publish result counts against the platform's circuit; rejected content does not."""
+    return isinstance(result, PlatformError) and not isinstance(result, ValidationError)
+
+
+def _admit_through_circuits(candidates: List[Tuple[int, str]]) -> Dict[int, float]:
+    """Checks each platform's circuit once for (post_id, platform) candidates.
+
+    Returns the delay for every post that must not be attempted now: all posts to an open
+    platform, and all but one post (the probe) to a half-open one.
+    """
+    circuits = {platform: circuit_breaker.before_call(platform) for platform in {platform for _, platform in candidates}}
+    delays: Dict[int, float] = {}
+    for post_id, platform in candidates:
+        wait, probe = circuits[platform]
+        if wait > 0:
+            delays[post_id] = wait
+        elif probe:
+            # The first post is the probe; the rest wait for its result
+            circuits[platform] = (circuit_breaker.probe_seconds, False)
+    return delays
+
+
+def _defer_posts(db: Session, delays: Dict[int, float], reason: str) -> None:
+    """Releases claimed posts back to SCHEDULED until their delay has passed, and re-dispatches them then.
+
+    schedule_time is left alone. The time each post is deferred to is stored in lease_expires_at,
+    which the claim respects and the schedule index is rebuilt from, so neither the table sweep nor
+    a reconcile hands the post out early. The post goes to the dispatcher again for `now + delay`,
+    through the broker if that is within the horizon, otherwise the schedule index.
+    """
+    if not delays:
+        return
+    now = datetime.now(timezone.utc)
+    due = {post_id: now + timedelta(seconds=delay) for post_id, delay in delays.items()}
+    posts = Post.__table__
+    with _status_change(db, list(delays)):
+        db.execute(
+            update(posts)
+            .where(posts.c.id.in_(list(delays)))
+            .where(posts.c.status == PostStatus.PUBLISHING)
+            .values(
+                status=PostStatus.SCHEDULED,
+                lease_expires_at=case(due, value=posts.c.id),
+                remarks=f"Deferred: {reason}",
+                modified_at=now,
+            )
+        )
+    db.commit()
+    schedule_index.remove(list(delays))
+    schedule_posts(list(due.items()))
+    logger.info(f"Deferred {len(delays)} posts: {reason}")
 
-        if status.upper() != PostStatus.SCHEDULED.name:
-            logger.warning(f"Post {post_id} is not in a scheduled state (current state: {status}). Aborting.")
-            return
 
-        # Get image path if exists
-        image_path = None
-        if image_id:
-            image_query = text("SELECT path FROM images WHERE id = :image_id")
-            image_result = db.execute(image_query, {"image_id": image_id})
-            image_row = image_result.fetchone()
-            if image_row:
-                image_path = image_row[0]
+async def _post_content(platform_type: str, payload: Dict[str, Any]) -> MockPlatformResponse:
+    """Sends one payload to its platform, counted against the worker's in-flight limit."""
+    mock_platform = MockPlatformFactory.get_platform(platform_type.lower())
+    return await worker_loop.limited(mock_platform.post_content(payload))
 
-        # Get platform instance
-        mock_platform = MockPlatformFactory.get_platform(platform_type.lower())
 
-        # Parse content_text JSON
-        import json
-        content_json = json.loads(content_text) if isinstance(content_text, str) else content_text
+async def _publish_many(items: List[Tuple[int, str, Dict[str, Any]]], concurrency: int) -> List[Tuple[int, Any]]:
+    """Publishes (post_id, platform_type, payload) items concurrently, at most `concurrency` at a time.
 
-        content_payload = {
-            "text": content_json.get("text", ""),
-        }
-        if image_path:
-            content_payload["image"] = image_path
+    Returns (post_id, MockPlatformResponse | Exception) pairs in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-        logger.info(f"Publishing post {post_id} to {platform_type}...")
+    async def publish_one(post_id: int, platform_type: str, payload: Dict[str, Any]):
+        async with semaphore:
+            try:
+                return post_id, await _post_content(platform_type, payload)
+            except Exception as e:
+                return post_id, e
 
-        # Run the async post_content method in the sync celery task
-        response = asyncio.run(mock_platform.post_content(content_payload))
+    return await asyncio.gather(*(publish_one(*item) for item in items))
 
-        # Update post status using raw SQL
+
+def _outcome(post_id: int, result: Any) -> Tuple[PostStatus, str]:
+    """Maps a platform response or exception to the post's final status and remarks."""
+    if isinstance(result, MockPlatformResponse):
+        if result.success:
+            return PostStatus.PUBLISHED, f"Successfully published. Platform ID: {result.data.get('post_id')}"
+        return PostStatus.FAILED, result.error or "Unknown error from platform."
+    if isinstance(result, PlatformError):
+        logger.error(f"Platform error for post {post_id}: {result.message}")
+        return PostStatus.FAILED, f"Platform Error: {result.message} (Code: {result.code})"
+    logger.error(f"An unexpected error occurred while publishing post {post_id}: {result}")
+    return PostStatus.FAILED, f"An unexpected error occurred: {str(result)}"
+
+
+def _platform_account_errors(db: Session, rows: List[Any]) -> Dict[int, ValidationError]:
+    """Finds publish rows whose platform account is not connected, so they fail without a platform call.
+
+    Statuses come from the platform cache; only its misses reach the database.
+    """
+    keys = {row[0]: (row[6], PlatformType[str(row[3])]) for row in rows}
+    platforms = SocialPlatformCRUD(db).get_cached(keys.values())
+    errors: Dict[int, ValidationError] = {}
+    for post_id, key in keys.items():
+        platform = platforms.get(key)
+        if platform is not None and platform.status not in (None, PlatformStatus.CONNECTED):
+            errors[post_id] = ValidationError(
+                key[1].value, f"Account is {PlatformStatus(platform.status).value}", "ACCOUNT_NOT_CONNECTED"
+            )
+    return errors
+
+
+def _retry_delay(result: Any, attempt: int, schedule_time: Any, now: datetime) -> Optional[float]:
+    """Seconds until a failed publish should be retried under its error's policy, or None if it should not."""
+    if not isinstance(result, PlatformError):
+        return None
+    return next_retry_delay(result, attempt, _as_utc(schedule_time), now)
+
+
+def _write_retries(db: Session, retries: Dict[int, Tuple[float, str]], now: datetime) -> None:
+    """Keeps posts waiting for a retry in PUBLISHING, with the lease ending when the retry is due.
+
+    The retry task can claim the post again once the lease runs out. Should the retry message
+    be lost, the index entry at the end of the following lease hands the post to the sweep.
+    Each post's publish_attempts goes up by one, so whoever claims it next knows its attempt number.
+    """
+    if not retries:
+        return
+    posts = Post.__table__
+    # The status stays PUBLISHING, but modified_at moves, so the cached detail is stale
+    with _status_change(db, list(retries)):
+        db.execute(
+            update(posts)
+            .where(posts.c.id.in_(list(retries)))
+            .where(posts.c.status == PostStatus.PUBLISHING)
+            .values(
+                lease_expires_at=case(
+                    {post_id: now + timedelta(seconds=delay) for post_id, (delay, _) in retries.items()},
+                    value=posts.c.id,
+                ),
+                remarks=case({post_id: remarks for post_id, (_, remarks) in retries.items()}, value=posts.c.id),
+                publish_attempts=posts.c.publish_attempts + 1,
+                modified_at=now,
+            )
+        )
+
+
+def _retry_remarks(attempt: int, remarks: str, delay: float) -> str:
+    return f"Attempt {attempt} failed: {remarks}. Retrying in {math.ceil(delay)}s"
+
+
+def _write_publish_results(db: Session, outcomes: Dict[int, Tuple[PostStatus, str]], now: datetime) -> None:
+    """Writes every post's status and remarks back with a single UPDATE ... CASE statement.
+
+    Only rows still in PUBLISHING are touched. Their lease is cleared and modified_at moves
+    to `now`, which changes the posts' ETags.
+    """
+    if not outcomes:
+        return
+    posts = Post.__table__
+    published_ids = [post_id for post_id, (status, _) in outcomes.items() if status == PostStatus.PUBLISHED]
+    stmt = (
+        update(posts)
+        .where(posts.c.id.in_(list(outcomes)))
+        .where(posts.c.status == PostStatus.PUBLISHING)
+        .values(
+            status=case({post_id: status.name for post_id, (status, _) in outcomes.items()}, value=posts.c.id),
+            remarks=case({post_id: remarks for post_id, (_, remarks) in outcomes.items()}, value=posts.c.id),
+            published_at=case(
+                (posts.c.id.in_(published_ids), now),
+                else_=posts.c.published_at,
+            ),
+            lease_expires_at=None,
+            modified_at=now,
+        )
+    )
+    with _status_change(db, list(outcomes)):
+        db.execute(stmt)
+
+
+@celery_app.task(bind=True)
+def publish_post_task(self, post_id: int, attempt: int = 1, platform_type: Optional[str] = None):
+    """Claims a scheduled post, and publishes it to the target social media platform.
+
+    Transient platform errors are retried through Celery with the error's retry policy;
+    `attempt` counts the attempts made so far, including this one, and is raised to follow the
+    post's stored publish_attempts. `platform_type` only routes the task to its platform's queue.
+    """
+    logger.info(f"Executing publish_post_task for post ID: {post_id} (attempt {attempt})")
+    db = SessionLocal()
+    retry_delay = None
+
+    try:
         now = datetime.now(timezone.utc)
+        if not _claim_post(db, post_id, now):
+            logger.warning(f"Post {post_id} is missing, not scheduled or already claimed by another worker. Aborting.")
+            return
+        # Commit the claim right away so the sweep sees PUBLISHING while the platform call runs
+        db.commit()
+        # Until the result is written the post is only due again if its lease runs out
+        schedule_index.add([(post_id, _lease_expiry(now))])
+
+        row = db.execute(_PUBLISH_ROW_QUERY, {"post_id": post_id}).fetchone()
+        _, content_text, image_path, platform_type, platform_id, schedule_time, _, failed_attempts = row
+        attempt = max(attempt, failed_attempts + 1)
+        account_error = _platform_account_errors(db, [row]).get(post_id)
 
-        if response.success:
-            update_query = text("""
-                UPDATE posts
-                SET status = 'PUBLISHED', published_at = :now, remarks = :remarks
-                WHERE id = :post_id
-            """)
-            remarks = f"Successfully published. Platform ID: {response.data.get('post_id')}"
-            db.execute(update_query, {"now": now, "remarks": remarks, "post_id": post_id})
-            logger.info(f"Post {post_id} successfully published to {platform_type}.")
+        wait, reason, called = 0.0, "", False
+        try:
+            if account_error:
+                raise account_error
+            content_payload = _build_content_payload(content_text, image_path)
+            # An open circuit defers the post before it takes a rate-limit token
+            wait, _ = circuit_breaker.before_call(platform_type.lower())
+            reason = f"{platform_type.lower()} circuit open"
+            if not wait:
+                wait = rate_limiter.acquire(_rate_limit_buckets(platform_type, platform_id))
+                reason = f"{platform_type.lower()} rate limit reached"
+            if not wait:
+                logger.info(f"Publishing post {post_id} to {platform_type}...")
+                called = True
+                # Run the async platform call from the sync celery task
+                result = run_publish_coroutine(_post_content(platform_type, content_payload))
+        except Exception as e:
+            result = e
+
+        if called:
+            circuit_breaker.record(platform_type.lower(), _is_platform_failure(result))
+        if wait > 0:
+            _defer_posts(db, {post_id: wait}, reason)
+            return
+
+        now = datetime.now(timezone.utc)
+        status, remarks = _outcome(post_id, result)
+        retry_delay = _retry_delay(result, attempt, schedule_time, now)
+        if retry_delay is not None:
+            _write_retries(db, {post_id: (retry_delay, _retry_remarks(attempt, remarks, retry_delay))}, now)
+            db.commit()
+            schedule_index.add([(post_id, _lease_expiry(now + timedelta(seconds=retry_delay)))])
+            logger.warning(f"Post {post_id} will be retried in {retry_delay:.1f}s: {remarks}")
         else:
-            update_query = text("""
-                UPDATE posts
-                SET status = 'FAILED', remarks = :remarks
-                WHERE id = :post_id
-            """)
-            remarks = response.error or "Unknown error from platform."
-            db.execute(update_query, {"remarks": remarks, "post_id": post_id})
-            logger.error(f"Failed to publish post {post_id} to {platform_type}: {response.error}")
-
-    except PlatformError as e:
-        update_query = text("UPDATE posts SET status = 'FAILED', remarks = :remarks WHERE id = :post_id")
-        remarks = f"Platform Error: {e.message} (Code: {e.code})"
-        db.execute(update_query, {"remarks": remarks, "post_id": post_id})
-        logger.error(f"Platform error for post {post_id}: {e.message}")
+            _write_publish_results(db, {post_id: (status, remarks)}, now)
+            db.commit()
+            schedule_index.remove([post_id])
+            if status == PostStatus.PUBLISHED:
+                logger.info(f"Post {post_id} successfully published to {platform_type}.")
+            else:
+                logger.error(f"Failed to publish post {post_id} to {platform_type}: {remarks}")
+
     except Exception as e:
-        update_query = text("UPDATE posts SET status = 'FAILED', remarks = :remarks WHERE id = :post_id")
-        remarks = f"An unexpected error occurred: {str(e)}"
-        db.execute(update_query, {"remarks": remarks, "post_id": post_id})
+        db.rollback()
+        retry_delay = None
         logger.error(f"An unexpected error occurred while publishing post {post_id}: {e}", exc_info=True)
 
     finally:
         db.commit()
         db.close()
 
+    # Raised after the cleanup rather than from `finally`, where it would replace any exception
+    # in flight; the worker slot is released while Celery holds the message until the countdown ends
+    if retry_delay is not None:
+        raise self.retry(
+            args=[post_id],
+            kwargs={"attempt": attempt + 1, "platform_type": platform_type},
+            countdown=retry_delay,
+            max_retries=None,
+        )
+
+
+def _platform_types(post_ids: List[int]) -> Dict[int, str]:
+    """Looks up the platform each post publishes to, as the lower-case PlatformType value."""
+    if not post_ids:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = db.execute(_PLATFORM_TYPES_QUERY, {"post_ids": post_ids}).fetchall()
+        return {post_id: str(platform_type).lower() for post_id, platform_type in rows}
+    finally:
+        db.close()
+
+
+def _send_batches(entries: List[Tuple[int, datetime]], now: datetime) -> None:
+    """Sends (post_id, due_time) entries as publish_posts_batch messages on their platform's queue.
+
+    Entries already due go out immediately; the rest are grouped by platform and due second and
+    sent with that ETA, so posts sharing a schedule_time travel in one message. Anything not sent
+    because of a broker error is put back in the schedule index before the error propagates.
+    Posts that no longer exist are dropped.
+    """
+    platform_types = _platform_types([post_id for post_id, _ in entries])
+    by_due: Dict[Tuple[str, Optional[datetime]], List[int]] = defaultdict(list)
+    for post_id, due in entries:
+        if post_id not in platform_types:
+            continue
+        if due <= now:
+            eta = None
+        else:
+            # Round up so the ETA never fires before schedule_time
+            eta = due.replace(microsecond=0) + timedelta(seconds=1 if due.microsecond else 0)
+        by_due[(platform_types[post_id], eta)].append(post_id)
+
+    pending = {post_id: due for post_id, due in entries if post_id in platform_types}
+    for (platform_type, eta), post_ids in by_due.items():
+        for start in range(0, len(post_ids), settings.PUBLISH_BATCH_SIZE):
+            chunk = post_ids[start:start + settings.PUBLISH_BATCH_SIZE]
+            try:
+                publish_posts_batch.apply_async(kwargs={"post_ids": chunk, "platform_type": platform_type}, eta=eta)
+            except Exception:
+                schedule_index.add(pending.items())
+                raise
+            for post_id in chunk:
+                pending.pop(post_id)
+
+
+def _hand_off(entries: List[Tuple[int, datetime]]) -> None:
+    """Sends posts due within DISPATCH_HORIZON_SECONDS to the broker and indexes the rest.
+
+    Broker errors propagate, with the unsent posts left in the schedule index.
+    """
+    now = datetime.now(timezone.utc)
+    horizon_end = now + timedelta(seconds=settings.DISPATCH_HORIZON_SECONDS)
+    entries = [(post_id, _as_utc(due)) for post_id, due in entries if due is not None]
+
+    near = [(post_id, due) for post_id, due in entries if due <= horizon_end]
+    schedule_index.add((post_id, due) for post_id, due in entries if due > horizon_end)
+    if near:
+        _send_batches(near, now)
+        logger.info(f"Sent {len(near)} posts due within the dispatch horizon to the broker")
+
+
+def schedule_posts(entries: List[Tuple[int, datetime]]) -> None:
+    """Hands scheduled posts to the dispatcher.
+
+    Posts due within DISPATCH_HORIZON_SECONDS become broker messages right away; later ones
+    only go into the schedule index, so they cost no worker memory until the horizon reaches them.
+    """
+    try:
+        _hand_off(entries)
+    except Exception as e:
+        logger.error(f"Could not send {len(entries)} posts to the broker, left in the schedule index: {e}")
+
+
+def _dispatch_from_index(now: datetime) -> int:
+    """Pops every post due within the dispatch horizon from the schedule index and sends it on."""
+    horizon_end = now + timedelta(seconds=settings.DISPATCH_HORIZON_SECONDS)
+    dispatched = 0
+    while True:
+        entries = schedule_index.pop_due(horizon_end, settings.PUBLISH_BATCH_SIZE)
+        if not entries:
+            return dispatched
+        _send_batches(entries, now)
+        dispatched += len(entries)
+        if len(entries) < settings.PUBLISH_BATCH_SIZE:
+            return dispatched
+
+
+def _reindex_unclaimed(db: Session, post_ids: List[int]) -> None:
+    """Puts popped posts that could not be claimed yet (locked elsewhere, or an early ETA) back in the index."""
+    if not post_ids:
+        return
+    query = text(f"""
+        SELECT id, {_SCHEDULED_DUE_TIME} FROM posts WHERE id IN :post_ids AND status = 'SCHEDULED'
+    """).bindparams(bindparam("post_ids", expanding=True))
+    rows = db.execute(query, {"post_ids": post_ids}).fetchall()
+    schedule_index.add((post_id, _as_utc(due)) for post_id, due in rows)
+
+
+def _dispatch_from_table(db: Session, now: datetime) -> int:
+    """Fallback when the schedule index is disabled or unreachable: counts due rows in `posts`."""
+    # Use raw SQL query to avoid SQLAlchemy relationship issues in Celery.
+    # Expired PUBLISHING leases are counted too: the batch reclaims them.
+    query = text(f"""
+        SELECT sp.type, COUNT(*)
+        FROM posts p
+        JOIN social_platforms sp ON p.platform_id = sp.id
+        WHERE {_CLAIMABLE_CONDITION}
+        GROUP BY sp.type
+    """)
+    due_counts = db.execute(query, {"now": now}).fetchall()
+
+    # Fan out one batch task per PUBLISH_BATCH_SIZE due posts on each platform's queue;
+    # each batch claims its own rows
+    for platform_type, due_count in due_counts:
+        for _ in range(math.ceil(due_count / settings.PUBLISH_BATCH_SIZE)):
+            publish_posts_batch.apply_async(kwargs={"platform_type": str(platform_type).lower()})
+    return sum(due_count for _, due_count in due_counts)
+
 
 @celery_app.task
 def check_scheduled_posts():
-    """Periodic task that checks for scheduled posts ready to be published."""
+    """Periodic task that dispatches scheduled posts ready to be published."""
     logger.info("Checking for scheduled posts ready to be published...")
     db = SessionLocal()
 
@@ -114,30 +590,208 @@ def check_scheduled_posts():
         now = datetime.now(timezone.utc)
         logger.info(f"Current time (UTC): {now}")
 
-        # Use raw SQL query to avoid SQLAlchemy relationship issues in Celery
-        query = text("""
-            SELECT id, schedule_time
-            FROM posts
-            WHERE status = 'SCHEDULED'
-            AND schedule_time <= :now
+        if settings.SCHEDULE_INDEX_ENABLED:
+            try:
+                due_count = _dispatch_from_index(now)
+                logger.info(f"Dispatched {due_count} posts due within the horizon from the schedule index")
+                return f"Processed {due_count} scheduled posts"
+            except redis.RedisError as e:
+                logger.warning(f"Schedule index unavailable, scanning posts instead: {e}")
+
+        due_count = _dispatch_from_table(db, now)
+        logger.info(f"Found {due_count} posts ready for publishing")
+        return f"Processed {due_count} scheduled posts"
+
+    except Exception as e:
+        logger.error(f"Error in check_scheduled_posts: {e}", exc_info=True)
+        return f"Error: {str(e)}"
+    finally:
+        db.close()
+
+
+@celery_app.task
+def relay_post_outbox():
+    """Hands unsent post_outbox rows to the dispatcher in batches and marks them sent.
+
+    Triggered after every submit and periodically by beat. Rows are marked sent in the same
+    transaction that locked them, and only after the broker accepted the batch, so a broker error
+    leaves them for the next run. A post sent twice (a crash between send and commit) is still
+    published once: the publish tasks only act on posts they can claim.
+    """
+    db = SessionLocal()
+
+    try:
+        is_sqlite = db.get_bind().dialect.name == "sqlite"
+        lock_clause = "" if is_sqlite else "FOR UPDATE SKIP LOCKED"
+        unsent_query = text(f"""
+            SELECT id, post_id, due_at FROM post_outbox
+            WHERE sent_at IS NULL
+            ORDER BY id
+            LIMIT :limit
+            {lock_clause}
         """)
+        mark_sent_query = text("""
+            UPDATE post_outbox SET sent_at = :now, modified_at = :now WHERE id IN :ids
+        """).bindparams(bindparam("ids", expanding=True))
 
-        result = db.execute(query, {"now": now})
-        scheduled_posts = result.fetchall()
+        relayed = 0
+        while True:
+            rows = db.execute(unsent_query, {"limit": settings.OUTBOX_RELAY_BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+            _hand_off([(post_id, due_at) for _, post_id, due_at in rows])
+            db.execute(mark_sent_query, {"ids": [row[0] for row in rows], "now": datetime.now(timezone.utc)})
+            db.commit()
+            relayed += len(rows)
+            if len(rows) < settings.OUTBOX_RELAY_BATCH_SIZE:
+                break
 
-        logger.info(f"Found {len(scheduled_posts)} posts ready for publishing")
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        db.execute(text("DELETE FROM post_outbox WHERE sent_at < :cutoff"), {"cutoff": cutoff})
+        db.commit()
+        if relayed:
+            logger.info(f"Relayed {relayed} posts from the outbox")
+        return f"Relayed {relayed} posts"
 
-        # Trigger publish_post_task for each ready post
-        for post_row in scheduled_posts:
-            post_id = post_row[0]  # First column is id
-            schedule_time = post_row[1]  # Second column is schedule_time
-            logger.info(f"Triggering publish task for post {post_id} (scheduled for {schedule_time})")
-            publish_post_task.delay(post_id)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in relay_post_outbox: {e}", exc_info=True)
+        return f"Error: {str(e)}"
+    finally:
+        db.close()
 
-        return f"Processed {len(scheduled_posts)} scheduled posts"
+
+@celery_app.task
+def reconcile_schedule_index():
+    """Periodic task that rebuilds the schedule index from the posts table."""
+    logger.info("Reconciling the schedule index with the posts table...")
+    db = SessionLocal()
+
+    try:
+        max_post_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM posts")).scalar()
+        rows = db.execute(_PENDING_POSTS_QUERY).yield_per(1000)
+        indexed, removed = schedule_index.rebuild(
+            ((post_id, _as_utc(due)) for post_id, due in rows), max_post_id=max_post_id
+        )
+        logger.info(f"Schedule index reconciled: {indexed} pending posts indexed, {removed} stale entries removed")
+        return f"Indexed {indexed} posts, removed {removed}"
 
     except Exception as e:
-        logger.error(f"Error in check_scheduled_posts: {e}", exc_info=True)
+        logger.error(f"Error in reconcile_schedule_index: {e}", exc_info=True)
+        return f"Error: {str(e)}"
+    finally:
+        db.close()
+
+
+@celery_app.task
+def publish_posts_batch(
+    limit: Optional[int] = None,
+    post_ids: Optional[List[int]] = None,
+    platform_type: Optional[str] = None,
+):
+    """Claims up to `limit` due posts and publishes them concurrently on one event loop.
+
+    `post_ids` restricts the claim to posts popped from the schedule index; without it the
+    batch claims whatever is due, earliest first. `platform_type` (which also routes the task
+    to that platform's queue) restricts it to posts for one platform.
+
+    The claim is committed before publishing, so row locks are only held for the claim itself.
+    All results are then written back with a single UPDATE. Posts that fail with a retryable
+    error are handed to publish_post_task with the policy's countdown.
+    """
+    limit = limit or (len(post_ids) if post_ids else settings.PUBLISH_BATCH_SIZE)
+    db = SessionLocal()
+
+    try:
+        now = datetime.now(timezone.utc)
+        rows = _claim_due_posts(db, now, limit, post_ids=post_ids, platform_type=platform_type)
+        db.commit()
+        schedule_index.add((row[0], _lease_expiry(now)) for row in rows)
+        if post_ids:
+            claimed_ids = {row[0] for row in rows}
+            _reindex_unclaimed(db, [post_id for post_id in post_ids if post_id not in claimed_ids])
+        logger.info(f"Claimed {len(rows)} due posts for batch publishing")
+        if not rows:
+            return "Published 0 posts"
+
+        candidates = []
+        outcomes: Dict[int, Tuple[PostStatus, str]] = {}
+        schedule_times = {row[0]: row[5] for row in rows}
+        platform_types = {row[0]: str(row[3]).lower() for row in rows}
+        # This attempt's number, continuing from earlier failed attempts
+        attempts = {row[0]: row[7] + 1 for row in rows}
+        account_errors = _platform_account_errors(db, rows)
+        for post_id, content_text, image_path, platform_type, platform_id, *_ in rows:
+            if post_id in account_errors:
+                outcomes[post_id] = _outcome(post_id, account_errors[post_id])
+                continue
+            try:
+                payload = _build_content_payload(content_text, image_path)
+                candidates.append((post_id, platform_type, payload, _rate_limit_buckets(platform_type, platform_id)))
+            except Exception as e:
+                outcomes[post_id] = _outcome(post_id, e)
+
+        # Posts to a platform whose circuit is open are deferred without being attempted
+        circuit_deferrals = _admit_through_circuits([(post_id, platform_types[post_id]) for post_id, *_ in candidates])
+        _defer_posts(db, circuit_deferrals, "platform circuit open")
+        candidates = [candidate for candidate in candidates if candidate[0] not in circuit_deferrals]
+
+        # Take a token per post from the shared buckets; posts without one wait for the next token
+        waits = rate_limiter.acquire_many([buckets for *_, buckets in candidates])
+        items = []
+        deferrals: Dict[int, float] = {}
+        queued: Dict[str, int] = defaultdict(int)
+        for (post_id, platform_type, payload, buckets), wait in zip(candidates, waits):
+            if wait > 0:
+                # Space out posts waiting on the same buckets one refill interval apart
+                slot = max(queued[bucket.key] for bucket in buckets)
+                deferrals[post_id] = wait + slot * max(3600 / bucket.limit_per_hour for bucket in buckets)
+                for bucket in buckets:
+                    queued[bucket.key] += 1
+            else:
+                items.append((post_id, platform_type, payload))
+        _defer_posts(db, deferrals, "platform rate limit reached")
+
+        results = run_publish_coroutine(_publish_many(items, settings.PUBLISH_BATCH_CONCURRENCY))
+        circuit_breaker.record_many([(platform_types[post_id], _is_platform_failure(result)) for post_id, result in results])
+        now = datetime.now(timezone.utc)
+        retries: Dict[int, Tuple[float, str]] = {}
+        for post_id, result in results:
+            status, remarks = _outcome(post_id, result)
+            delay = _retry_delay(result, attempts[post_id], schedule_times[post_id], now)
+            if delay is not None:
+                retries[post_id] = (delay, _retry_remarks(attempts[post_id], remarks, delay))
+            else:
+                outcomes[post_id] = (status, remarks)
+
+        _write_publish_results(db, outcomes, now)
+        _write_retries(db, retries, now)
+        db.commit()
+        schedule_index.remove(list(outcomes))
+        schedule_index.add(
+            (post_id, _lease_expiry(now + timedelta(seconds=delay))) for post_id, (delay, _) in retries.items()
+        )
+        for post_id, (delay, _) in retries.items():
+            # A lost message is not fatal: the post is reclaimed once its lease runs out
+            try:
+                publish_post_task.apply_async(
+                    args=[post_id],
+                    kwargs={"attempt": attempts[post_id] + 1, "platform_type": platform_types[post_id]},
+                    countdown=delay,
+                )
+            except Exception as e:
+                logger.error(f"Could not schedule retry for post {post_id}: {e}")
+
+        published = sum(1 for status, _ in outcomes.values() if status == PostStatus.PUBLISHED)
+        logger.info(
+            f"Batch finished: {published} published, {len(outcomes) - published} failed, "
+            f"{len(retries)} retrying, {len(deferrals) + len(circuit_deferrals)} deferred"
+        )
+        return f"Published {published} posts"
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in publish_posts_batch: {e}", exc_info=True)
         return f"Error: {str(e)}"
     finally:
         db.close()
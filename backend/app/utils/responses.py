@@ -0,0 +1,49 @@
+from typing import Any, Iterable, Optional
+import hashlib
+import json
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+import pydantic_core
+
+
+class ModelResponse(JSONResponse):
+    """JSON response for a model the service already validated.
+
+    Returning it from an endpoint skips FastAPI's second validation against `response_model`
+    and its stdlib encoder; the model is written once by pydantic-core's serializer. Keep
+    `response_model` on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        return pydantic_core.to_json(content)
+
+
+def weak_etag(versions: Iterable[Any]) -> str:
+    """Weak ETag over the version of each row in a response, e.g. (id, modified_at, status) tuples."""
+    # str() of datetimes and enums is stable across the database and a JSON round trip through the read cache
+    digest = hashlib.blake2b(json.dumps(list(versions), default=str).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag`, with the weak comparison RFC 9110 asks for."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in candidates)
+
+
+# Polling clients keep the response but revalidate it on every request
+_REVALIDATE = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _REVALIDATE})
+
+
+def conditional_response(model: BaseModel, etag: str) -> ModelResponse:
+    """A ModelResponse carrying `etag`, for clients to send back in If-None-Match."""
+    return ModelResponse(model, headers={"ETag": etag, "Cache-Control": _REVALIDATE})
@@ -0,0 +1,74 @@
+"""Rebuilds the post_status_daily rollup from the posts table.
+
+The migration that creates the table fills it once; run this to repair drift, e.g. after
+posts were changed by hand or by code that bypasses PostStatusDailyCRUD. The users that have
+posts are rebuilt --batch-users at a time, one transaction each, so the rollup stays usable
+meanwhile.
+
+    python scripts/backfill_post_status_daily.py
+    python scripts/backfill_post_status_daily.py --batch-users 500 --from-user 1200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import OperationalError
+
+from app.crud.analytics import PostStatusDailyCRUD
+from app.database.session import SessionLocal
+from app.models.api import Api
+from app.models.image import Image
+from app.models.post import Post, PostAnalysis, AiInsight, PostOutbox
+from app.models.product import Product, ProductDesign
+from app.models.social_platform import SocialPlatform
+
+ATTEMPTS = 3
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-users", type=int, default=1000, help="Users rebuilt per transaction")
+    parser.add_argument("--from-user", type=int, help="Resume from this user ID")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rollup = PostStatusDailyCRUD(db)
+        after = args.from_user - 1 if args.from_user is not None else None
+        started = time.perf_counter()
+        rows = 0
+        while True:
+            user_ids = rollup.user_ids(after=after, limit=args.batch_users)
+            if not user_ids:
+                break
+            # The range also covers the IDs between batches, so rollup rows of users
+            # whose posts are all gone are dropped too
+            start = after + 1 if after is not None else user_ids[0]
+            end = user_ids[-1]
+            for attempt in range(1, ATTEMPTS + 1):
+                try:
+                    rows += rollup.rebuild_users(start, end)
+                    db.commit()
+                    break
+                except OperationalError as e:
+                    # Publishing writes to the same rows; a deadlock or lock timeout is retried
+                    db.rollback()
+                    if attempt == ATTEMPTS:
+                        print(f"Users {start}-{end} failed, resume with --from-user {start}: {e}")
+                        return 1
+            print(f"users {start}-{end}: {rows} rollup rows so far")
+            after = end
+        if after is None:
+            print("No posts")
+            return 0
+        print(f"Rebuilt {rows} rollup rows in {time.perf_counter() - started:.1f}s")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
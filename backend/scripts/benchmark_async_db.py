@@ -0,0 +1,144 @@
+"""Measures request latency under concurrency for the AI endpoints' provider lookup, sync vs async.
+
+Each simulated request looks up the user's least loaded AI API (the query AIProviderFactory
+runs) and then awaits a fake provider call. The "sync" run issues the query through a sync
+Session on the event loop, as the endpoints used to; the "async" run goes through
+AsyncSession + AsyncApiCRUD on aiosqlite. Uses a throwaway SQLite file.
+
+SQLite runs in-process, so every statement is delayed by --query-latency (a sleep in the
+driver's thread) to stand in for the network round trip and server time of MySQL.
+
+    python scripts/benchmark_async_db.py
+    python scripts/benchmark_async_db.py --requests 200 --query-latency 0.05 --ai-latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import BigInteger, create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models.api import Api
+from app.models.image import Image
+from app.models.post import Post, PostAnalysis, AiInsight, PostOutbox
+from app.models.product import Product, ProductDesign
+from app.models.social_platform import SocialPlatform
+from app.models.enums import ApiType
+from app.crud.api import ApiCRUD, AsyncApiCRUD
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+def _delay_statements(engine, seconds: float) -> None:
+    """Makes every statement on `engine` take at least `seconds`, in the thread running it."""
+    def trace(statement):
+        time.sleep(seconds)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, "run_async"):
+            dbapi_connection.run_async(lambda connection: connection.set_trace_callback(trace))
+        else:
+            dbapi_connection.set_trace_callback(trace)
+
+
+def _seed(engine, rows: int, users: int) -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, 10000):
+            conn.execute(insert(Api), [
+                {
+                    "user_id": i % users,
+                    "type": ApiType.OPENAI,
+                    "endpoint": "https://example.invalid/v1",
+                    "access_key": "key",
+                    "load": (i * 7919) % 1000,
+                }
+                for i in range(start, min(rows, start + 10000))
+            ])
+
+
+async def _run(request, concurrency: int):
+    """Starts `concurrency` requests at once; returns their latencies in seconds (all measured
+    from the common arrival time) and the wall time."""
+    start = time.perf_counter()
+
+    async def timed(user_id: int) -> float:
+        await request(user_id)
+        return time.perf_counter() - start
+
+    latencies = await asyncio.gather(*(timed(i) for i in range(concurrency)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+def _report(name: str, latencies, wall: float) -> None:
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(
+        f"{name:>5}: p50 {statistics.median(latencies) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms   "
+        f"max {latencies[-1] * 1000:7.1f} ms   wall {wall * 1000:7.1f} ms"
+    )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100, help="Concurrent requests per run")
+    parser.add_argument("--api-rows", type=int, default=20000, help="Rows in the apis table (the lookup scans them)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--query-latency", type=float, default=0.02, help="Seconds added to every statement")
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="Seconds the fake provider call takes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.db")
+        engine = create_engine(f"sqlite:///{path}")
+        _seed(engine, args.api_rows, args.users)
+        # Drop the seeding connection so every pooled connection gets the statement delay
+        engine.dispose()
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=args.requests)
+        _delay_statements(engine, args.query_latency)
+        _delay_statements(async_engine.sync_engine, args.query_latency)
+        AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def sync_request(user_id: int) -> None:
+            db = Session()
+            try:
+                ApiCRUD(db).get_best_api_by_load(user_id)
+            finally:
+                db.close()
+            await asyncio.sleep(args.ai_latency)
+
+        async def async_request(user_id: int) -> None:
+            async with AsyncSession() as db:
+                await AsyncApiCRUD(db).get_best_api_by_load(user_id)
+            await asyncio.sleep(args.ai_latency)
+
+        print(
+            f"{args.requests} concurrent requests, {args.api_rows} api rows, "
+            f"{args.query_latency * 1000:.0f} ms per statement, {args.ai_latency * 1000:.0f} ms provider call"
+        )
+        # Warm both pools and SQLite's page cache before measuring
+        await _run(sync_request, 5)
+        await _run(async_request, 5)
+        _report("sync", *await _run(sync_request, args.requests))
+        _report("async", *await _run(async_request, args.requests))
+        await async_engine.dispose()
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
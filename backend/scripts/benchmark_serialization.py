@@ -0,0 +1,107 @@
+"""Micro-benchmark of response serialization for a page of posts: FastAPI's default path vs ModelResponse.
+
+Serves the same prebuilt PostListResponse from two routes of a throwaway app: one returns the
+model and lets FastAPI validate it against response_model and encode it, the other returns
+ModelResponse. No database is involved. Also reports the compressed sizes and compression
+time for gzip and brotli.
+
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --items 100 --requests 500
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.middleware import _Compressor, brotli
+from app.models.enums import PlatformType, PostStatus
+from app.schemas.post import ImageResponse, PostListItem, PostListResponse
+from app.utils.responses import ModelResponse
+
+
+def _page(items: int) -> PostListResponse:
+    now = datetime.now(timezone.utc)
+    return PostListResponse(
+        posts=[
+            PostListItem(
+                id=i,
+                content_text=f"Post {i}: launching our new autumn collection today, {i % 13} new styles in store and online.",
+                image=ImageResponse(id=i, path=f"static/uploads/1/{i}.jpg"),
+                platforms=[PlatformType.TWITTER],
+                product_id=i % 7,
+                schedule_time=now,
+                status=PostStatus.SCHEDULED,
+                hashtags=["#autumn", "#launch", "#fashion"],
+                created_at=now,
+            )
+            for i in range(items)
+        ],
+        limit=items,
+        next_cursor="WyIyMDI2LTEwLTE4VDAwOjQzOjE3IiwzMF0",
+    )
+
+
+def _time(client: TestClient, url: str, requests: int) -> float:
+    """Mean milliseconds per request, after a warm-up."""
+    for _ in range(20):
+        client.get(url)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="Posts per page")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    page = _page(args.items)
+    app = FastAPI()
+
+    @app.get("/default", response_model=PostListResponse)
+    def default_path():
+        return page
+
+    @app.get("/fast", response_model=PostListResponse)
+    def fast_path():
+        return ModelResponse(page)
+
+    client = TestClient(app)
+    assert client.get("/default").json() == client.get("/fast").json(), "the two paths must produce the same JSON"
+
+    # The empty route is the test client's own overhead, subtracted from both
+    @app.get("/empty")
+    def empty():
+        return None
+
+    baseline = _time(client, "/empty", args.requests)
+    default_ms = _time(client, "/default", args.requests) - baseline
+    fast_ms = _time(client, "/fast", args.requests) - baseline
+    print(f"{args.items} posts per page, {args.requests} requests, client overhead {baseline:.3f} ms subtracted")
+    print(f"default (response_model + stdlib json): {default_ms:.3f} ms")
+    print(f"ModelResponse (pydantic-core):          {fast_ms:.3f} ms   ({default_ms / fast_ms:.1f}x faster)")
+
+    body = ModelResponse(page).body
+    print(f"\npayload {len(body)} bytes")
+    for encoding in ("gzip", "br"):
+        if encoding == "br" and brotli is None:
+            print("br: brotli is not installed")
+            continue
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            compressed = _Compressor(encoding).compress(body, final=True)
+        elapsed = (time.perf_counter() - started) / args.requests * 1000
+        print(f"{encoding:>4}: {len(compressed)} bytes ({len(compressed) / len(body):.0%}) in {elapsed:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
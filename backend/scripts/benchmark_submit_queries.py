@@ -0,0 +1,85 @@
+"""Counts the SQL statements PostService.submit sends for one request.
+
+Submits the same post (with an image) to every platform twice: first for a user with no
+platforms yet, so they are created, then again once they exist.
+
+    python scripts/benchmark_submit_queries.py                      # in-memory SQLite built from the models
+    python scripts/benchmark_submit_queries.py --database-url URL   # an existing, migrated database
+    python scripts/benchmark_submit_queries.py --verbose            # also print each statement
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models.api import Api
+from app.models.image import Image
+from app.models.post import Post, PostAnalysis, AiInsight, PostOutbox
+from app.models.product import Product, ProductDesign
+from app.models.social_platform import SocialPlatform
+from app.models.enums import PlatformType
+from app.services import post as post_service
+from app.services.post import PostService
+from app.utils.query_counter import QueryCounter
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Database to use; defaults to an in-memory SQLite schema")
+    parser.add_argument("--user-id", type=int, default=987654321, help="User to submit as (its platforms are created if missing)")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url or "sqlite://")
+    if not args.database_url:
+        Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Measure the database work only; the outbox relay trigger goes to the broker
+    post_service.relay_post_outbox.delay = lambda *a, **kw: None
+
+    payload = {
+        "user_id": args.user_id,
+        "content_text": "Query count benchmark",
+        "platforms": [platform.value for platform in PlatformType],
+        "schedule_time": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "hashtags": ["#benchmark"],
+    }
+    for label in ("new platforms", "existing platforms"):
+        with Session() as db:
+            service = PostService(db)
+            service.submit(dict(payload))  # warm-up: mapper configuration, platform creation
+            with QueryCounter(engine) as counter:
+                started = time.perf_counter()
+                service.submit(dict(payload), image_file_path="static/uploads/benchmark.png")
+                elapsed = time.perf_counter() - started
+        if label == "new platforms":
+            # Measure platform creation on a fresh user
+            payload["user_id"] += 1
+            with Session() as db:
+                with QueryCounter(engine) as counter:
+                    started = time.perf_counter()
+                    PostService(db).submit(dict(payload), image_file_path="static/uploads/benchmark.png")
+                    elapsed = time.perf_counter() - started
+        print(f"{label}: {counter.count} statements for {len(PlatformType)} platforms in {elapsed * 1000:.1f} ms")
+        if args.verbose:
+            for statement in counter.statements:
+                print(f"    {' '.join(statement.split())[:120]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
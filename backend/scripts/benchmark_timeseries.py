@@ -0,0 +1,159 @@
+"""Benchmark of /analytics/posts/timeseries bucketing on a generated dataset.
+
+Fills a scratch database with --posts posts spread over --users users, their platforms and
+--days days of schedule times, builds post_status_daily, then times AnalyticsCRUD's
+bucketing (day and week buckets from the rollup, hour buckets from `posts`) against grouping
+`posts` in SQL and against bucketing fetched rows in Python. Every path must return the
+same counts. The default database is a throwaway SQLite file; never point --database-url
+at a database whose tables you want to keep.
+
+    python scripts/benchmark_timeseries.py
+    python scripts/benchmark_timeseries.py --posts 100000 --database-url sqlite:////tmp/ts.db
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.analytics import AnalyticsCRUD, PostStatusDailyCRUD, _as_utc_datetime, _bucket_start
+from app.database.base import Base
+from app.models.api import Api
+from app.models.image import Image
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post, PostAnalysis, AiInsight, PostOutbox, PostStatusDaily
+from app.models.product import Product, ProductDesign
+from app.models.social_platform import SocialPlatform
+from app.schemas.enums import TimeBucket
+
+BATCH = 50000
+# Mostly past and published, as in production
+STATUS_WEIGHTS = {
+    PostStatus.PUBLISHED: 60, PostStatus.SCHEDULED: 20, PostStatus.FAILED: 8,
+    PostStatus.DRAFT: 8, PostStatus.PENDING: 3, PostStatus.PUBLISHING: 1,
+}
+
+
+def _generate(db, posts: int, users: int, days: int, first_day: datetime) -> None:
+    platforms = list(PlatformType)
+    platform_rows = [
+        {"id": user_id * len(platforms) + i, "name": platform.value, "type": platform, "user_id": user_id}
+        for user_id in range(1, users + 1)
+        for i, platform in enumerate(platforms)
+    ]
+    db.execute(insert(SocialPlatform.__table__), platform_rows)
+
+    rng = random.Random(42)
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    seconds = days * 86400
+    for start in range(0, posts, BATCH):
+        rows = []
+        for post_id in range(start + 1, min(start + BATCH, posts) + 1):
+            platform = rng.choice(platform_rows)
+            rows.append({
+                "id": post_id,
+                "type": PostType.TEXT,
+                "content_text": {"text": f"post {post_id}"},
+                "platform_id": platform["id"],
+                "user_id": platform["user_id"],
+                "schedule_time": first_day + timedelta(seconds=rng.randrange(seconds)),
+                "status": rng.choices(statuses, weights)[0],
+            })
+        db.execute(insert(Post.__table__), rows)
+    db.commit()
+    PostStatusDailyCRUD(db).rebuild_users(1, users)
+    db.commit()
+
+
+def _sql_scan(crud: AnalyticsCRUD, bucket: TimeBucket, start: datetime, end: datetime) -> dict:
+    """Every bucket grouped from `posts`, without the rollup."""
+    dialect = crud.db.get_bind().dialect.name
+    keys = [_bucket_start(dialect, bucket, Post.schedule_time), SocialPlatform.type, Post.status]
+    rows = crud._post_counts(keys, None, None, start, end, join_platform=True)
+    return {(_as_utc_datetime(s), platform, status): count for s, platform, status, count in rows if status is not None}
+
+
+def _python_scan(crud: AnalyticsCRUD, bucket: TimeBucket, start: datetime, end: datetime) -> dict:
+    """Every post fetched and bucketed row by row, the approach the endpoint avoids."""
+    counts: Counter = Counter()
+    rows = (
+        crud.db.query(Post.schedule_time, SocialPlatform.type, Post.status)
+        .join(SocialPlatform, Post.platform_id == SocialPlatform.id)
+        .filter(Post.schedule_time >= start, Post.schedule_time <= end)
+        .yield_per(BATCH)
+    )
+    for schedule_time, platform, status in rows:
+        if status is None:
+            continue
+        when = schedule_time.replace(minute=0, second=0, microsecond=0)
+        if bucket != TimeBucket.HOUR:
+            when = when.replace(hour=0)
+        if bucket == TimeBucket.WEEK:
+            when -= timedelta(days=when.weekday())
+        counts[(_as_utc_datetime(when), platform, status)] += 1
+    return dict(counts)
+
+
+def _time(label: str, run, repeat: int):
+    """Runs `run` `repeat` times, prints the mean milliseconds and returns the last result."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    print(f"  {label:<28} {(time.perf_counter() - started) / repeat * 1000:9.1f} ms")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365, help="Schedule times are spread over this many days")
+    parser.add_argument("--database-url", help="Scratch database; its tables are dropped and recreated")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timed query")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_timeseries.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        first_day = datetime(2025, 1, 1)
+        started = time.perf_counter()
+        _generate(db, args.posts, args.users, args.days, first_day)
+        rollup_rows = db.query(PostStatusDaily).count()
+        print(f"{args.posts} posts, {rollup_rows} rollup rows generated in {time.perf_counter() - started:.1f}s ({engine.dialect.name})")
+
+        crud = AnalyticsCRUD(db)
+        # Unaligned ends, so the edge days are counted from `posts`
+        ranges = {
+            TimeBucket.HOUR: (first_day + timedelta(days=10, hours=5, minutes=30), first_day + timedelta(days=40, hours=2)),
+            TimeBucket.DAY: (first_day + timedelta(hours=7), first_day + timedelta(days=args.days - 1, hours=18)),
+            TimeBucket.WEEK: (first_day + timedelta(hours=7), first_day + timedelta(days=args.days - 1, hours=18)),
+        }
+        for bucket, (start, end) in ranges.items():
+            print(f"\n{bucket.value} buckets, {start} to {end}")
+            served = _time("AnalyticsCRUD", lambda: crud.get_post_counts_by_bucket(bucket, start, end), args.repeat)
+            scanned = _time("GROUP BY over posts", lambda: _sql_scan(crud, bucket, start, end), args.repeat)
+            python = _time("Python over fetched posts", lambda: _python_scan(crud, bucket, start, end), 1)
+            if not served == scanned == python:
+                print(f"  MISMATCH: {len(served)} / {len(scanned)} / {len(python)} points")
+                return 1
+            print(f"  {len(served)} points, {sum(served.values())} posts, all paths agree")
+        return 0
+    finally:
+        db.close()
+        if not args.database_url:
+            os.remove(engine.url.database)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
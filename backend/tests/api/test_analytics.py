@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.crud.analytics import PostStatusDailyCRUD
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+
+URL = "/api/v1/analytics/posts/timeseries"
+UTC = timezone.utc
+# Monday 12:00 to the next Monday 09:00, so both end days are partial
+RANGE = {"start_date": "2026-10-12T12:00:00Z", "end_date": "2026-10-19T09:00:00Z"}
+SCHEDULED, PUBLISHED = PostStatus.SCHEDULED.value, PostStatus.PUBLISHED.value
+
+
+@pytest.fixture
+def posts(db):
+    platforms = {t: SocialPlatform(name=t.value, type=t, user_id=1) for t in (PlatformType.TWITTER, PlatformType.LINKEDIN)}
+    for platform_type, status, schedule_time in [
+        (PlatformType.TWITTER, PostStatus.SCHEDULED, datetime(2026, 10, 12, 0, 0)),  # before the range
+        (PlatformType.TWITTER, PostStatus.SCHEDULED, datetime(2026, 10, 13, 9, 10)),
+        (PlatformType.TWITTER, PostStatus.PUBLISHED, datetime(2026, 10, 13, 9, 50)),
+        (PlatformType.TWITTER, PostStatus.SCHEDULED, datetime(2026, 10, 13, 10, 5)),
+        (PlatformType.LINKEDIN, PostStatus.SCHEDULED, datetime(2026, 10, 14, 23, 59)),
+        (PlatformType.TWITTER, PostStatus.SCHEDULED, datetime(2026, 10, 19, 8, 0)),
+        (PlatformType.TWITTER, PostStatus.SCHEDULED, datetime(2026, 10, 19, 9, 30)),  # after the range
+    ]:
+        db.add(Post(
+            type=PostType.TEXT, content_text={"text": "hi"}, platform=platforms[platform_type], user_id=1,
+            status=status, schedule_time=schedule_time,
+        ))
+    db.flush()
+    # Day and week buckets read whole days from the rollup
+    PostStatusDailyCRUD(db).rebuild_users(1, 1)
+    db.commit()
+
+
+def _points(response):
+    assert response.status_code == 200, response.text
+    return [
+        (datetime.fromisoformat(point["bucket_start"]), point["platform_type"], point["status"], point["count"])
+        for point in response.json()["points"]
+    ]
+
+
+@pytest.mark.parametrize("bucket, points", [
+    ("hour", [
+        (datetime(2026, 10, 13, 9, tzinfo=UTC), "twitter", PUBLISHED, 1),
+        (datetime(2026, 10, 13, 9, tzinfo=UTC), "twitter", SCHEDULED, 1),
+        (datetime(2026, 10, 13, 10, tzinfo=UTC), "twitter", SCHEDULED, 1),
+        (datetime(2026, 10, 14, 23, tzinfo=UTC), "linkedin", SCHEDULED, 1),
+        (datetime(2026, 10, 19, 8, tzinfo=UTC), "twitter", SCHEDULED, 1),
+    ]),
+    ("day", [
+        (datetime(2026, 10, 13, tzinfo=UTC), "twitter", PUBLISHED, 1),
+        (datetime(2026, 10, 13, tzinfo=UTC), "twitter", SCHEDULED, 2),
+        (datetime(2026, 10, 14, tzinfo=UTC), "linkedin", SCHEDULED, 1),
+        (datetime(2026, 10, 19, tzinfo=UTC), "twitter", SCHEDULED, 1),
+    ]),
+    ("week", [
+        (datetime(2026, 10, 12, tzinfo=UTC), "linkedin", SCHEDULED, 1),
+        (datetime(2026, 10, 12, tzinfo=UTC), "twitter", PUBLISHED, 1),
+        (datetime(2026, 10, 12, tzinfo=UTC), "twitter", SCHEDULED, 2),
+        (datetime(2026, 10, 19, tzinfo=UTC), "twitter", SCHEDULED, 1),
+    ]),
+])
+def test_posts_are_counted_by_bucket_within_the_range(client, posts, bucket, points):
+    assert _points(client.get(URL, params={**RANGE, "bucket": bucket})) == points
+
+
+def test_buckets_are_filtered_by_platform(client, posts):
+    points = _points(client.get(URL, params={**RANGE, "bucket": "week", "platform_type": "linkedin"}))
+
+    assert points == [(datetime(2026, 10, 12, tzinfo=UTC), "linkedin", SCHEDULED, 1)]
+
+
+@pytest.mark.parametrize("bucket, span", [
+    ("hour", timedelta(hours=1000)),
+    ("day", timedelta(days=1000)),
+    ("week", timedelta(weeks=1000)),
+])
+def test_at_most_a_thousand_buckets(client, db, bucket, span):
+    start = datetime(2000, 1, 3, tzinfo=UTC)
+
+    def timeseries(end):
+        return client.get(URL, params={"start_date": start.isoformat(), "end_date": end.isoformat(), "bucket": bucket})
+
+    assert timeseries(start + span).status_code == 200
+    response = timeseries(start + span + timedelta(seconds=1))
+
+    assert response.status_code == 400
+    assert "At most 1000" in response.json()["detail"]
+
+
+def test_reversed_range_is_rejected(client, db):
+    response = client.get(URL, params={"start_date": RANGE["end_date"], "end_date": RANGE["start_date"]})
+
+    assert response.status_code == 400
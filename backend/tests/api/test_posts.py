@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import text
+
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+
+
+@pytest.fixture
+def post_ids(db):
+    """Seven posts, five of them created in the same second, as a bulk insert would."""
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1)
+    db.add(platform)
+    db.flush()
+    posts = [
+        Post(type=PostType.TEXT, content_text={"text": f"post {i}", "hashtags": []}, platform_id=platform.id,
+             user_id=1 + i % 2, status=PostStatus.DRAFT)
+        for i in range(7)
+    ]
+    db.add_all(posts)
+    db.flush()
+    # Written as the server default writes them, without a fraction of a second
+    for post, second in zip(posts, [40, 44, 44, 44, 44, 44, 50]):
+        db.execute(
+            text("UPDATE posts SET created_at = :created_at WHERE id = :id"),
+            {"created_at": f"2026-10-18 01:26:{second}", "id": post.id},
+        )
+    db.commit()
+    return [post.id for post in posts]
+
+
+def _all_pages(client, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/v1/posts", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        ids += [post["id"] for post in body["posts"]]
+        cursor, pages = body["next_cursor"], pages + 1
+        if cursor is None or pages > 10:
+            return ids
+
+
+def test_cursor_pages_through_posts_created_in_the_same_second(client, post_ids):
+    ids = _all_pages(client, limit=2)
+
+    # Newest first, ties broken by the highest id; every post exactly once
+    assert ids == [post_ids[6], *reversed(post_ids[1:6]), post_ids[0]]
+
+
+def test_cursor_pages_through_one_users_posts(client, post_ids):
+    ids = _all_pages(client, limit=1, user_id=2)
+
+    assert ids == [post_ids[5], post_ids[3], post_ids[1]]
+
+
+def test_offset_is_rejected(client, post_ids):
+    response = client.get("/api/v1/posts", params={"limit": 2, "offset": 4})
+
+    assert response.status_code == 400
+    assert "cursor" in response.json()["detail"]
+
+
+def test_malformed_cursor_is_rejected(client, post_ids):
+    assert client.get("/api/v1/posts", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def _revalidate(client, url, etag, **params):
+    return client.get(url, params=params, headers={"If-None-Match": etag})
+
+
+@pytest.mark.parametrize("url, params", [("/api/v1/posts", {"limit": 3}), ("/api/v1/post/{id}", {})])
+def test_matching_etag_gets_a_304(client, post_ids, url, params):
+    url = url.format(id=post_ids[0])
+    first = client.get(url, params=params)
+    etag = first.headers["etag"]
+
+    response = _revalidate(client, url, etag, **params)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # A weakly-equal tag in a list of candidates still matches; another tag does not
+    assert _revalidate(client, url, f'"other", {etag.removeprefix("W/")}', **params).status_code == 304
+    assert _revalidate(client, url, 'W/"other"', **params).status_code == 200
+
+
+def test_updating_a_post_changes_the_etags(client, db, post_ids):
+    detail_url = f"/api/v1/post/{post_ids[6]}"
+    list_etag = client.get("/api/v1/posts", params={"limit": 3}).headers["etag"]
+    detail_etag = client.get(detail_url).headers["etag"]
+
+    post = db.get(Post, post_ids[6])
+    post.status = PostStatus.SCHEDULED
+    db.commit()
+
+    listed = _revalidate(client, "/api/v1/posts", list_etag, limit=3)
+    detail = _revalidate(client, detail_url, detail_etag)
+    assert listed.status_code == 200 and listed.headers["etag"] != list_etag
+    assert detail.status_code == 200 and detail.headers["etag"] != detail_etag
+    assert detail.json()["status"] == PostStatus.SCHEDULED.value
+    # The new tags revalidate again
+    assert _revalidate(client, "/api/v1/posts", listed.headers["etag"], limit=3).status_code == 304
+    assert _revalidate(client, detail_url, detail.headers["etag"]).status_code == 304
+
+
+def test_deleting_a_post_changes_the_etags(client, db, post_ids):
+    detail_url = f"/api/v1/post/{post_ids[6]}"
+    list_etag = client.get("/api/v1/posts", params={"limit": 3}).headers["etag"]
+    detail_etag = client.get(detail_url).headers["etag"]
+
+    db.delete(db.get(Post, post_ids[6]))
+    db.commit()
+
+    listed = _revalidate(client, "/api/v1/posts", list_etag, limit=3)
+    assert listed.status_code == 200 and listed.headers["etag"] != list_etag
+    assert post_ids[6] not in [post["id"] for post in listed.json()["posts"]]
+    assert _revalidate(client, detail_url, detail_etag).status_code == 404
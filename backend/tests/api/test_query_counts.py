@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.platform_cache import platform_cache
+from app.models.enums import ImageType, PlatformType, PostStatus, PostType
+from app.models.image import Image
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+from app.services import post as post_service
+from app.services.post import PostService
+
+
+@pytest.fixture
+def post_id(db, monkeypatch):
+    """A hundred posts, each with an image and a platform; returns the first one's id."""
+    # Count what a cache miss costs
+    monkeypatch.setattr(settings, "READ_CACHE_ENABLED", False)
+    platforms = [SocialPlatform(name=t.value, type=t, user_id=1) for t in PlatformType]
+    posts = [
+        Post(
+            type=PostType.IMAGE,
+            content_text={"text": f"post {i}", "hashtags": ["#check"], "target_audience": "devs"},
+            platform=platforms[i % len(platforms)],
+            image=Image(type=ImageType.URL, path=f"https://example.invalid/{i}.jpg"),
+            user_id=1,
+            status=PostStatus.SCHEDULED,
+        )
+        for i in range(100)
+    ]
+    db.add_all(posts)
+    db.commit()
+    return posts[0].id
+
+
+@pytest.mark.parametrize("limit", [1, 20, 100])
+def test_list_takes_one_statement_whatever_the_page_size(client, queries, post_id, limit):
+    with queries:
+        response = client.get("/api/v1/posts", params={"limit": limit})
+
+    assert response.status_code == 200
+    assert len(response.json()["posts"]) == limit
+    assert queries.count == 1, queries.statements
+
+
+def test_detail_takes_one_statement(client, queries, post_id):
+    with queries:
+        response = client.get(f"/api/v1/post/{post_id}")
+
+    assert response.status_code == 200
+    assert response.json()["image"]["path"].endswith("/0.jpg")
+    assert queries.count == 1, queries.statements
+
+
+def _submit_payload():
+    return {
+        "user_id": 1,
+        "content_text": "Query count check",
+        "platforms": [platform.value for platform in PlatformType],
+        "schedule_time": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "hashtags": ["#check"],
+    }
+
+
+@pytest.fixture
+def submit(db, fake_redis, monkeypatch):
+    """Submits a scheduled post with an image to every platform, and returns the response."""
+    # The outbox relay trigger goes to the broker, not the database
+    monkeypatch.setattr(post_service.relay_post_outbox, "delay", lambda *args, **kwargs: None)
+
+    def run():
+        return PostService(db).submit(_submit_payload(), image_file_path="static/uploads/check.png")
+
+    return run
+
+
+# Per submit: the platform lookup (skipped on a platform cache hit), the image, each new platform
+# and each post (one INSERT apiece, for the ids), the rollup snapshot and upsert, and the outbox rows
+@pytest.mark.parametrize("earlier_submits, statements", [(0, 13), (1, 9), (2, 8)],
+                         ids=["new platforms", "existing platforms", "cached platforms"])
+def test_submit_statement_count(db, queries, submit, earlier_submits, statements):
+    platform_cache.clear()
+    for _ in range(earlier_submits):
+        submit()
+    db.expunge_all()
+
+    with queries:
+        response = submit()
+
+    assert response.data.platforms == list(PlatformType)
+    assert queries.count == statements, queries.statements
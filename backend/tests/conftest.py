@@ -1 +1,105 @@
-# Pytest configuration placeholder
+import os
+import tempfile
+
+# Settings are read when app modules are imported, so the test database and an unreachable
+# Redis are configured first; tests that need Redis use the `fake_redis` fixture
+_DB_DIR = tempfile.mkdtemp(prefix="app-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'app.db')}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_DB_DIR, 'app.db')}"
+os.environ["REDIS_URL"] = "redis://localhost:1/0"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ["USE_DUMMY_AI_PROVIDER"] = "false"
+for name in ("DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD", "JWT_SECRET_KEY", "FRONTEND_URL"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("DB_PORT", "3306")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+import fakeredis
+import pytest
+import redis
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.core import redis as app_redis
+from app.database.base import Base
+from app.database.session import SessionLocal, engine
+from app.models.api import Api
+from app.models.image import Image
+from app.models.post import Post, PostAnalysis, AiInsight, PostOutbox, PostStatusDaily
+from app.models.product import Product, ProductDesign
+from app.models.social_platform import SocialPlatform
+from app.utils.query_counter import QueryCounter
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+class BrokenRedis:
+    """A Redis client whose every command fails, as when Redis is down."""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError("Redis is down")
+        return fail
+
+
+@pytest.fixture
+def broken_redis():
+    return BrokenRedis()
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """An in-process Redis, installed as the app's client."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(app_redis, "_client", client)
+    return client
+
+
+@pytest.fixture
+def db():
+    """A session on a freshly created test database."""
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_db(tmp_path):
+    """An AsyncSession on a fresh aiosqlite database, configured like AsyncSessionLocal."""
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSession(async_engine, autoflush=False, expire_on_commit=False) as session:
+        yield session
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def client(db, fake_redis):
+    """A client for the app, on the test database and the in-process Redis."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def queries():
+    """Records the statements sent to the test database inside `with queries:`."""
+    return QueryCounter(engine)
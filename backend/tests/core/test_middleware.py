@@ -0,0 +1,121 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core import middleware
+from app.core.middleware import CompressionMiddleware, _negotiate_encoding
+
+needs_brotli = pytest.mark.skipif(middleware.brotli is None, reason="brotli is not installed")
+
+PAYLOAD = {"posts": [{"id": i, "text": "hello world"} for i in range(50)]}
+
+
+async def big(request):
+    return JSONResponse(PAYLOAD)
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def encoded(request):
+    return Response(gzip.compress(b"already gzipped" * 100), media_type="application/json",
+                    headers={"Content-Encoding": "gzip"})
+
+
+async def image(request):
+    return Response(b"\x89PNG" * 500, media_type="image/png")
+
+
+async def stream(request):
+    async def chunks():
+        yield b"["
+        for i in range(200):
+            yield json.dumps({"id": i}).encode() + b","
+        yield b"{}]"
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route(f"/{endpoint.__name__}", endpoint) for endpoint in (big, small, encoded, image, stream)])
+    return TestClient(CompressionMiddleware(app, minimum_size=500))
+
+
+def _get(client, path, accept_encoding):
+    # Read the raw body, so what went over the wire can be checked
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    pytest.param("gzip, deflate, br", "br", marks=needs_brotli),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0", None),
+    ("identity", None),
+    pytest.param("*", "br", marks=needs_brotli),
+    ("*;q=0.5, br;q=0", "gzip"),
+    ("", None),
+    ("gzip;q=oops", None),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert _negotiate_encoding(accept_encoding) == expected
+
+
+def test_negotiate_encoding_falls_back_to_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(middleware, "brotli", None)
+
+    assert _negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert _negotiate_encoding("br") is None
+
+
+@pytest.mark.parametrize("accept_encoding", [pytest.param("br", marks=needs_brotli), "gzip"])
+def test_large_json_is_compressed_as_negotiated(client, accept_encoding):
+    response, raw = _get(client, "/big", accept_encoding)
+    decompress = middleware.brotli.decompress if accept_encoding == "br" else gzip.decompress
+
+    assert response.headers["content-encoding"] == accept_encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(raw)
+    assert json.loads(decompress(raw)) == PAYLOAD
+
+
+def test_nothing_is_compressed_without_accept_encoding(client):
+    response, raw = _get(client, "/big", "identity")
+
+    assert "content-encoding" not in response.headers
+    assert json.loads(raw) == PAYLOAD
+
+
+def test_responses_below_the_minimum_size_are_sent_as_they_are(client):
+    response, raw = _get(client, "/small", "gzip")
+
+    assert "content-encoding" not in response.headers
+    assert raw == b'{"ok":true}'
+
+
+def test_already_encoded_responses_are_not_compressed_again(client):
+    response, raw = _get(client, "/encoded", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == b"already gzipped" * 100
+
+
+def test_non_text_responses_are_not_compressed(client):
+    response, raw = _get(client, "/image", "gzip")
+
+    assert "content-encoding" not in response.headers
+    assert raw == b"\x89PNG" * 500
+
+
+def test_streamed_responses_are_compressed_as_they_stream(client):
+    response, raw = _get(client, "/stream", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(json.loads(gzip.decompress(raw))) == 201
@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import platform_cache as platform_cache_module
+from app.core.platform_cache import CachedPlatform, PlatformCache, platform_cache
+from app.crud.social_platform import SocialPlatformCRUD
+from app.models.enums import PlatformStatus, PlatformType
+from app.models.social_platform import SocialPlatform
+
+TWITTER = (1, PlatformType.TWITTER)
+FACEBOOK = (1, PlatformType.FACEBOOK)
+OTHER_USER = (2, PlatformType.TWITTER)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(platform_cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _process(client, **kwargs):
+    """A PlatformCache as another process would have it, sharing only Redis."""
+    return PlatformCache(ttl_seconds=kwargs.pop("ttl_seconds", 60), client=client, **kwargs)
+
+
+def _load(cache, entries):
+    """Looks `entries` up and stores them as the loader of a miss would."""
+    found, missing, generations = cache.get_many(entries)
+    cache.put_many({key: entries[key] for key in missing}, generations)
+
+
+def test_hit_until_the_ttl_runs_out(fake_redis, clock):
+    cache = _process(fake_redis)
+    _load(cache, {TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED)})
+
+    assert cache.get_many([TWITTER])[:2] == ({TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED)}, [])
+    clock[0] += 60
+
+    assert cache.get_many([TWITTER])[:2] == ({}, [TWITTER])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entries_are_evicted(fake_redis, clock):
+    cache = _process(fake_redis, max_entries=2)
+    for key in (TWITTER, FACEBOOK, TWITTER, OTHER_USER):
+        _load(cache, {key: CachedPlatform(key[0], PlatformStatus.CONNECTED)})
+
+    found, missing, _ = cache.get_many([TWITTER, FACEBOOK, OTHER_USER])
+
+    assert set(found) == {TWITTER, OTHER_USER}
+    assert missing == [FACEBOOK]
+
+
+def test_invalidation_reaches_other_processes(fake_redis, clock):
+    api, worker = _process(fake_redis), _process(fake_redis)
+    _load(worker, {TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED), FACEBOOK: CachedPlatform(2, PlatformStatus.CONNECTED),
+                   OTHER_USER: CachedPlatform(3, PlatformStatus.CONNECTED)})
+
+    api.invalidate([TWITTER])
+
+    # Every platform of the invalidated user is loaded again, other users' stay cached
+    found, missing, _ = worker.get_many([TWITTER, FACEBOOK, OTHER_USER])
+    assert set(found) == {OTHER_USER}
+    assert sorted(missing) == [FACEBOOK, TWITTER]
+
+
+def test_clear_reaches_other_processes(fake_redis, clock):
+    api, worker = _process(fake_redis), _process(fake_redis)
+    _load(worker, {TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED), OTHER_USER: CachedPlatform(3, PlatformStatus.CONNECTED)})
+
+    api.clear()
+
+    assert worker.get_many([TWITTER, OTHER_USER])[0] == {}
+
+
+def test_invalidation_during_a_load_is_not_lost(fake_redis, clock):
+    api, worker = _process(fake_redis), _process(fake_redis)
+    found, missing, generations = worker.get_many([TWITTER])
+
+    # The platform changes while the worker queries it, so what it read may be the old row
+    api.invalidate([TWITTER])
+    worker.put_many({TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED)}, generations)
+
+    assert worker.get_many([TWITTER])[:2] == ({}, [TWITTER])
+
+
+def test_without_redis_entries_are_used_until_the_ttl(broken_redis, fake_redis, clock):
+    api, worker = _process(fake_redis), _process(broken_redis)
+    _load(worker, {TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED)})
+
+    api.invalidate([TWITTER])
+
+    assert worker.get_many([TWITTER])[0] == {TWITTER: CachedPlatform(1, PlatformStatus.CONNECTED)}
+    clock[0] += 60
+    assert worker.get_many([TWITTER])[0] == {}
+    # Each lookup failed to read the generations
+    assert worker.errors == 3
+
+
+def test_committed_platform_changes_invalidate_other_processes(db, fake_redis):
+    platform_cache.clear()
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1, status=PlatformStatus.CONNECTED)
+    db.add(platform)
+    db.commit()
+    worker = _process(fake_redis)
+    _load(worker, {TWITTER: CachedPlatform(platform.id, PlatformStatus.CONNECTED)})
+
+    platform.status = PlatformStatus.EXPIRED
+    db.flush()
+    # Not before the commit: another process would cache the old row again
+    assert TWITTER in worker.get_many([TWITTER])[0]
+    db.commit()
+
+    assert worker.get_many([TWITTER])[0] == {}
+    assert SocialPlatformCRUD(db).get_cached([TWITTER]) == {TWITTER: CachedPlatform(platform.id, PlatformStatus.EXPIRED)}
+
+
+def test_rolled_back_platform_changes_do_not_invalidate(db, fake_redis):
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1, status=PlatformStatus.CONNECTED)
+    db.add(platform)
+    db.commit()
+    worker = _process(fake_redis)
+    _load(worker, {TWITTER: CachedPlatform(platform.id, PlatformStatus.CONNECTED)})
+
+    platform.status = PlatformStatus.EXPIRED
+    db.flush()
+    db.rollback()
+    db.commit()
+
+    assert TWITTER in worker.get_many([TWITTER])[0]
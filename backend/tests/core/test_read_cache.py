@@ -0,0 +1,142 @@
+import pytest
+from pydantic import BaseModel
+
+from app.core.read_cache import ReadThroughCache, post_detail_cache, post_summary_cache
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+
+
+class Value(BaseModel):
+    number: int
+
+
+class Loader:
+    """Counts its calls and returns the next value each time."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self) -> Value:
+        self.calls += 1
+        return Value(number=self.calls)
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return ReadThroughCache("test", ttl_seconds=60, max_entries=2, client=fake_redis)
+
+
+def test_hit_after_miss(cache, fake_redis):
+    load = Loader()
+
+    assert cache.get_or_load("a", Value, load) == Value(number=1)
+    assert cache.get_or_load("a", Value, load) == Value(number=1)
+
+    assert load.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert 0 < fake_redis.ttl("cache:test:a@0") <= 60
+
+
+def test_none_is_not_cached(cache):
+    loads = []
+
+    assert cache.get_or_load("a", Value, lambda: loads.append(1)) is None
+    assert cache.get_or_load("a", Value, lambda: loads.append(1)) is None
+
+    assert len(loads) == 2
+
+
+def test_invalidated_scope_is_loaded_again(cache):
+    load = Loader()
+    cache.get_or_load("a", Value, load, scope="user:1")
+    cache.get_or_load("b", Value, load, scope="user:2")
+
+    cache.invalidate(["user:1"])
+
+    assert cache.get_or_load("a", Value, load, scope="user:1") == Value(number=3)
+    assert cache.get_or_load("b", Value, load, scope="user:2") == Value(number=2)
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    load = Loader()
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_load(key, Value, load)
+
+    assert load.calls == 3
+    assert cache.get_or_load("a", Value, load) == Value(number=1)
+    assert cache.get_or_load("b", Value, load) == Value(number=4)
+
+
+def test_redis_errors_fall_back_to_the_loader(broken_redis):
+    cache = ReadThroughCache("test", ttl_seconds=60, client=broken_redis)
+    load = Loader()
+
+    assert cache.get_or_load("a", Value, load) == Value(number=1)
+    assert cache.get_or_load("a", Value, load) == Value(number=2)
+    cache.invalidate(["a"])
+
+    assert (cache.hits, cache.misses, cache.errors) == (0, 2, 3)
+
+
+@pytest.fixture
+def post(db):
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=5)
+    db.add(platform)
+    db.flush()
+    post = Post(type=PostType.TEXT, content_text={"text": "hi"}, platform_id=platform.id, user_id=5, status=PostStatus.SCHEDULED)
+    db.add(post)
+    db.commit()
+    return post
+
+
+def _generations(fake_redis, post_id):
+    """The current generation of the post's detail scope and of the summary scopes covering it."""
+    return (
+        fake_redis.get(f"cache:post_detail:gen:{post_id}"),
+        fake_redis.get("cache:post_summary:gen:user:5"),
+        fake_redis.get("cache:post_summary:gen:all"),
+    )
+
+
+def test_post_update_bumps_generations_on_commit(db, post, fake_redis):
+    post.remarks = "edited"
+    db.flush()
+    assert _generations(fake_redis, post.id) == (None, None, None)
+
+    db.commit()
+
+    assert None not in _generations(fake_redis, post.id)
+
+
+def test_post_delete_bumps_generations_on_commit(db, post, fake_redis):
+    post_id = post.id
+    db.delete(post)
+    db.flush()
+    assert _generations(fake_redis, post_id) == (None, None, None)
+
+    db.commit()
+
+    assert None not in _generations(fake_redis, post_id)
+
+
+def test_cached_detail_is_reloaded_after_the_post_changes(db, post, fake_redis):
+    load = Loader()
+    post_detail_cache.get_or_load(str(post.id), Value, load)
+    post_summary_cache.get_or_load("5|*|*|*", Value, load, scope="user:5")
+
+    post.status = PostStatus.PUBLISHED
+    db.commit()
+
+    assert post_detail_cache.get_or_load(str(post.id), Value, load) == Value(number=3)
+    assert post_summary_cache.get_or_load("5|*|*|*", Value, load, scope="user:5") == Value(number=4)
+
+
+def test_rollback_does_not_invalidate(db, post, fake_redis):
+    post.remarks = "edited"
+    db.flush()
+    db.rollback()
+    # An unrelated commit afterwards must not apply the discarded invalidation either
+    db.commit()
+
+    assert _generations(fake_redis, post.id) == (None, None, None)
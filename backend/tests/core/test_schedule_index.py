@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import redis
+
+from app.core.schedule_index import ScheduleIndex, schedule_index
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+from app.tasks.services.schedule_post import reconcile_schedule_index
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def index(fake_redis):
+    return ScheduleIndex(client=fake_redis)
+
+
+def test_add_scores_posts_by_due_time(index, fake_redis):
+    index.add([(1, NOW), (2, NOW + timedelta(minutes=5)), (3, None)])
+
+    assert fake_redis.zrange(index.key, 0, -1, withscores=True) == [
+        ("1", NOW.timestamp()),
+        ("2", (NOW + timedelta(minutes=5)).timestamp()),
+    ]
+
+
+def test_add_rescores_existing_posts_and_treats_naive_times_as_utc(index, fake_redis):
+    index.add([(1, NOW)])
+    index.add([(1, (NOW + timedelta(hours=1)).replace(tzinfo=None))])
+
+    assert fake_redis.zscore(index.key, "1") == (NOW + timedelta(hours=1)).timestamp()
+    assert index.size() == 1
+
+
+def test_pop_due_returns_only_due_posts_earliest_first(index):
+    index.add([(3, NOW), (1, NOW - timedelta(minutes=10)), (2, NOW + timedelta(seconds=1))])
+
+    assert index.pop_due(NOW, limit=10) == [(1, NOW - timedelta(minutes=10)), (3, NOW)]
+
+
+def test_pop_due_removes_popped_posts(index):
+    index.add([(1, NOW), (2, NOW + timedelta(hours=1))])
+
+    index.pop_due(NOW, limit=10)
+
+    assert index.pop_due(NOW, limit=10) == []
+    assert index.pop_due(NOW + timedelta(hours=1), limit=10) == [(2, NOW + timedelta(hours=1))]
+
+
+def test_pop_due_takes_at_most_limit_posts(index):
+    index.add([(post_id, NOW - timedelta(seconds=post_id)) for post_id in range(1, 6)])
+
+    first = index.pop_due(NOW, limit=2)
+    rest = index.pop_due(NOW, limit=10)
+
+    assert [post_id for post_id, _ in first] == [5, 4]
+    assert [post_id for post_id, _ in rest] == [3, 2, 1]
+
+
+def test_remove_drops_posts(index):
+    index.add([(1, NOW), (2, NOW)])
+
+    index.remove([1, 99])
+    index.remove([])
+
+    assert index.pop_due(NOW, limit=10) == [(2, NOW)]
+
+
+def test_writes_swallow_redis_errors(broken_redis):
+    index = ScheduleIndex(client=broken_redis)
+
+    index.add([(1, NOW)])
+    index.remove([1])
+
+
+def test_reads_raise_redis_errors_so_callers_can_scan_posts(broken_redis):
+    index = ScheduleIndex(client=broken_redis)
+
+    with pytest.raises(redis.RedisError):
+        index.pop_due(NOW, limit=10)
+    with pytest.raises(redis.RedisError):
+        index.rebuild([(1, NOW)], max_post_id=1)
+
+
+def _post(db, post_id, platform, status, schedule_time, lease_expires_at=None):
+    db.add(Post(
+        id=post_id, type=PostType.TEXT, content_text={"text": f"post {post_id}"}, platform_id=platform.id,
+        user_id=platform.user_id, status=status, schedule_time=schedule_time, lease_expires_at=lease_expires_at,
+    ))
+
+
+def test_rebuild_from_pending_posts(db, fake_redis):
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1)
+    db.add(platform)
+    db.flush()
+    _post(db, 1, platform, PostStatus.SCHEDULED, NOW + timedelta(hours=1))
+    _post(db, 2, platform, PostStatus.PUBLISHING, NOW, lease_expires_at=NOW + timedelta(minutes=5))
+    _post(db, 3, platform, PostStatus.PUBLISHED, NOW)
+    db.commit()
+    # Drift: a wrong score, a post that is no longer pending, and one submitted after the snapshot
+    schedule_index.add([(1, NOW), (3, NOW), (50, NOW)])
+
+    assert reconcile_schedule_index() == "Indexed 2 posts, removed 1"
+
+    assert fake_redis.zrange(schedule_index.key, 0, -1, withscores=True) == [
+        ("50", NOW.timestamp()),
+        ("2", (NOW + timedelta(minutes=5)).timestamp()),
+        ("1", (NOW + timedelta(hours=1)).timestamp()),
+    ]
@@ -0,0 +1,91 @@
+import json
+
+import httpx
+import pytest
+
+from app.core.exceptions import DatabaseException
+from app.crud.api import AsyncApiCRUD
+from app.dependencies import get_async_db
+from app.main import app
+from app.models.api import Api
+from app.models.enums import ApiType
+from app.services.ai_providers import AIProviderFactory, GeminiProvider, OpenAIProvider
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = 3
+
+
+async def _add_apis(crud: AsyncApiCRUD):
+    return [
+        await crud.commit_and_refresh(Api(user_id=USER_ID, type=ApiType.OPENAI, endpoint="https://openai", access_key="k", load=5)),
+        await crud.commit_and_refresh(Api(user_id=USER_ID, type=ApiType.GEMINI, endpoint="https://gemini", access_key="k", load=1)),
+        await crud.commit_and_refresh(Api(user_id=USER_ID + 1, type=ApiType.GROK, endpoint="https://grok", access_key="k", load=0)),
+    ]
+
+
+async def test_commit_and_refresh_writes_and_reloads(async_db):
+    api = await AsyncApiCRUD(async_db).commit_and_refresh(
+        Api(user_id=USER_ID, type=ApiType.OPENAI, endpoint="https://openai", access_key="k")
+    )
+
+    assert api.id is not None
+    # Server defaults are read back by the refresh
+    assert api.load == 0 and api.created_at is not None
+
+
+async def test_commit_and_refresh_rolls_back_and_raises(async_db):
+    crud = AsyncApiCRUD(async_db)
+
+    with pytest.raises(DatabaseException):
+        await crud.commit_and_refresh(Api(user_id=USER_ID, type=ApiType.OPENAI, endpoint=None, access_key="k"))
+
+    # The session is usable again after the rollback
+    assert await crud.list_by_user(USER_ID) == []
+
+
+async def test_reads(async_db):
+    crud = AsyncApiCRUD(async_db)
+    openai, gemini, _ = await _add_apis(crud)
+
+    assert await crud.get_by_user_and_type(USER_ID, ApiType.GEMINI) == gemini
+    assert await crud.get_by_user_and_type(USER_ID, ApiType.GROK) is None
+    assert {api.id for api in await crud.list_by_user(USER_ID)} == {openai.id, gemini.id}
+    assert await crud.get_best_api_by_load(USER_ID) == gemini
+    assert await crud.get_best_api_by_load(USER_ID + 2) is None
+
+
+async def test_provider_factory_picks_the_least_loaded_api(async_db):
+    crud = AsyncApiCRUD(async_db)
+    await _add_apis(crud)
+
+    provider = await AIProviderFactory(crud).get_provider(USER_ID)
+
+    assert isinstance(provider, GeminiProvider)
+
+
+async def test_suggest_hashtag_endpoint_reads_through_the_async_session(async_db, monkeypatch):
+    await _add_apis(AsyncApiCRUD(async_db))
+
+    async def ask(self, prompt, temperature=0.7, max_tokens=500):
+        tag = "#gemini" if isinstance(self, GeminiProvider) else "#openai"
+        return json.dumps([tag]) if "hashtag" in prompt.lower() else json.dumps({"score": 70, "suggestions": ["ok"]})
+
+    monkeypatch.setattr(GeminiProvider, "ask", ask)
+    monkeypatch.setattr(OpenAIProvider, "ask", ask)
+
+    async def override():
+        yield async_db
+
+    app.dependency_overrides[get_async_db] = override
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/suggest-hashtag",
+                json={"user_id": USER_ID, "content_text": "New shirts", "platform_types": ["twitter"]},
+            )
+    finally:
+        app.dependency_overrides.pop(get_async_db)
+
+    assert response.status_code == 200
+    assert response.json()["hashtag_suggestions"] == ["#gemini"]
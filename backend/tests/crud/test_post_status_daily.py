@@ -0,0 +1,137 @@
+import runpy
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.crud.analytics import PostStatusDailyCRUD, _split_days
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post, PostStatusDaily, UNSCHEDULED_DAY
+from app.models.social_platform import SocialPlatform
+
+DAY = date(2026, 10, 18)
+TWITTER = PlatformType.TWITTER
+BACKFILL = Path(__file__).parents[2] / "scripts" / "backfill_post_status_daily.py"
+
+
+def _rollup(db):
+    return {
+        (row.user_id, row.platform_type, row.day, row.status): row.post_count
+        for row in db.query(PostStatusDaily).filter(PostStatusDaily.post_count != 0)
+    }
+
+
+def _post(db, user_id, status, schedule_time=datetime(2026, 10, 18, 9, 30)):
+    platform = SocialPlatform(name="twitter", type=TWITTER, user_id=user_id)
+    post = Post(
+        type=PostType.TEXT, content_text={"text": "hi"}, platform=platform, user_id=user_id,
+        status=status, schedule_time=schedule_time,
+    )
+    db.add(post)
+    db.flush()
+    return post
+
+
+def test_add_upserts_and_skips_zero_deltas(db):
+    rollup = PostStatusDailyCRUD(db)
+    scheduled = (1, TWITTER, DAY, PostStatus.SCHEDULED)
+    published = (1, TWITTER, DAY, PostStatus.PUBLISHED)
+
+    rollup.add({scheduled: 2, published: 0})
+    rollup.add({scheduled: 3})
+
+    assert _rollup(db) == {scheduled: 5}
+    assert db.query(PostStatusDaily).count() == 1
+
+
+def test_record_moves_changed_posts_and_cancels_unchanged_ones(db):
+    rollup = PostStatusDailyCRUD(db)
+    changed, unchanged = _post(db, 1, PostStatus.SCHEDULED), _post(db, 1, PostStatus.SCHEDULED)
+    rollup.record({}, rollup.snapshot([changed.id, unchanged.id]))
+
+    before = rollup.snapshot([changed.id, unchanged.id], lock=True)
+    changed.status = PostStatus.PUBLISHED
+    db.flush()
+    rollup.record(before, rollup.snapshot([changed.id, unchanged.id]))
+
+    assert _rollup(db) == {
+        (1, TWITTER, DAY, PostStatus.SCHEDULED): 1,
+        (1, TWITTER, DAY, PostStatus.PUBLISHED): 1,
+    }
+
+
+def test_snapshot_keys_unscheduled_posts_by_the_placeholder_day(db):
+    post = _post(db, 1, PostStatus.DRAFT)
+    # Inserted with the server default, then cleared like a draft saved without a time
+    post.schedule_time = None
+    db.flush()
+
+    assert PostStatusDailyCRUD(db).snapshot([post.id]) == {post.id: (1, TWITTER, UNSCHEDULED_DAY, PostStatus.DRAFT)}
+
+
+def test_rebuild_users_recounts_only_their_rows(db):
+    rollup = PostStatusDailyCRUD(db)
+    for user_id in (1, 2, 2, 3):
+        _post(db, user_id, PostStatus.SCHEDULED)
+    # Drift: a wrong count, a row with no posts behind it, and a user outside the range
+    rollup.add({
+        (2, TWITTER, DAY, PostStatus.SCHEDULED): 7,
+        (2, TWITTER, DAY, PostStatus.FAILED): 1,
+        (3, TWITTER, DAY, PostStatus.FAILED): 4,
+    })
+
+    assert rollup.rebuild_users(1, 2) == 2
+
+    assert _rollup(db) == {
+        (1, TWITTER, DAY, PostStatus.SCHEDULED): 1,
+        (2, TWITTER, DAY, PostStatus.SCHEDULED): 2,
+        (3, TWITTER, DAY, PostStatus.FAILED): 4,
+    }
+
+
+def test_user_ids_pages_through_distinct_users(db):
+    for user_id in (987654321, 5, 5, 1):
+        _post(db, user_id, PostStatus.DRAFT)
+    rollup = PostStatusDailyCRUD(db)
+
+    assert rollup.user_ids(after=None, limit=2) == [1, 5]
+    assert rollup.user_ids(after=5, limit=2) == [987654321]
+    assert rollup.user_ids(after=987654321, limit=2) == []
+
+
+def test_backfill_rebuilds_sparse_user_ids_in_few_batches(db, monkeypatch, capsys):
+    for user_id in (1, 2, 987654321):
+        _post(db, user_id, PostStatus.SCHEDULED)
+    PostStatusDailyCRUD(db).add({(500, TWITTER, DAY, PostStatus.FAILED): 1})
+    db.commit()
+    monkeypatch.setattr(sys, "argv", [str(BACKFILL), "--batch-users", "2"])
+
+    assert runpy.run_path(str(BACKFILL))["main"]() == 0
+
+    assert capsys.readouterr().out.count("users ") == 2
+    db.expire_all()
+    assert _rollup(db) == {(user_id, TWITTER, DAY, PostStatus.SCHEDULED): 1 for user_id in (1, 2, 987654321)}
+
+
+UTC = timezone.utc
+
+
+@pytest.mark.parametrize("start, end, days, edges", [
+    # Whole days only
+    (datetime(2026, 10, 1, tzinfo=UTC), datetime(2026, 10, 3, 23, 59, 59, 999999, tzinfo=UTC),
+     (date(2026, 10, 1), date(2026, 10, 2)),
+     [(datetime(2026, 10, 3, tzinfo=UTC), datetime(2026, 10, 3, 23, 59, 59, 999999, tzinfo=UTC), True)]),
+    # Partial days at both ends
+    (datetime(2026, 10, 1, 12, tzinfo=UTC), datetime(2026, 10, 4, 6, tzinfo=UTC),
+     (date(2026, 10, 2), date(2026, 10, 3)),
+     [(datetime(2026, 10, 1, 12, tzinfo=UTC), datetime(2026, 10, 2, tzinfo=UTC), False),
+      (datetime(2026, 10, 4, tzinfo=UTC), datetime(2026, 10, 4, 6, tzinfo=UTC), True)]),
+    # Less than a day apart
+    (datetime(2026, 10, 1, 12), datetime(2026, 10, 2, 6), None, [(datetime(2026, 10, 1, 12), datetime(2026, 10, 2, 6), True)]),
+    # Open-ended
+    (None, None, (None, None), []),
+    (datetime(2026, 10, 1, 12), None, (date(2026, 10, 2), None), [(datetime(2026, 10, 1, 12), datetime(2026, 10, 2), False)]),
+])
+def test_split_days(start, end, days, edges):
+    assert _split_days(start, end) == (days, edges)
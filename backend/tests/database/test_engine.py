@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.config import settings
+from app.database.engine import EngineManager, PoolMetrics, pool_options
+
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    """An EngineManager on SQLite files, with one pooled connection and one overflow connection."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT_SECONDS", 0.05)
+    manager = EngineManager(
+        f"sqlite:///{tmp_path / 'primary.db'}",
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        [f"sqlite:///{tmp_path / 'replica.db'}"],
+    )
+    yield manager
+    for engine in manager._sync_engines().values():
+        engine.dispose()
+
+
+def test_pool_options_keep_the_default_pool_for_in_memory_sqlite():
+    assert "pool_size" not in pool_options("sqlite://")
+    assert "pool_size" not in pool_options("sqlite:///:memory:")
+    assert pool_options("mysql+pymysql://user@db/app")["pool_size"] == settings.DB_POOL_SIZE
+
+
+def test_metrics_snapshot():
+    metrics = PoolMetrics()
+    metrics.record_checkout(0.2)
+    metrics.record_checkout(0.4)
+    metrics.record_overflow()
+    metrics.record_timeout()
+
+    assert metrics.snapshot() == {
+        "checkouts": 2,
+        "wait_seconds_total": 0.6,
+        "wait_seconds_avg": 0.3,
+        "wait_seconds_max": 0.4,
+        "overflow_events": 1,
+        "timeouts": 1,
+    }
+    metrics.reset()
+    assert metrics.snapshot()["checkouts"] == 0
+
+
+def test_checkouts_overflow_and_timeouts_are_counted(engines):
+    first = engines.engine.connect()
+    second = engines.engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engines.engine.connect()
+
+    status = engines.pool_status()["sync"]
+    assert (status["checkouts"], status["overflow_events"], status["timeouts"]) == (2, 1, 1)
+    assert (status["size"], status["checked_out"], status["overflow"], status["max_overflow"]) == (1, 2, 1, 1)
+    assert status["wait_seconds_max"] >= 0
+    # Each engine counts into its own metrics
+    assert engines.pool_status()["replica0"]["checkouts"] == 0
+    first.close()
+    second.close()
+
+
+def test_after_fork_gives_fresh_pools_without_closing_the_parents_connections(engines):
+    parent = engines.engine.connect()
+    parent.execute(text("SELECT 1"))
+    inherited_pool = engines.engine.pool
+
+    engines.after_fork()
+
+    # The child starts from an empty pool of the same instrumented class, with reset counters
+    assert engines.engine.pool is not inherited_pool
+    assert type(engines.engine.pool) is type(inherited_pool)
+    assert engines.pool_status()["sync"]["checkouts"] == 0
+    with engines.engine.connect() as child:
+        child.execute(text("SELECT 1"))
+    assert engines.pool_status()["sync"]["checkouts"] == 1
+    # The connection the parent still holds was not closed under it
+    assert parent.execute(text("SELECT 1")).scalar() == 1
+    parent.close()
@@ -0,0 +1,121 @@
+"""Query-plan regression tests for the scheduler, analytics and list hot paths.
+
+Each test runs the exact SQL a hot path emits, prefixes every statement with EXPLAIN, and fails
+if one of them falls back to a full table scan, or if a path that must seek a particular index
+(the post list pages) uses another one. So a dropped or reordered index fails the suite.
+
+They run on the SQLite test schema built from the models. To check the MySQL plans, point
+EXPLAIN_DATABASE_URL at a migrated database:
+
+    EXPLAIN_DATABASE_URL=mysql+pymysql://... python -m pytest tests/database/test_query_plans.py
+
+MySQL only picks indexes when it expects them to pay off, so use a database with a realistic
+amount of data rather than an empty one.
+"""
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from app.crud.analytics import AnalyticsCRUD
+from app.crud.post import PostCRUD
+from app.crud.social_platform import SocialPlatformCRUD
+from app.database.session import engine as test_engine
+from app.models.enums import PlatformType
+from app.tasks.services.schedule_post import _PENDING_POSTS_QUERY, _claim_due_posts, _dispatch_from_table
+
+# SQLite reports "SCAN <table>" for a full scan and "SCAN <table> USING [COVERING] INDEX <name>" for a
+# walk over a whole index; only SEARCH means the index is used to seek
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)( USING (COVERING )?INDEX)?")
+
+LATER = (datetime.now(timezone.utc), 10**12)
+
+# (name, run, index_walk_ok, posts_index). `index_walk_ok` marks paths that read an index in
+# order and stop at a LIMIT, where walking the index instead of seeking into it is expected.
+# `posts_index`, when set, is the index the plan must use on `posts`.
+HOT_PATHS = [
+    ("scheduler: due count", lambda db, now: _dispatch_from_table(db, now), False, None),
+    ("scheduler: claim batch", lambda db, now: _claim_due_posts(db, now, 100), False, None),
+    ("scheduler: reconcile index", lambda db, now: db.execute(_PENDING_POSTS_QUERY).fetchall(), False, None),
+    ("scheduler: outbox relay", lambda db, now: db.execute(text(
+        "SELECT id, post_id, due_at FROM post_outbox WHERE sent_at IS NULL ORDER BY id LIMIT 500"
+    )).fetchall(), False, None),
+    ("analytics: counts by user and date", lambda db, now: AnalyticsCRUD(db).get_post_counts_by_status(
+        user_id=1, start_date=now - timedelta(days=30), end_date=now
+    ), False, None),
+    ("analytics: counts by user, platform and date", lambda db, now: AnalyticsCRUD(db).get_post_counts_by_status(
+        user_id=1, platform_type=PlatformType.TWITTER, start_date=now - timedelta(days=30), end_date=now
+    ), False, None),
+    ("posts: list first page", lambda db, now: PostCRUD(db).list(limit=21), True, "ix_posts_created_at_id"),
+    ("posts: list later page", lambda db, now: PostCRUD(db).list(limit=21, after=LATER), False, "ix_posts_created_at_id"),
+    ("posts: list user page", lambda db, now: PostCRUD(db).list(
+        limit=21, after=LATER, user_id=1
+    ), False, "ix_posts_user_id_created_at_id"),
+    ("platforms: by user and type", lambda db, now: SocialPlatformCRUD(db).get_by_user_and_type(
+        1, PlatformType.TWITTER
+    ), False, None),
+]
+
+
+@pytest.fixture
+def explain_engine(request):
+    """The database whose plans are checked: EXPLAIN_DATABASE_URL, or the test schema."""
+    url = os.environ.get("EXPLAIN_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        yield engine
+        engine.dispose()
+    else:
+        request.getfixturevalue("db")
+        yield test_engine
+
+
+def _plan_problems(connection, statement, parameters, index_walk_ok: bool, posts_index: Optional[str]) -> List[str]:
+    """Describes what is wrong with the plan for `statement`: tables read with a full table (or
+    whole-index) scan, and `posts` read through another index than `posts_index`."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()]
+        matches = [SQLITE_SCAN.match(detail) for detail in plan]
+        problems = [f"full scan of {match.group(1)}" for match in matches if match and not (index_walk_ok and match.group(2))]
+        posts_steps = [detail for detail in plan if re.match(r"^(SCAN|SEARCH) posts\b", detail)]
+        used = [re.search(r"INDEX (\w+)", detail) for detail in posts_steps]
+        used = [match.group(1) if match else None for match in used]
+    elif dialect == "mysql":
+        plan = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        scan_types = {"ALL"} if index_walk_ok else {"ALL", "index"}
+        problems = [f"full scan of {row['table']}" for row in plan if row["type"] in scan_types]
+        used = [row["key"] for row in plan if row["table"] in ("posts", "p")]
+    else:
+        pytest.skip(f"EXPLAIN check is not implemented for {dialect}")
+    if posts_index and used != [posts_index]:
+        problems.append(f"posts read through {', '.join(map(str, used)) or 'nothing'} instead of {posts_index}")
+    return problems
+
+
+@pytest.mark.parametrize("name, run, index_walk_ok, posts_index", HOT_PATHS, ids=[path[0] for path in HOT_PATHS])
+def test_hot_path_uses_its_indexes(explain_engine, name, run, index_walk_ok, posts_index):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(explain_engine, "before_cursor_execute", capture)
+    try:
+        with Session(explain_engine) as db:
+            run(db, datetime.now(timezone.utc))
+            db.rollback()
+    finally:
+        event.remove(explain_engine, "before_cursor_execute", capture)
+
+    assert captured
+    with explain_engine.connect() as connection:
+        problems = {
+            " ".join(statement.split()): _plan_problems(connection, statement, parameters, index_walk_ok, posts_index)
+            for statement, parameters in captured
+        }
+    assert {statement: found for statement, found in problems.items() if found} == {}
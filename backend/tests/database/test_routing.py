@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.crud.post import PostCRUD
+from app.database import routing
+from app.database.base import Base
+from app.database.routing import RecentWriters, RoutingSession
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+
+USER_ID = 7
+
+
+def _add_posts(session: Session, count: int, user_id: int = USER_ID) -> None:
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=user_id)
+    session.add(platform)
+    session.flush()
+    session.add_all(
+        Post(type=PostType.TEXT, content_text={"text": "hi"}, platform_id=platform.id, user_id=user_id, status=PostStatus.DRAFT)
+        for _ in range(count)
+    )
+    session.commit()
+
+
+def _count(engine, user_id: int = USER_ID) -> int:
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(Post).where(Post.user_id == user_id)).scalar()
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """A primary and a replica SQLite file, told apart by how many posts each holds."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, posts in ((primary, 1), (replica, 3)):
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            _add_posts(session, posts)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture
+def session(engines):
+    primary, replica = engines
+    session = sessionmaker(bind=primary, class_=RoutingSession, replica=lambda: replica, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def writers(monkeypatch):
+    writers = RecentWriters(window_seconds=60)
+    monkeypatch.setattr(routing, "recent_writers", writers)
+    return writers
+
+
+def test_read_only_reads_go_to_the_replica(session):
+    assert PostCRUD(session).count(user_id=USER_ID) == 3
+
+
+def test_other_reads_go_to_the_primary(session):
+    assert session.query(Post).filter(Post.user_id == USER_ID).count() == 1
+
+
+def test_flushes_and_writes_go_to_the_primary_inside_replica_reads(session, engines):
+    primary, replica = engines
+    with session.replica_reads():
+        _add_posts(session, 2)
+        session.execute(update(Post).where(Post.user_id == USER_ID).values(remarks="edited"))
+        session.commit()
+
+    assert (_count(primary), _count(replica)) == (3, 3)
+    with primary.connect() as connection:
+        assert set(connection.execute(select(Post.remarks).where(Post.user_id == USER_ID)).scalars()) == {"edited"}
+    with replica.connect() as connection:
+        assert set(connection.execute(select(Post.remarks).where(Post.user_id == USER_ID)).scalars()) == {None}
+
+
+def test_recent_writer_reads_from_the_primary(session, writers):
+    writers.mark([USER_ID])
+
+    assert PostCRUD(session).count(user_id=USER_ID) == 1
+    # Other users still read from the replica
+    assert PostCRUD(session).count(user_id=USER_ID + 1) == 0
+    assert PostCRUD(session).count() == 3
+
+
+def test_writer_reads_from_the_replica_again_after_the_window(session, monkeypatch):
+    writers = RecentWriters(window_seconds=0)
+    monkeypatch.setattr(routing, "recent_writers", writers)
+    writers.mark([USER_ID])
+
+    assert PostCRUD(session).count(user_id=USER_ID) == 3
+
+
+def test_default_window_is_read_your_writes_seconds():
+    assert RecentWriters().window_seconds == settings.READ_YOUR_WRITES_SECONDS
@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.models.post import Post
+from app.schemas.post import PostSubmitRequest
+from app.services import post as post_service
+from app.services.bulk_ingest import iter_lines, parse_csv, parse_ndjson, parse_rows
+from app.services.post import PostService
+
+CSV = (
+    "user_id,content_text,platforms,hashtags,schedule_time\n"
+    "1,Spring sale,\"twitter,facebook\",\"#sale, #spring\",2026-11-01T09:00:00\n"
+    "1,No platforms,,,\n"
+    "x,Bad user,twitter,,\n"
+    "1,Too many,twitter,,,extra\n"
+    "2,Draft,linkedin,,\n"
+)
+
+NDJSON = (
+    '{"user_id": 1, "content_text": "Hello", "platforms": ["twitter"]}\n'
+    "\n"
+    "not json\n"
+    "[1, 2]\n"
+    '{"user_id": 1, "platforms": ["twitter"]}\n'
+)
+
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    chunks = ["﻿a,b\n1,".encode(), "2\n3,".encode(), "é".encode()[:1], "é".encode()[1:]]
+
+    assert list(iter_lines(chunks)) == ["a,b\n", "1,2\n", "3,é"]
+
+
+def test_parse_csv_reports_invalid_rows_by_number():
+    rows = list(parse_csv(iter_lines([CSV.encode()])))
+
+    assert [row for row, _ in rows] == [1, 2, 3, 4, 5]
+    first = rows[0][1]
+    assert isinstance(first, PostSubmitRequest)
+    assert [p.value for p in first.platforms] == ["twitter", "facebook"]
+    assert first.hashtags == ["#sale", "#spring"]
+    # Naive times are UTC
+    assert first.schedule_time == datetime(2026, 11, 1, 9, tzinfo=timezone.utc)
+    assert rows[1][1].startswith("platforms:")
+    assert rows[2][1].startswith("user_id:")
+    assert rows[3][1] == "expected 5 columns, got 6"
+    assert isinstance(rows[4][1], PostSubmitRequest)
+
+
+def test_parse_ndjson_skips_blank_lines_and_reports_invalid_rows():
+    rows = list(parse_ndjson(iter_lines([NDJSON.encode()])))
+
+    assert [row for row, _ in rows] == [1, 2, 3, 4]
+    assert isinstance(rows[0][1], PostSubmitRequest)
+    assert rows[1][1].startswith("invalid JSON:")
+    assert rows[2][1] == "invalid JSON: expected a JSON object"
+    assert rows[3][1].startswith("content_text:")
+
+
+@pytest.fixture
+def service(db, fake_redis, monkeypatch):
+    # The outbox relay trigger goes to the broker
+    monkeypatch.setattr(post_service.relay_post_outbox, "delay", lambda *args, **kwargs: None)
+    return PostService(db)
+
+
+def test_bulk_submit_creates_valid_rows_and_rejects_the_rest(db, service):
+    result = service.bulk_submit(parse_rows([CSV.encode()], "csv"), batch_size=2)
+
+    assert (result.accepted_rows, result.rejected_rows, result.posts_created) == (2, 3, 3)
+    assert [error.row for error in result.errors] == [2, 3, 4]
+    assert not result.errors_truncated
+    assert db.query(Post).count() == 3
+
+
+@pytest.fixture
+def failing_insert(db):
+    """Makes the database reject posts whose text is 'boom'."""
+    db.execute(text("""
+        CREATE TRIGGER reject_boom BEFORE INSERT ON posts
+        WHEN json_extract(NEW.content_text, '$.text') = 'boom'
+        BEGIN SELECT RAISE(ABORT, 'boom rejected'); END
+    """))
+    db.commit()
+
+
+def test_failed_batch_is_retried_row_by_row(db, service, failing_insert):
+    rows = "".join(
+        f'{{"user_id": 1, "content_text": "{content}", "platforms": ["twitter"]}}\n'
+        for content in ["one", "boom", "three", "four"]
+    )
+
+    result = service.bulk_submit(parse_rows([rows.encode()], "ndjson"), batch_size=3)
+
+    assert (result.accepted_rows, result.rejected_rows, result.posts_created) == (3, 1, 3)
+    assert [(error.row, error.error) for error in result.errors] == [(2, "boom rejected")]
+    assert sorted(post.content_text["text"] for post in db.query(Post)) == ["four", "one", "three"]
+
+
+def test_reported_errors_are_capped(db, service, monkeypatch):
+    monkeypatch.setattr(post_service.settings, "BULK_INGEST_MAX_REPORTED_ERRORS", 2)
+
+    result = service.bulk_submit(parse_rows([b"not json\n" * 5], "ndjson"))
+
+    assert result.rejected_rows == 5 and len(result.errors) == 2
+    assert result.errors_truncated
+
+
+def test_bulk_endpoint_streams_csv(client, monkeypatch):
+    monkeypatch.setattr(post_service.relay_post_outbox, "delay", lambda *args, **kwargs: None)
+
+    response = client.post("/api/v1/posts/bulk", content=CSV, headers={"content-type": "text/csv"})
+
+    assert response.status_code == 200
+    assert response.json()["accepted_rows"] == 2
+    assert client.post("/api/v1/posts/bulk", content=CSV, headers={"content-type": "text/plain"}).status_code == 415
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.mock_platforms import MockPlatformResponse, NetworkError
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+from app.services import scheduler
+from app.services.scheduler import PostPublisherScheduler
+from app.tasks import retry
+
+pytestmark = pytest.mark.anyio
+
+PUBLISHED = MockPlatformResponse(success=True, data={"post_id": "tw-1"})
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Records the text of each post sent to the platform; texts starting with "flaky" fail once."""
+    sent = []
+
+    async def post_content(platform_type, payload):
+        sent.append(payload["text"])
+        if payload["text"].startswith("flaky") and sent.count(payload["text"]) == 1:
+            raise NetworkError("twitter", "connection reset")
+        return PUBLISHED
+
+    monkeypatch.setattr(scheduler, "_post_content", post_content)
+    # Retry right away
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: 0)
+    return sent
+
+
+def _add_posts(db, texts_and_times):
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1)
+    posts = [
+        Post(type=PostType.TEXT, content_text={"text": text}, platform=platform, user_id=1,
+             status=PostStatus.SCHEDULED, schedule_time=due)
+        for text, due in texts_and_times
+    ]
+    db.add_all(posts)
+    db.commit()
+    return [post.id for post in posts]
+
+
+async def _wait_for(condition, timeout=5):
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("timed out")
+
+
+async def test_due_posts_are_published_earliest_first(db, published):
+    now = datetime.now(timezone.utc)
+    _add_posts(db, [("second", now - timedelta(minutes=2)), ("third", now - timedelta(minutes=1)),
+                    ("first", now - timedelta(minutes=3))])
+    post_scheduler = PostPublisherScheduler(concurrency=1)
+
+    await post_scheduler.start()
+    try:
+        await _wait_for(lambda: len(published) == 3)
+    finally:
+        await post_scheduler.stop()
+
+    assert published == ["first", "second", "third"]
+
+
+async def test_submitted_post_is_published_when_due(db, published):
+    post_scheduler = PostPublisherScheduler()
+    await post_scheduler.start()
+    try:
+        (post_id,) = _add_posts(db, [("later", datetime.now(timezone.utc) + timedelta(seconds=0.3))])
+        post_scheduler.submit([(post_id, db.get(Post, post_id).schedule_time)])
+        await asyncio.sleep(0.1)
+        assert published == []
+
+        await _wait_for(lambda: published == ["later"])
+    finally:
+        await post_scheduler.stop()
+
+
+async def test_transient_failure_is_retried_from_the_stored_attempt_count(db, published):
+    (post_id,) = _add_posts(db, [("flaky", datetime.now(timezone.utc) - timedelta(minutes=1))])
+    post_scheduler = PostPublisherScheduler()
+
+    await post_scheduler.start()
+    try:
+        await _wait_for(lambda: published == ["flaky", "flaky"])
+        await _wait_for(lambda: not post_scheduler._in_flight)
+    finally:
+        await post_scheduler.stop()
+
+    db.expire_all()
+    post = db.get(Post, post_id)
+    assert post.status == PostStatus.PUBLISHED
+    assert post.publish_attempts == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from app.models.enums import PlatformType
+from app.tasks.celery import celery_app, publish_queue, route_task
+from app.tasks.services.schedule_post import publish_post_task, publish_posts_batch
+
+
+@pytest.fixture
+def broker():
+    """A connection to the in-memory broker with every configured queue declared and empty."""
+    with celery_app.connection_for_write() as connection:
+        channel = connection.default_channel
+        for queue in celery_app.amqp.queues.values():
+            queue(channel).declare()
+            queue(channel).purge()
+        yield connection
+        for queue in celery_app.amqp.queues.values():
+            queue(channel).purge()
+
+
+def _queue_depths(connection):
+    channel = connection.default_channel
+    depths = {name: channel.queue_declare(name, passive=True).message_count for name in celery_app.amqp.queues}
+    return {name: depth for name, depth in depths.items() if depth}
+
+
+def test_publish_queue_names():
+    assert publish_queue("twitter") == "publish.twitter"
+    assert publish_queue("LINKEDIN") == "publish.linkedin"
+
+
+def test_every_platform_has_a_queue():
+    assert set(celery_app.amqp.queues) == {"celery", *(publish_queue(platform.value) for platform in PlatformType)}
+
+
+@pytest.mark.parametrize("kwargs, queue", [
+    ({"platform_type": "twitter"}, "publish.twitter"),
+    ({"platform_type": "FACEBOOK", "attempt": 2}, "publish.facebook"),
+    ({"attempt": 2}, None),
+    (None, None),
+])
+def test_route_task_picks_the_queue_by_platform(kwargs, queue):
+    route = route_task(publish_post_task.name, [1], kwargs, {})
+
+    assert (route or {}).get("queue") == queue
+
+
+@pytest.mark.parametrize("task, kwargs, queue", [
+    (publish_post_task, {"attempt": 2, "platform_type": "linkedin"}, "publish.linkedin"),
+    (publish_posts_batch, {"post_ids": [1, 2], "platform_type": "instagram"}, "publish.instagram"),
+    # Unrouted batches and beat tasks stay on the default queue
+    (publish_posts_batch, {}, "celery"),
+])
+def test_messages_land_only_on_their_platforms_queue(broker, task, kwargs, queue):
+    task.apply_async(args=[1] if task is publish_post_task else [], kwargs=kwargs, connection=broker)
+
+    assert _queue_depths(broker) == {queue: 1}
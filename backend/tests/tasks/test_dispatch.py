@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import redis
+
+from app.core.config import settings
+from app.core.schedule_index import schedule_index
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+from app.tasks.services import schedule_post
+from app.tasks.services.schedule_post import _dispatch_from_index, schedule_posts
+
+HORIZON = timedelta(seconds=settings.DISPATCH_HORIZON_SECONDS)
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Records the publish_posts_batch messages that would be sent, as (post_ids, platform_type, eta)."""
+    sent = []
+
+    def apply_async(kwargs, eta=None):
+        sent.append((kwargs["post_ids"], kwargs["platform_type"], eta))
+
+    monkeypatch.setattr(schedule_post.publish_posts_batch, "apply_async", apply_async)
+    return sent
+
+
+@pytest.fixture
+def posts(db):
+    """Makes scheduled posts on the given platforms and returns their ids."""
+    platforms = {}
+
+    def make(*platform_types):
+        created = []
+        for platform_type in platform_types:
+            if platform_type not in platforms:
+                platforms[platform_type] = SocialPlatform(name=platform_type.value, type=platform_type, user_id=1)
+            created.append(Post(
+                type=PostType.TEXT, content_text={"text": "hi"}, platform=platforms[platform_type], user_id=1,
+                status=PostStatus.SCHEDULED,
+            ))
+        db.add_all(created)
+        db.commit()
+        return [post.id for post in created]
+
+    return make
+
+
+def _indexed(fake_redis):
+    return {int(member): score for member, score in fake_redis.zrange(schedule_index.key, 0, -1, withscores=True)}
+
+
+def test_posts_within_the_horizon_are_sent_and_later_ones_indexed(posts, batches, fake_redis):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    soon, inside, outside = posts(PlatformType.TWITTER, PlatformType.TWITTER, PlatformType.TWITTER)
+
+    schedule_posts([
+        (soon, now + timedelta(seconds=30, microseconds=250)),
+        (inside, now + HORIZON - timedelta(seconds=10)),
+        (outside, now + HORIZON + timedelta(seconds=10)),
+    ])
+
+    # Sent with the due time rounded up to the second, so the ETA never fires early
+    assert sorted(batches, key=lambda batch: batch[2]) == [
+        ([soon], "twitter", now + timedelta(seconds=31)),
+        ([inside], "twitter", now + HORIZON - timedelta(seconds=10)),
+    ]
+    assert _indexed(fake_redis) == {outside: (now + HORIZON + timedelta(seconds=10)).timestamp()}
+
+
+def test_overdue_posts_are_sent_without_an_eta(posts, batches, fake_redis):
+    (post_id,) = posts(PlatformType.TWITTER)
+
+    schedule_posts([(post_id, datetime.now(timezone.utc) - timedelta(minutes=5))])
+
+    assert batches == [([post_id], "twitter", None)]
+    assert _indexed(fake_redis) == {}
+
+
+def test_posts_due_in_the_same_second_on_one_platform_share_a_message(posts, batches, fake_redis):
+    due = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=60)
+    first, second, linkedin = posts(PlatformType.TWITTER, PlatformType.TWITTER, PlatformType.LINKEDIN)
+
+    schedule_posts([(first, due), (second, due.replace(microsecond=0)), (linkedin, due)])
+
+    assert sorted(batches) == [([first, second], "twitter", due), ([linkedin], "linkedin", due)]
+
+
+def test_naive_due_times_are_taken_as_utc(posts, batches, fake_redis):
+    (post_id,) = posts(PlatformType.TWITTER)
+    due = datetime.now(timezone.utc).replace(microsecond=0) + HORIZON + timedelta(hours=1)
+
+    schedule_posts([(post_id, due.replace(tzinfo=None))])
+
+    assert batches == []
+    assert _indexed(fake_redis) == {post_id: due.timestamp()}
+
+
+def test_posts_that_no_longer_exist_are_dropped(posts, batches, fake_redis):
+    (post_id,) = posts(PlatformType.TWITTER)
+
+    schedule_posts([(post_id, datetime.now(timezone.utc)), (post_id + 100, datetime.now(timezone.utc))])
+
+    assert [batch[0] for batch in batches] == [[post_id]]
+
+
+def test_unsent_posts_stay_in_the_index_when_the_broker_fails(posts, monkeypatch, fake_redis):
+    post_ids = posts(PlatformType.TWITTER, PlatformType.TWITTER)
+    due = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def broker_down(**options):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(schedule_post.publish_posts_batch, "apply_async", broker_down)
+
+    # Logged, not raised: the submit that scheduled the posts still succeeds
+    schedule_posts([(post_id, due) for post_id in post_ids])
+
+    assert _indexed(fake_redis) == {post_id: due.timestamp() for post_id in post_ids}
+
+
+def test_the_dispatcher_sends_indexed_posts_as_the_horizon_reaches_them(posts, batches, fake_redis):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    near, far = posts(PlatformType.TWITTER, PlatformType.FACEBOOK)
+    schedule_index.add([(near, now + HORIZON - timedelta(seconds=1)), (far, now + HORIZON + timedelta(seconds=1))])
+
+    assert _dispatch_from_index(now) == 1
+    assert batches == [([near], "twitter", now + HORIZON - timedelta(seconds=1))]
+    assert _indexed(fake_redis) == {far: (now + HORIZON + timedelta(seconds=1)).timestamp()}
+
+    # Two seconds later the far post is within the horizon too
+    assert _dispatch_from_index(now + timedelta(seconds=2)) == 1
+    assert batches[-1] == ([far], "facebook", now + HORIZON + timedelta(seconds=1))
+    assert _indexed(fake_redis) == {}
+
+
+def test_the_dispatcher_pops_the_index_in_batches(posts, batches, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "PUBLISH_BATCH_SIZE", 2)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    post_ids = posts(*[PlatformType.TWITTER] * 5)
+    schedule_index.add((post_id, now) for post_id in post_ids)
+
+    assert _dispatch_from_index(now) == 5
+    assert [batch[0] for batch in batches] == [post_ids[0:2], post_ids[2:4], post_ids[4:]]
+
+
+def test_the_dispatcher_raises_when_the_index_is_unreachable(broken_redis, monkeypatch):
+    monkeypatch.setattr(schedule_index, "_client", broken_redis)
+
+    # check_scheduled_posts falls back to the table sweep on a RedisError
+    with pytest.raises(redis.RedisError):
+        _dispatch_from_index(datetime.now(timezone.utc))
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.tasks import event_loop
+from app.tasks.event_loop import WorkerEventLoop, run_publish_coroutine
+
+
+@pytest.fixture
+def loop():
+    worker = WorkerEventLoop(max_in_flight=2)
+    yield worker
+    if worker._loop is not None:
+        worker._loop.call_soon_threadsafe(worker._loop.stop)
+
+
+async def _running_loop():
+    return asyncio.get_running_loop()
+
+
+def test_calls_reuse_one_loop_on_a_background_thread(loop):
+    first, second = loop.run(_running_loop()), loop.run(_running_loop())
+
+    assert first is second
+    assert loop._thread.is_alive() and loop._thread is not threading.current_thread()
+
+
+def test_reset_starts_a_fresh_loop(loop):
+    first = loop.run(_running_loop())
+
+    loop.reset()
+
+    assert loop.run(_running_loop()) is not first
+
+
+def test_task_threads_wait_on_the_loop_at_the_same_time(loop):
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "done"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: loop.run(slow()), range(8)))
+
+    assert results == ["done"] * 8
+    # Eight 0.2 s calls overlap instead of taking 1.6 s one after another
+    assert time.perf_counter() - started < 1.0
+
+
+def test_limited_caps_the_calls_in_flight(loop):
+    in_flight, peak = [0], [0]
+
+    async def call():
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+
+    async def many():
+        await asyncio.gather(*(loop.limited(call()) for _ in range(6)))
+
+    loop.run(many())
+
+    assert peak[0] == 2
+
+
+def test_limited_awaits_directly_outside_the_worker_loop(loop):
+    assert asyncio.run(loop.limited(asyncio.sleep(0, result="ok"))) == "ok"
+
+
+def test_a_call_past_its_timeout_is_cancelled(loop):
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        loop.run(hang(), timeout=0.05)
+
+    assert cancelled.wait(1)
+
+
+@pytest.mark.parametrize("mode, persistent", [("event_loop", True), ("asyncio_run", False)])
+def test_run_publish_coroutine_follows_the_worker_mode(monkeypatch, loop, mode, persistent):
+    monkeypatch.setattr(settings, "PUBLISH_WORKER_MODE", mode)
+    monkeypatch.setattr(event_loop, "worker_loop", loop)
+
+    first, second = run_publish_coroutine(_running_loop()), run_publish_coroutine(_running_loop())
+
+    assert (first is second) == persistent
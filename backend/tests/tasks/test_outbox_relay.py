@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.schedule_index import schedule_index
+from app.crud.post import PostCRUD
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post, PostOutbox
+from app.models.social_platform import SocialPlatform
+from app.tasks.services import schedule_post
+from app.tasks.services.schedule_post import relay_post_outbox
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Records the publish batches sent to the broker; set `down` to make it refuse them."""
+    class Broker:
+        def __init__(self):
+            self.down = False
+            self.batches = []
+
+        def apply_async(self, **options):
+            if self.down:
+                raise ConnectionError("broker unreachable")
+            self.batches.append(options)
+
+    fake = Broker()
+    monkeypatch.setattr(schedule_post.publish_posts_batch, "apply_async", fake.apply_async)
+    return fake
+
+
+@pytest.fixture
+def post_ids(db):
+    """Three scheduled posts created with their outbox rows: two due now, one next week."""
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1)
+    db.add(platform)
+    db.flush()
+    now = datetime.now(timezone.utc)
+    posts = [
+        Post(type=PostType.TEXT, content_text={"text": f"post {i}"}, platform_id=platform.id, user_id=1,
+             status=PostStatus.SCHEDULED, schedule_time=due)
+        for i, due in enumerate([now - timedelta(seconds=1), now, now + timedelta(days=7)])
+    ]
+    return PostCRUD(db).create_many(posts, outbox=True)
+
+
+def _unsent(db):
+    db.expire_all()
+    return db.query(PostOutbox).filter(PostOutbox.sent_at.is_(None)).count()
+
+
+def test_rows_are_sent_once(db, broker, fake_redis, post_ids):
+    assert relay_post_outbox() == "Relayed 3 posts"
+    assert relay_post_outbox() == "Relayed 0 posts"
+
+    (batch,) = broker.batches
+    assert sorted(batch["kwargs"]["post_ids"]) == post_ids[:2]
+    # The post beyond the dispatch horizon waits in the schedule index instead
+    assert fake_redis.zscore(schedule_index.key, str(post_ids[2])) is not None
+    assert _unsent(db) == 0
+
+
+def test_sent_rows_are_deleted_after_the_retention_period(db, broker, fake_redis, post_ids, monkeypatch):
+    relay_post_outbox()
+    assert db.query(PostOutbox).count() == 3
+
+    monkeypatch.setattr(settings, "OUTBOX_RETENTION_HOURS", 0)
+    relay_post_outbox()
+
+    db.expire_all()
+    assert db.query(PostOutbox).count() == 0
+
+
+def test_rows_are_kept_when_the_broker_fails(db, broker, fake_redis, post_ids):
+    broker.down = True
+
+    assert relay_post_outbox().startswith("Error")
+
+    assert _unsent(db) == 3
+    # What could not be sent is also in the schedule index for the dispatcher
+    assert {int(member) for member in fake_redis.zrange(schedule_index.key, 0, -1)} == set(post_ids)
+
+    broker.down = False
+    assert relay_post_outbox() == "Relayed 3 posts"
+    assert _unsent(db) == 0
+    assert sorted(broker.batches[0]["kwargs"]["post_ids"]) == post_ids[:2]
+
+
+def test_relay_batches_are_limited(db, broker, fake_redis, post_ids, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_RELAY_BATCH_SIZE", 2)
+
+    assert relay_post_outbox() == "Relayed 3 posts"
+    assert _unsent(db) == 0
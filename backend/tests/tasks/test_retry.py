@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.mock_platforms import NetworkError, PlatformError, RateLimitError, ValidationError
+from app.tasks import retry
+from app.tasks.retry import RetryPolicy, next_retry_delay, policy_for
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def max_jitter(monkeypatch):
+    """Makes the full jitter always pick the upper bound of its range."""
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+
+
+def test_backoff_doubles_up_to_the_cap(max_jitter):
+    policy = RetryPolicy(max_attempts=10, base_delay=5, max_delay=30)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [5, 10, 20, 30, 30]
+
+
+def test_backoff_is_full_jitter():
+    policy = RetryPolicy(max_attempts=10, base_delay=5, max_delay=300)
+
+    delays = [policy.backoff(3) for _ in range(500)]
+
+    assert all(0 <= delay <= 20 for delay in delays)
+    # Spread over the whole range rather than clustered at the top
+    assert min(delays) < 5 and max(delays) > 15
+
+
+@pytest.mark.parametrize("error, max_attempts", [
+    (NetworkError("twitter", "reset"), 5),
+    (RateLimitError("twitter", "slow down"), 5),
+    (PlatformError("twitter", "oops"), 3),
+    (ValidationError("twitter", "too long"), 1),
+    (RuntimeError("bug"), 1),
+])
+def test_policy_is_looked_up_by_error_class(error, max_attempts):
+    assert policy_for(error).max_attempts == max_attempts
+
+
+def test_subclasses_fall_back_to_their_base_class_policy():
+    class TimeoutError_(NetworkError):
+        pass
+
+    assert policy_for(TimeoutError_("twitter", "timeout")) == policy_for(NetworkError("twitter", "reset"))
+
+
+def test_retries_stop_at_max_attempts(max_jitter):
+    error = NetworkError("twitter", "reset")
+
+    assert [next_retry_delay(error, attempt, NOW, NOW) for attempt in range(1, 6)] == [5, 10, 20, 40, None]
+
+
+def test_non_retryable_errors_are_not_retried():
+    assert next_retry_delay(ValidationError("twitter", "too long"), 1, NOW, NOW) is None
+    assert next_retry_delay(RuntimeError("bug"), 1, NOW, NOW) is None
+
+
+def test_no_retry_past_the_deadline(max_jitter):
+    error = NetworkError("twitter", "reset")
+
+    # The deadline is an hour after schedule_time
+    assert next_retry_delay(error, 1, NOW, NOW + timedelta(seconds=3595)) == 5
+    assert next_retry_delay(error, 1, NOW, NOW + timedelta(seconds=3596)) is None
+    assert next_retry_delay(error, 1, None, NOW + timedelta(days=1)) == 5
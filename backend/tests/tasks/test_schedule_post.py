@@ -0,0 +1,309 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.circuit_breaker import circuit_breaker
+from app.core.mock_platforms import MockPlatformResponse, NetworkError
+from app.core.schedule_index import schedule_index
+from app.models.enums import PlatformType, PostStatus, PostType
+from app.models.post import Post
+from app.models.social_platform import SocialPlatform
+from app.tasks.services import schedule_post
+from app.tasks.services.schedule_post import (
+    _as_utc, _claim_due_posts, _claim_post, _defer_posts, _dispatch_from_table, _reindex_unclaimed,
+    publish_post_task, publish_posts_batch, reconcile_schedule_index,
+)
+
+DELAY = 600
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Records what would be handed to the dispatcher and the broker instead of sending it."""
+    sent = {"scheduled": [], "batches": [], "retries": []}
+    monkeypatch.setattr(schedule_post, "schedule_posts", lambda entries: sent["scheduled"].extend(entries))
+    monkeypatch.setattr(
+        schedule_post.publish_posts_batch, "apply_async", lambda **options: sent["batches"].append(options)
+    )
+    monkeypatch.setattr(
+        schedule_post.publish_post_task, "apply_async", lambda **options: sent["retries"].append(options)
+    )
+    return sent
+
+
+@pytest.fixture
+def platform(monkeypatch):
+    """Scripts the platform: each publish takes the next result, raising it if it is an exception."""
+    results = []
+
+    async def post_content(platform_type, payload):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(schedule_post, "_post_content", post_content)
+    return results
+
+
+@pytest.fixture
+def post_id(db):
+    """A post that has been due for a minute."""
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1)
+    db.add(platform)
+    db.flush()
+    post = Post(
+        type=PostType.TEXT, content_text={"text": "hi"}, platform_id=platform.id, user_id=1,
+        status=PostStatus.SCHEDULED, schedule_time=datetime.now(timezone.utc) - timedelta(minutes=1),
+    )
+    db.add(post)
+    db.commit()
+    return post.id
+
+
+def test_post_scheduled_in_the_future_cannot_be_claimed(db, post_id):
+    post = db.get(Post, post_id)
+    post.schedule_time = datetime.now(timezone.utc) + timedelta(hours=1)
+    db.commit()
+
+    assert not _claim_post(db, post_id, datetime.now(timezone.utc))
+    db.commit()
+    db.refresh(post)
+    assert post.status == PostStatus.SCHEDULED and post.lease_expires_at is None
+
+    assert _claim_post(db, post_id, datetime.now(timezone.utc) + timedelta(hours=1))
+
+
+@pytest.fixture
+def deferred(db, post_id, dispatched, fake_redis):
+    """Claims the post and defers it by DELAY seconds, as a rate limit or open circuit would.
+
+    Returns the time it was deferred to.
+    """
+    assert _claim_post(db, post_id, datetime.now(timezone.utc))
+    db.commit()
+    _defer_posts(db, {post_id: DELAY}, "platform rate limit reached")
+    (deferred_id, until), = dispatched["scheduled"]
+    assert deferred_id == post_id
+    return until
+
+
+def test_deferred_post_is_scheduled_until_its_delay_has_passed(db, post_id, deferred):
+    post = db.get(Post, post_id)
+
+    assert post.status == PostStatus.SCHEDULED
+    assert _as_utc(post.lease_expires_at) == deferred
+    assert post.remarks == "Deferred: platform rate limit reached"
+    assert deferred - datetime.now(timezone.utc) > timedelta(seconds=DELAY - 60)
+
+
+def test_deferred_post_cannot_be_claimed_early(db, post_id, deferred):
+    assert not _claim_post(db, post_id, deferred - timedelta(seconds=1))
+    assert _claim_due_posts(db, deferred - timedelta(seconds=1), 10) == []
+
+    assert [row[0] for row in _claim_due_posts(db, deferred, 10)] == [post_id]
+
+
+def test_table_sweep_skips_deferred_post(db, post_id, deferred, dispatched):
+    assert _dispatch_from_table(db, datetime.now(timezone.utc)) == 0
+    assert dispatched["batches"] == []
+
+    assert _dispatch_from_table(db, deferred) == 1
+
+
+def test_reconcile_indexes_deferred_post_at_its_deferred_time(post_id, deferred, fake_redis):
+    reconcile_schedule_index()
+
+    assert fake_redis.zscore(schedule_index.key, str(post_id)) == deferred.timestamp()
+
+
+def test_unclaimed_post_is_reindexed_at_its_deferred_time(db, post_id, deferred, fake_redis):
+    _reindex_unclaimed(db, [post_id])
+
+    assert fake_redis.zscore(schedule_index.key, str(post_id)) == deferred.timestamp()
+
+
+def test_post_deferred_before_its_schedule_time_keeps_it(db, post_id, dispatched, fake_redis):
+    post = db.get(Post, post_id)
+    assert _claim_post(db, post_id, datetime.now(timezone.utc))
+    db.commit()
+    _defer_posts(db, {post_id: 1}, "platform rate limit reached")
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    db.refresh(post)
+    post.schedule_time = later
+    db.commit()
+
+    reconcile_schedule_index()
+
+    assert fake_redis.zscore(schedule_index.key, str(post_id)) == later.timestamp()
+
+
+@pytest.fixture
+def open_circuit(fake_redis):
+    for _ in range(circuit_breaker.failure_threshold):
+        circuit_breaker.record("twitter", failed=True)
+    wait, _ = circuit_breaker.before_call("twitter")
+    assert wait > 0
+    return wait
+
+
+def _assert_deferred_by_circuit(db, post_id, dispatched, wait):
+    post = db.get(Post, post_id)
+    assert post.status == PostStatus.SCHEDULED
+    assert post.remarks.startswith("Deferred: ") and "circuit open" in post.remarks
+    until = _as_utc(post.lease_expires_at)
+    assert dispatched["scheduled"] == [(post_id, until)]
+    assert until - datetime.now(timezone.utc) > timedelta(seconds=wait - 60)
+
+    # Neither the table sweep nor a reconcile hands the post out while the circuit is open
+    assert _dispatch_from_table(db, datetime.now(timezone.utc)) == 0
+    reconcile_schedule_index()
+    assert schedule_index.pop_due(datetime.now(timezone.utc), limit=10) == []
+    assert _claim_due_posts(db, datetime.now(timezone.utc), 10) == []
+
+
+def test_batch_defers_posts_durably_while_the_circuit_is_open(db, post_id, dispatched, open_circuit):
+    assert publish_posts_batch() == "Published 0 posts"
+
+    _assert_deferred_by_circuit(db, post_id, dispatched, open_circuit)
+
+
+def test_publish_task_defers_the_post_durably_while_the_circuit_is_open(db, post_id, dispatched, open_circuit):
+    publish_post_task(post_id)
+
+    _assert_deferred_by_circuit(db, post_id, dispatched, open_circuit)
+
+
+PUBLISHED = MockPlatformResponse(success=True, data={"post_id": "tw-1"})
+
+
+def _due_posts(db, count, **values):
+    platform = SocialPlatform(name="twitter", type=PlatformType.TWITTER, user_id=1)
+    posts = [
+        Post(
+            type=PostType.TEXT, content_text={"text": f"post {i}"}, platform=platform, user_id=1,
+            status=PostStatus.SCHEDULED, schedule_time=datetime.now(timezone.utc) - timedelta(minutes=count - i),
+            **values,
+        )
+        for i in range(count)
+    ]
+    db.add_all(posts)
+    db.commit()
+    return [post.id for post in posts]
+
+
+def test_batch_claims_at_most_limit_posts_earliest_first(db, dispatched, platform, fake_redis):
+    post_ids = _due_posts(db, 3)
+    platform.extend([PUBLISHED, PUBLISHED])
+
+    assert publish_posts_batch(limit=2) == "Published 2 posts"
+
+    assert [db.get(Post, post_id).status for post_id in post_ids] == [
+        PostStatus.PUBLISHED, PostStatus.PUBLISHED, PostStatus.SCHEDULED,
+    ]
+
+
+def test_claimed_posts_are_not_claimed_again(db):
+    post_ids = _due_posts(db, 2)
+    now = datetime.now(timezone.utc)
+
+    first = _claim_due_posts(db, now, 10)
+    db.commit()
+
+    assert [row[0] for row in first] == post_ids
+    assert _claim_due_posts(db, now, 10) == []
+
+
+class _RecordingSession:
+    """Stands in for a MySQL session: records the statements and finds no rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def get_bind(self):
+        return type("Bind", (), {"dialect": type("Dialect", (), {"name": "mysql"})})
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return type("Result", (), {"fetchall": lambda self: []})()
+
+
+def test_claim_skips_rows_locked_by_other_batches_off_sqlite():
+    db = _RecordingSession()
+
+    assert _claim_due_posts(db, datetime.now(timezone.utc), 10, platform_type="twitter") == []
+
+    (candidates,) = db.statements
+    assert candidates.rstrip().endswith("FOR UPDATE OF p SKIP LOCKED")
+    assert "LIMIT :limit" in candidates
+
+
+def test_batch_retry_continues_from_the_stored_attempt_count(db, dispatched, platform, fake_redis):
+    (post_id,) = _due_posts(db, 1, publish_attempts=2)
+    platform.append(NetworkError("twitter", "connection reset"))
+
+    publish_posts_batch()
+
+    post = db.get(Post, post_id)
+    assert post.status == PostStatus.PUBLISHING and post.publish_attempts == 3
+    assert post.remarks.startswith("Attempt 3 failed")
+    (retry,) = dispatched["retries"]
+    assert retry["kwargs"] == {"attempt": 4, "platform_type": "twitter"}
+
+
+def test_batch_gives_up_after_the_policys_last_attempt(db, dispatched, platform, fake_redis):
+    # NetworkError allows five attempts; four have failed
+    (post_id,) = _due_posts(db, 1, publish_attempts=4)
+    platform.append(NetworkError("twitter", "connection reset"))
+
+    publish_posts_batch()
+
+    post = db.get(Post, post_id)
+    assert post.status == PostStatus.FAILED
+    assert dispatched["retries"] == []
+
+
+class _RetryRequested(Exception):
+    pass
+
+
+@pytest.fixture
+def task_retries(monkeypatch):
+    """Records the retries publish_post_task asks Celery for."""
+    requested = []
+
+    def retry(**options):
+        requested.append(options)
+        return _RetryRequested()
+
+    monkeypatch.setattr(publish_post_task, "retry", retry)
+    return requested
+
+
+def test_publish_task_asks_celery_to_retry_a_transient_error(db, post_id, platform, task_retries, fake_redis):
+    platform.append(NetworkError("twitter", "connection reset"))
+
+    with pytest.raises(_RetryRequested):
+        publish_post_task(post_id, attempt=2)
+
+    (retry,) = task_retries
+    assert retry["kwargs"] == {"attempt": 3, "platform_type": "TWITTER"}
+    assert 0 <= retry["countdown"] <= 10
+    post = db.get(Post, post_id)
+    assert post.status == PostStatus.PUBLISHING and post.publish_attempts == 1
+
+
+def test_publish_task_does_not_hide_an_error_behind_the_retry(db, post_id, platform, task_retries, fake_redis, monkeypatch):
+    class Shutdown(BaseException):
+        pass
+
+    def interrupted(*args):
+        raise Shutdown()
+
+    platform.append(NetworkError("twitter", "connection reset"))
+    monkeypatch.setattr(schedule_post, "_retry_remarks", interrupted)
+
+    with pytest.raises(Shutdown):
+        publish_post_task(post_id)
+
+    assert task_retries == []
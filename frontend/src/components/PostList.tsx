@@ -18,7 +18,7 @@ export default function PostList() {
   const fetchPosts = async () => {
     try {
       setLoading(true);
-      const response = await postApi.listPosts(20, 0);
+      const response = await postApi.listPosts(20);
       setPosts(response.posts);
       setError(null);
     } catch (err) {
@@ -63,8 +63,13 @@ export const postApi = {
     return api.post('/submit-post', formData);
   },
 
-  listPosts: async (limit = 20, offset = 0): Promise<PostListResponse> => {
-    const response = await api.get(`/posts?limit=${limit}&offset=${offset}`);
+  // Pass the next_cursor of the previous page as cursor to get the next one
+  listPosts: async (limit = 20, cursor?: string): Promise<PostListResponse> => {
+    const params = new URLSearchParams();
+    params.append('limit', limit.toString());
+    if (cursor) params.append('cursor', cursor);
+
+    const response = await api.get(`/posts?${params.toString()}`);
     return response.data;
   },
 
@@ -62,9 +62,11 @@ export interface PostListItem {
 
 export interface PostListResponse {
   posts: PostListItem[];
-  total: number;
   limit: number;
-  offset: number;
+  // Pass as cursor to get the next page; null on the last page
+  next_cursor?: string | null;
+  // Only counted when asked for with include_total
+  total?: number | null;
 }
 
 export interface PostSummaryResponse {